@@ -1,32 +1,37 @@
 """
 Authentication and authorization module for ParkBench API
 
-Provides JWT-based authentication, API key authentication, and rate limiting
-for secure agent interactions and platform access control.
+Provides JWT-based authentication and API key authentication for secure agent
+interactions and platform access control. Rate limiting is in api.rate_limit.
 """
 
 import jwt
 import hashlib
 import secrets
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
 from fastapi import HTTPException, Depends, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 import logging
-import time
-from collections import defaultdict
-import asyncio
 
 from config.settings import get_settings
-from db.models import get_db, Agent
+from db.models import get_async_db, Agent, APIKey
+from .cache import api_key_cache, principal_cache, unknown_api_key_cache
+from .invalidation import notify_invalidation, register_cache
+from .signing import decode_token, encode_token
 
 logger = logging.getLogger(__name__)
 
 # Security schemes
 security = HTTPBearer()
 
+# Revoking a key or deactivating an agent evicts it from every worker's cache
+register_cache(api_key_cache)
+register_cache(principal_cache)
+
 class TokenData(BaseModel):
     agent_name: Optional[str] = None
     permissions: List[str] = []
@@ -40,86 +45,61 @@ class APIKeyData(BaseModel):
     expires_at: Optional[datetime] = None
     rate_limit: int = 1000  # requests per hour
 
-class RateLimitInfo(BaseModel):
-    requests_remaining: int
-    reset_time: datetime
-    limit: int
-
-# In-memory store for rate limiting (in production, use Redis)
-class RateLimiter:
-    def __init__(self):
-        self.requests = defaultdict(list)
-        self.locks = defaultdict(asyncio.Lock)
+def hash_api_key(api_key: str) -> str:
+    """
+    Hex SHA-256 of an API key, as stored in api_keys.key_hash
     
-    async def is_allowed(self, identifier: str, limit: int = 100, window: int = 3600) -> RateLimitInfo:
-        """
-        Check if request is allowed under rate limit
-        
-        Args:
-            identifier: Unique identifier (IP, API key, agent name)
-            limit: Maximum requests allowed in window
-            window: Time window in seconds (default 1 hour)
-        """
-        now = time.time()
-        window_start = now - window
-        
-        async with self.locks[identifier]:
-            # Clean old requests
-            self.requests[identifier] = [
-                req_time for req_time in self.requests[identifier] 
-                if req_time > window_start
-            ]
-            
-            current_count = len(self.requests[identifier])
-            
-            if current_count >= limit:
-                # Rate limit exceeded
-                oldest_request = min(self.requests[identifier]) if self.requests[identifier] else now
-                reset_time = datetime.fromtimestamp(oldest_request + window)
-                
-                return RateLimitInfo(
-                    requests_remaining=0,
-                    reset_time=reset_time,
-                    limit=limit
-                )
-            
-            # Allow request
-            self.requests[identifier].append(now)
-            remaining = limit - (current_count + 1)
-            reset_time = datetime.fromtimestamp(now + window)
-            
-            return RateLimitInfo(
-                requests_remaining=remaining,
-                reset_time=reset_time,
-                limit=limit
-            )
-
-# Global rate limiter instance
-rate_limiter = RateLimiter()
+    Keys are 256-bit random tokens, so a fast unsalted hash is enough to make
+    a leaked table useless without slowing down verification.
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()
 
-# In-memory API key store (in production, use database)
-api_keys: Dict[str, APIKeyData] = {}
+def api_key_data(row: APIKey) -> APIKeyData:
+    return APIKeyData(
+        key_id=row.key_id,
+        agent_name=row.agent_name,
+        permissions=row.permissions,
+        created_at=row.created_at,
+        expires_at=row.expires_at,
+        rate_limit=row.rate_limit
+    )
 
-def generate_api_key(agent_name: str, permissions: List[str] = None, expires_hours: int = 24 * 7) -> str:
-    """Generate a new API key for an agent"""
+async def generate_api_key(
+    db: AsyncSession,
+    agent_name: str,
+    permissions: List[str] = None,
+    expires_hours: int = 24 * 7
+) -> Tuple[str, APIKeyData]:
+    """Generate and store a new API key for an agent; the key itself is only returned here"""
     if permissions is None:
         permissions = ["read", "write"]
     
-    key_id = secrets.token_urlsafe(32)
-    api_key = f"pk_{key_id}"
-    
-    expires_at = datetime.utcnow() + timedelta(hours=expires_hours) if expires_hours else None
-    
-    api_keys[api_key] = APIKeyData(
-        key_id=key_id,
+    api_key = f"pk_{secrets.token_urlsafe(32)}"
+    now = datetime.now(timezone.utc)
+    row = APIKey(
+        key_id=secrets.token_hex(8),
+        key_hash=hash_api_key(api_key),
         agent_name=agent_name,
         permissions=permissions,
-        created_at=datetime.utcnow(),
-        expires_at=expires_at
+        rate_limit=APIKeyData.model_fields["rate_limit"].default,
+        created_at=now,
+        expires_at=now + timedelta(hours=expires_hours) if expires_hours else None
     )
+    db.add(row)
+    await db.commit()
     
-    logger.info(f"Generated API key for agent {agent_name} with permissions {permissions}")
-    return api_key
+    logger.info(f"Generated API key {row.key_id} for agent {agent_name} with permissions {permissions}")
+    return api_key, api_key_data(row)
+
+async def revoke_api_key(db: AsyncSession, key_id: str) -> bool:
+    """Delete an API key and evict it from every worker's verification cache; False if there is no such key"""
+    key_hash = await db.scalar(delete(APIKey).where(APIKey.key_id == key_id).returning(APIKey.key_hash))
+    if key_hash is None:
+        return False
+    
+    await notify_invalidation(db, api_key_cache, key_hash)
+    await db.commit()
+    return True
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
@@ -133,15 +113,12 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     
     to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
-    return encoded_jwt
+    return encode_token(to_encode)
 
 def verify_token(token: str) -> TokenData:
     """Verify and decode a JWT token"""
-    settings = get_settings()
-    
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        payload = decode_token(token)
         agent_name: str = payload.get("sub")
         permissions: List[str] = payload.get("permissions", [])
         token_type: str = payload.get("type", "access")
@@ -162,24 +139,33 @@ def verify_token(token: str) -> TokenData:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has expired"
         )
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
         )
 
-def verify_api_key(api_key: str) -> APIKeyData:
-    """Verify an API key"""
-    if api_key not in api_keys:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid API key"
-        )
+async def verify_api_key(api_key: str, db: AsyncSession) -> APIKeyData:
+    """Verify an API key (hot keys, and recently seen unknown ones, are answered from cache without a query)"""
+    key_hash = hash_api_key(api_key)
+    key_data = api_key_cache.get(key_hash)
     
-    key_data = api_keys[api_key]
+    if key_data is None:
+        row = None
+        if unknown_api_key_cache.get(key_hash) is None:
+            row = await db.scalar(select(APIKey).where(APIKey.key_hash == key_hash))
+            if row is None:
+                unknown_api_key_cache.set(key_hash, True)
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key"
+            )
+        key_data = api_key_data(row)
+        api_key_cache.set(key_hash, key_data)
     
     # Check expiration
-    if key_data.expires_at and datetime.utcnow() > key_data.expires_at:
+    if key_data.expires_at and datetime.now(timezone.utc) > key_data.expires_at:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="API key has expired"
@@ -187,9 +173,30 @@ def verify_api_key(api_key: str) -> APIKeyData:
     
     return key_data
 
+async def active_agent_id(agent_name: str, db: AsyncSession) -> str:
+    """agent_id of an active agent, from principal_cache when possible (no query on a hit)"""
+    agent_id = principal_cache.get(agent_name)
+    
+    if agent_id is None:
+        agent_id = await db.scalar(select(Agent.agent_id).where(
+            Agent.agent_name == agent_name,
+            Agent.active == True
+        ))
+        
+        if agent_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Agent not found or inactive"
+            )
+        
+        agent_id = str(agent_id)
+        principal_cache.set(agent_name, agent_id)
+    
+    return agent_id
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Get current authenticated user from JWT token or API key
@@ -199,23 +206,14 @@ async def get_current_user(
     # Try API key first (if it starts with 'pk_')
     if token.startswith('pk_'):
         try:
-            key_data = verify_api_key(token)
+            key_data = await verify_api_key(token, db)
             
             # Verify agent exists and is active
-            agent = db.query(Agent).filter(
-                Agent.agent_name == key_data.agent_name,
-                Agent.active == True
-            ).first()
-            
-            if not agent:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Agent not found or inactive"
-                )
+            agent_id = await active_agent_id(key_data.agent_name, db)
             
             return {
                 "agent_name": key_data.agent_name,
-                "agent_id": str(agent.agent_id),
+                "agent_id": agent_id,
                 "permissions": key_data.permissions,
                 "auth_type": "api_key",
                 "rate_limit": key_data.rate_limit
@@ -228,23 +226,14 @@ async def get_current_user(
             token_data = verify_token(token)
             
             # Verify agent exists and is active
-            agent = db.query(Agent).filter(
-                Agent.agent_name == token_data.agent_name,
-                Agent.active == True
-            ).first()
-            
-            if not agent:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Agent not found or inactive"
-                )
+            agent_id = await active_agent_id(token_data.agent_name, db)
             
             return {
                 "agent_name": token_data.agent_name,
-                "agent_id": str(agent.agent_id),
+                "agent_id": agent_id,
                 "permissions": token_data.permissions,
                 "auth_type": "jwt",
-                "rate_limit": 100  # Default rate limit for JWT tokens
+                "rate_limit": get_settings().rate_limit_authenticated_requests
             }
         except HTTPException:
             raise
@@ -260,45 +249,10 @@ def require_permission(required_permission: str):
         return current_user
     return permission_checker
 
-async def rate_limit_middleware(
-    request: Request,
-    current_user: Optional[Dict[str, Any]] = None
-) -> None:
-    """
-    Rate limiting middleware
-    """
-    # Determine identifier and rate limit
-    if current_user:
-        # Authenticated request
-        identifier = f"agent:{current_user['agent_name']}"
-        limit = current_user.get("rate_limit", 100)
-    else:
-        # Unauthenticated request - use IP
-        client_ip = request.client.host
-        identifier = f"ip:{client_ip}"
-        limit = 10  # Much lower limit for unauthenticated requests
-    
-    # Check rate limit
-    rate_info = await rate_limiter.is_allowed(identifier, limit)
-    
-    if rate_info.requests_remaining == 0:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Rate limit exceeded",
-            headers={
-                "X-RateLimit-Limit": str(rate_info.limit),
-                "X-RateLimit-Remaining": str(rate_info.requests_remaining),
-                "X-RateLimit-Reset": str(int(rate_info.reset_time.timestamp()))
-            }
-        )
-    
-    # Add rate limit headers to response (this would be handled by middleware in practice)
-    logger.debug(f"Rate limit check for {identifier}: {rate_info.requests_remaining} remaining")
-
 async def optional_authentication(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[Dict[str, Any]]:
     """
     Optional authentication - returns user data if authenticated, None otherwise
@@ -330,19 +284,20 @@ class APIKeyRequest(BaseModel):
 
 class APIKeyResponse(BaseModel):
     api_key: str
+    key_id: str  # For listing and revocation
     agent_name: str
     permissions: List[str]
     expires_at: Optional[str] = None
 
 # Utility functions for authentication endpoints
-def authenticate_agent_with_certificate(agent_name: str, certificate_pem: str, db: Session) -> Agent:
+async def authenticate_agent_with_certificate(agent_name: str, certificate_pem: str, db: AsyncSession) -> Agent:
     """
     Authenticate an agent using their certificate
     """
-    agent = db.query(Agent).filter(
+    agent = await db.scalar(select(Agent).where(
         Agent.agent_name == agent_name,
         Agent.active == True
-    ).first()
+    ))
     
     if not agent:
         raise HTTPException(
@@ -4,17 +4,19 @@ Authentication endpoints for ParkBench API
 Provides endpoints for agent login, API key generation, and authentication management.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, status, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
+from typing import Optional
 import logging
 
-from db.models import get_db
+from db.models import get_async_db, Agent, APIKey
 from config.settings import get_settings
 from .auth import (
     LoginRequest, LoginResponse, APIKeyRequest, APIKeyResponse,
     authenticate_agent_with_certificate, create_access_token, generate_api_key,
-    get_current_user, require_permission, rate_limit_middleware, api_keys
+    revoke_api_key as revoke_stored_api_key, get_current_user, require_permission
 )
 
 logger = logging.getLogger(__name__)
@@ -24,7 +26,7 @@ router = APIRouter()
 @router.post("/login", response_model=LoginResponse)
 async def login(
     request: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Authenticate an agent using their certificate and get a JWT token
@@ -34,7 +36,7 @@ async def login(
         # In production, you'd want stricter rate limiting for login
         
         # Authenticate agent with certificate
-        agent = authenticate_agent_with_certificate(
+        agent = await authenticate_agent_with_certificate(
             request.agent_name, 
             request.certificate_pem, 
             db
@@ -77,18 +79,17 @@ async def login(
 async def generate_api_key_endpoint(
     request: APIKeyRequest,
     current_user: dict = Depends(require_permission("admin")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Generate a new API key for an agent (requires admin permission)
     """
     try:
         # Verify the target agent exists
-        from db.models import Agent
-        agent = db.query(Agent).filter(
+        agent = await db.scalar(select(Agent.agent_id).where(
             Agent.agent_name == request.agent_name,
             Agent.active == True
-        ).first()
+        ))
         
         if not agent:
             raise HTTPException(
@@ -97,18 +98,18 @@ async def generate_api_key_endpoint(
             )
         
         # Generate API key
-        api_key = generate_api_key(
+        api_key, key_data = await generate_api_key(
+            db,
             agent_name=request.agent_name,
             permissions=request.permissions,
             expires_hours=request.expires_hours
         )
         
-        key_data = api_keys[api_key]
-        
         logger.info(f"API key generated for {request.agent_name} by {current_user['agent_name']}")
         
         return APIKeyResponse(
             api_key=api_key,
+            key_id=key_data.key_id,
             agent_name=request.agent_name,
             permissions=request.permissions,
             expires_at=key_data.expires_at.isoformat() if key_data.expires_at else None
@@ -140,15 +141,21 @@ async def get_current_user_info(
 
 @router.get("/api-keys")
 async def list_api_keys(
-    current_user: dict = Depends(require_permission("admin"))
+    agent_name: Optional[str] = Query(None, description="Only keys issued to this agent"),
+    current_user: dict = Depends(require_permission("admin")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List all API keys (admin only)
+    List API keys, optionally for one agent (admin only)
     """
+    query = select(APIKey).order_by(APIKey.created_at)
+    if agent_name:
+        query = query.where(APIKey.agent_name == agent_name)
+    
     keys_info = []
     
-    for api_key, key_data in api_keys.items():
-        # Don't expose the actual key, just metadata
+    for key_data in (await db.scalars(query)).all():
+        # Only the hash of the key is stored; expose metadata
         keys_info.append({
             "key_id": key_data.key_id,
             "agent_name": key_data.agent_name,
@@ -166,17 +173,15 @@ async def list_api_keys(
 @router.delete("/api-keys/{key_id}")
 async def revoke_api_key(
     key_id: str,
-    current_user: dict = Depends(require_permission("admin"))
+    current_user: dict = Depends(require_permission("admin")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Revoke an API key (admin only)
+    Revoke an API key in every worker (admin only)
     """
-    # Find and remove the API key
-    for api_key, key_data in list(api_keys.items()):
-        if key_data.key_id == key_id:
-            del api_keys[api_key]
-            logger.info(f"API key {key_id} revoked by {current_user['agent_name']}")
-            return {"message": f"API key {key_id} revoked successfully"}
+    if await revoke_stored_api_key(db, key_id):
+        logger.info(f"API key {key_id} revoked by {current_user['agent_name']}")
+        return {"message": f"API key {key_id} revoked successfully"}
     
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
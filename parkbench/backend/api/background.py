@@ -0,0 +1,119 @@
+"""
+Background tasks for ParkBench API
+
+PeriodicTask runs an async job on the application's event loop at a fixed
+interval and keeps counters (runs, errors, last result, progress of the
+current run) for the metrics endpoint. Every uvicorn worker runs its own
+copy, so jobs must be safe to run concurrently from several processes.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# A job receives a dict it may update with progress while it runs, and returns its result counts
+Job = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# All tasks by name, for the metrics endpoint
+_registry: Dict[str, "PeriodicTask"] = {}
+
+class PeriodicTask:
+    """Runs job every interval_seconds (measured from the end of the previous run) until stopped"""
+
+    def __init__(self, name: str, job: Job, interval_seconds: float, initial_delay_seconds: float = 0,
+                 cumulative: Sequence[str] = ()):
+        self.name = name
+        self.job = job
+        self.interval_seconds = interval_seconds
+        self.initial_delay_seconds = initial_delay_seconds
+        self.runs = 0
+        self.errors = 0
+        self.cumulative = tuple(cumulative)  # Result keys summed over all runs into totals
+        self.totals: Dict[str, int] = {key: 0 for key in self.cumulative}
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self.last_started_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.progress: Optional[Dict[str, Any]] = None  # Set while a run is in progress
+        self._task: Optional[asyncio.Task] = None
+        _registry[name] = self
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Schedule the task on the running event loop (no-op if already started)"""
+        if not self.running:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Run the job now, recording the outcome; exceptions propagate to the caller"""
+        self.progress = {}
+        self.last_started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        try:
+            result = await self.job(self.progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.last_duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            self.progress = None
+
+        self.runs += 1
+        self.last_result = result
+        self.last_error = None
+        for key in self.cumulative:
+            self.totals[key] += result.get(key) or 0
+        return result
+
+    async def _loop(self) -> None:
+        await asyncio.sleep(self.initial_delay_seconds)
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Background task {self.name} failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "errors": self.errors,
+            "in_progress": self.progress,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_duration_ms": self.last_duration_ms,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "totals": self.totals
+        }
+
+def all_task_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every background task created in this process"""
+    return {name: task.stats() for name, task in _registry.items()}
+
+async def stop_all() -> None:
+    for task in _registry.values():
+        await task.stop()
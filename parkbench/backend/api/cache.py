@@ -0,0 +1,141 @@
+"""
+In-process caches for ParkBench API
+
+Provides a small bounded LRU cache with per-entry expiry and hit/miss
+counters, plus the shared agent profile / A2A descriptor caches used by the
+discovery endpoints, the parsed-certificate cache used by registration and
+the verified API key and principal caches used by authentication.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from config.settings import get_settings
+
+# All caches by name, for the metrics endpoint
+_registry: Dict[str, "TTLCache"] = {}
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire after a time-to-live
+
+    A maxsize of 0 disables the cache: every get is a miss and set is a no-op.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl_seconds: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _registry[name] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss or an expired entry"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value; ttl_seconds overrides the cache default for this entry"""
+        if not self.enabled:
+            return
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+        }
+
+def all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every cache created in this process"""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+def _agent_cache(name: str) -> TTLCache:
+    settings = get_settings()
+    maxsize = settings.agent_cache_max_entries if settings.agent_cache_enabled else 0
+    return TTLCache(name, maxsize=maxsize, ttl_seconds=settings.agent_cache_ttl_seconds)
+
+# Serialized JSON bodies (with ETags) of GET /agents/{name} and GET /agents/{name}/a2a, keyed by agent_name;
+# see discovery.invalidate_agents
+agent_profile_cache = _agent_cache("agent_profiles")
+agent_descriptor_cache = _agent_cache("agent_descriptors")
+
+# CertificateInfo results keyed by (SHA-256 certificate fingerprint, agent_name); see registration.validate_certificate
+certificate_cache = TTLCache(
+    "certificates",
+    maxsize=get_settings().certificate_cache_max_entries,
+    ttl_seconds=get_settings().certificate_cache_ttl_seconds
+)
+
+# APIKeyData of verified keys, keyed by the key's SHA-256 hash; see auth.verify_api_key
+api_key_cache = TTLCache(
+    "api_keys",
+    maxsize=get_settings().api_key_cache_max_entries,
+    ttl_seconds=get_settings().api_key_cache_ttl_seconds
+)
+
+# Hashes of keys that matched no row (value True), so repeated bad keys cost no query; see auth.verify_api_key.
+# New keys are random, so none can have been cached here before it was created.
+unknown_api_key_cache = TTLCache(
+    "unknown_api_keys",
+    maxsize=get_settings().api_key_cache_max_entries,
+    ttl_seconds=get_settings().unknown_api_key_cache_ttl_seconds
+)
+
+# agent_id (str) of active agents, keyed by agent_name; see auth.active_agent_id
+principal_cache = TTLCache(
+    "principals",
+    maxsize=get_settings().principal_cache_max_entries,
+    ttl_seconds=get_settings().principal_cache_ttl_seconds
+)
@@ -1,17 +1,44 @@
 # Placeholder for discovery API logic
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy import and_, or_, select, tuple_, any_, literal, cast, String, func
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, REGCONFIG
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, NamedTuple, Literal, Sequence, Union
+import hashlib
 import json
 
-from db.models import get_db, Agent
+from db.models import get_async_db, get_read_db, Agent, AgentSkill, AgentProtocol, TEXT_SEARCH_CONFIG
 from config.settings import get_settings
+from .pagination import decode_cursor, decode_rank_cursor, encode_rank_cursor, split_page, NEXT_CURSOR_HEADER
+from .cache import agent_profile_cache, agent_descriptor_cache
+from .invalidation import notify_many, register_cache, subscribe
 
 router = APIRouter()
 
+# Name of the cross-worker notification carrying agent names whose profile and descriptor changed
+AGENT_INVALIDATION = "agents"
+
+def evict_agent(agent_name: str) -> None:
+    agent_profile_cache.invalidate(agent_name)
+    agent_descriptor_cache.invalidate(agent_name)
+
+# Registered so both are cleared when the invalidation listener reconnects
+register_cache(agent_profile_cache)
+register_cache(agent_descriptor_cache)
+subscribe(AGENT_INVALIDATION, evict_agent)
+
+async def invalidate_agents(db: AsyncSession, agent_names: Sequence[str]) -> None:
+    """
+    Drop cached profiles and descriptors of agents in this worker now, and in
+    every worker once db's transaction commits (call before committing)
+    """
+    for agent_name in agent_names:
+        evict_agent(agent_name)
+    await notify_many(db, AGENT_INVALIDATION, agent_names)
+
 # Pydantic models for responses
 class AgentSearchResult(BaseModel):
     agent_id: str
@@ -23,6 +50,7 @@ class AgentSearchResult(BaseModel):
     verified: bool
     active: bool
     api_endpoint: str
+    score: Optional[float] = None  # Relevance in [0, 1), full-text searches only
 
 class AgentProfile(BaseModel):
     agent_id: str
@@ -41,22 +69,90 @@ class A2ADescriptorResponse(BaseModel):
     context_required: List[str]
     token_budget: int
 
-@router.get("/agents/search", response_model=List[AgentSearchResult])
-async def search_agents(
-    skill: Optional[str] = Query(None, description="Filter by skill"),
-    protocol: Optional[str] = Query(None, description="Filter by protocol"),
-    a2a_compliant: Optional[bool] = Query(None, description="Filter by A2A compliance"),
-    verified: Optional[bool] = Query(None, description="Filter by verification status"),
-    active: Optional[bool] = Query(True, description="Filter by active status"),
-    limit: int = Query(50, le=100, description="Maximum number of results"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: Session = Depends(get_db)
-):
-    """Search for agents based on criteria"""
+BatchInclude = Literal["profile", "a2a"]
+
+class AgentBatchRequest(BaseModel):
+    agent_names: List[str] = Field(..., min_length=1)
+    include: List[BatchInclude] = ["profile", "a2a"]
+
+class AgentBatchItem(BaseModel):
+    profile: Optional[AgentProfile] = None
+    a2a: Optional[A2ADescriptorResponse] = None  # None if not requested, inactive, or no descriptor
+
+class AgentBatchResponse(BaseModel):
+    agents: Dict[str, AgentBatchItem]
+    not_found: List[str]
+
+# Everything AgentSearchResult serializes, and nothing more: list views never
+# load certificate_pem or the full metadata document, only these JSON sub-keys
+AGENT_SUMMARY_COLUMNS = (
+    Agent.agent_id,
+    Agent.agent_name,
+    Agent.verified,
+    Agent.active,
+    Agent.created_at,  # Pagination sort key
+    Agent.agent_metadata['description'].astext.label('description'),
+    Agent.agent_metadata['skills'].label('skills'),
+    Agent.agent_metadata['protocols'].label('protocols'),
+    Agent.agent_metadata['a2a_compliant'].label('a2a_compliant'),
+    Agent.agent_metadata['api_endpoint'].astext.label('api_endpoint'),
+)
+
+def to_search_result(row) -> AgentSearchResult:
+    """Build a search result from an AGENT_SUMMARY_COLUMNS row"""
+    return AgentSearchResult(
+        agent_id=str(row.agent_id),
+        agent_name=row.agent_name,
+        description=row.description or '',
+        skills=row.skills or [],
+        protocols=row.protocols or [],
+        a2a_compliant=bool(row.a2a_compliant),
+        verified=row.verified,
+        active=row.active,
+        api_endpoint=row.api_endpoint or '',
+        score=getattr(row, 'score', None)
+    )
+
+MatchMode = Literal["any", "all"]
+
+def capability_match(column, agent_id_column, active_column, values: Sequence[str], active: Optional[bool], match: MatchMode):
+    """
+    Agent ids having any / all of the given values in a capability side table
     
-    query = db.query(Agent)
+    "any" is a single IN probe on the (value, active, agent_id) index; "all"
+    groups the same probe by agent and keeps agents that hit every value
+    (the primary key makes (agent_id, value) unique, so a count suffices).
+    """
+    values = list(dict.fromkeys(values))
+    subquery = select(agent_id_column).where(column.in_(values))
+    if active is not None:
+        subquery = subquery.where(active_column == active)
+    if match == "all" and len(values) > 1:
+        subquery = subquery.group_by(agent_id_column).having(func.count() == len(values))
+    return Agent.agent_id.in_(subquery)
+
+def as_value_list(value: Union[str, Sequence[str], None]) -> List[str]:
+    """Accept a single filter value or a list of them, dropping blanks"""
+    values = [value] if isinstance(value, str) else list(value or [])
+    return [item for item in values if item]
+
+def build_agent_search_filters(
+    skill: Union[str, Sequence[str], None] = None,
+    protocol: Union[str, Sequence[str], None] = None,
+    a2a_compliant: Optional[bool] = None,
+    verified: Optional[bool] = None,
+    active: Optional[bool] = None,
+    match: MatchMode = "any"
+) -> list:
+    """
+    Build the WHERE clauses for an agent search
     
-    # Apply filters
+    Skill and protocol filters probe the B-tree indexes on the normalized
+    agent_skills / agent_protocols tables; several values combine according
+    to match ("any" or "all"), and the skill and protocol filters are ANDed.
+    The a2a_compliant flag is a JSONB containment (@>) test answered from the
+    GIN index on agent_metadata.
+    """
     filters = []
     
     if active is not None:
@@ -66,56 +162,127 @@ async def search_agents(
         filters.append(Agent.verified == verified)
     
     if a2a_compliant is not None:
-        from sqlalchemy import Boolean
-        filters.append(Agent.agent_metadata['a2a_compliant'].astext.cast(Boolean) == a2a_compliant)
+        filters.append(Agent.agent_metadata.contains({'a2a_compliant': a2a_compliant}))
     
-    if skill:
-        # Search in skills array within metadata
-        filters.append(Agent.agent_metadata['skills'].astext.contains(f'"{skill}"'))
+    skills = as_value_list(skill)
+    if skills:
+        filters.append(capability_match(
+            AgentSkill.skill, AgentSkill.agent_id, AgentSkill.active, skills, active, match
+        ))
     
-    if protocol:
-        # Search in protocols array within metadata
-        filters.append(Agent.agent_metadata['protocols'].astext.contains(f'"{protocol}"'))
+    protocols = as_value_list(protocol)
+    if protocols:
+        filters.append(capability_match(
+            AgentProtocol.protocol, AgentProtocol.agent_id, AgentProtocol.active, protocols, active, match
+        ))
     
-    if filters:
-        query = query.filter(and_(*filters))
+    return filters
+
+async def paginate_agents(db: AsyncSession, query, limit: int, offset: int, cursor: Optional[str], response: Response) -> list:
+    """
+    Fetch one page of agents ordered by (created_at, agent_id)
     
-    # Apply pagination
-    agents = query.offset(offset).limit(limit).all()
+    With a cursor the page starts right after the cursor's row (keyset
+    pagination); offset is only honoured for callers that have not moved to
+    cursors yet. The cursor for the following page is returned in the
+    X-Next-Cursor response header.
+    """
+    if cursor:
+        created_at, agent_id = decode_cursor(cursor)
+        query = query.where(tuple_(Agent.created_at, Agent.agent_id) > tuple_(created_at, agent_id))
+    elif offset:
+        query = query.offset(offset)
     
-    # Convert to response format
-    results = []
-    for agent in agents:
-        metadata = agent.agent_metadata
-        results.append(AgentSearchResult(
-            agent_id=str(agent.agent_id),
-            agent_name=agent.agent_name,
-            description=metadata.get('description', ''),
-            skills=metadata.get('skills', []),
-            protocols=metadata.get('protocols', []),
-            a2a_compliant=metadata.get('a2a_compliant', False),
-            verified=agent.verified,
-            active=agent.active,
-            api_endpoint=metadata.get('api_endpoint', '')
-        ))
+    rows = (await db.execute(query.order_by(Agent.created_at, Agent.agent_id).limit(limit + 1))).all()
+    agents, next_cursor = split_page(rows, limit, "created_at", "agent_id")
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
-    return results
+    return agents
 
-@router.get("/agents/{agent_name}", response_model=AgentProfile)
-async def get_agent_profile(
-    agent_name: str,
-    db: Session = Depends(get_db)
+def build_text_search(q: str):
+    """
+    Match clause and relevance expression for a full-text query
+    
+    The match is answered from the GIN index on agents.search_vector. The
+    rank is cast to double precision so the value handed to clients in a
+    cursor compares exactly equal when sent back.
+    """
+    tsquery = func.websearch_to_tsquery(cast(TEXT_SEARCH_CONFIG, REGCONFIG), q)
+    # Normalization 32 maps the cover-density rank into [0, 1)
+    rank = cast(func.ts_rank_cd(Agent.search_vector, tsquery, 32), DOUBLE_PRECISION)
+    return Agent.search_vector.op("@@")(tsquery), rank
+
+async def paginate_ranked(db: AsyncSession, query, rank, limit: int, offset: int, cursor: Optional[str], response: Response) -> list:
+    """
+    Fetch one page of full-text matches, best first, ordered by (score desc, agent_id)
+    
+    Cursors carry the (score, agent_id) of the last row, like paginate_agents.
+    """
+    if cursor:
+        score, agent_id = decode_rank_cursor(cursor)
+        query = query.where(or_(rank < score, and_(rank == score, Agent.agent_id > agent_id)))
+    elif offset:
+        query = query.offset(offset)
+    
+    rows = (await db.execute(query.order_by(rank.desc(), Agent.agent_id).limit(limit + 1))).all()
+    agents, next_cursor = split_page(rows, limit, "score", "agent_id", encode=encode_rank_cursor)
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    return agents
+
+@router.get("/agents/search", response_model=List[AgentSearchResult], response_model_exclude_none=True)
+async def search_agents(
+    response: Response,
+    q: Optional[str] = Query(None, min_length=1, max_length=256,
+                             description="Full-text query over descriptions, skills and supported tasks (results ranked by relevance)"),
+    skill: Optional[List[str]] = Query(None, description="Filter by skill (repeatable)"),
+    protocol: Optional[List[str]] = Query(None, description="Filter by protocol (repeatable)"),
+    match: MatchMode = Query("any", description="Whether agents need any or all of the given skills/protocols"),
+    a2a_compliant: Optional[bool] = Query(None, description="Filter by A2A compliance"),
+    verified: Optional[bool] = Query(None, description="Filter by verification status"),
+    active: Optional[bool] = Query(True, description="Filter by active status"),
+    limit: int = Query(50, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, description="Offset for pagination (deprecated, use cursor)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get an agent's complete profile"""
+    """Search for agents based on criteria, optionally ranked by a full-text query"""
     
-    agent = db.query(Agent).filter(Agent.agent_name == agent_name).first()
+    rank = None
+    if q:
+        text_match, rank = build_text_search(q)
+        query = select(*AGENT_SUMMARY_COLUMNS, rank.label('score')).where(text_match)
+    else:
+        query = select(*AGENT_SUMMARY_COLUMNS)
     
-    if not agent:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Agent '{agent_name}' not found"
-        )
+    # Apply filters
+    filters = build_agent_search_filters(
+        skill=skill,
+        protocol=protocol,
+        a2a_compliant=a2a_compliant,
+        verified=verified,
+        active=active,
+        match=match
+    )
     
+    if filters:
+        query = query.where(and_(*filters))
+    
+    # Apply pagination
+    if rank is not None:
+        agents = await paginate_ranked(db, query, rank, limit, offset, cursor, response)
+    else:
+        agents = await paginate_agents(db, query, limit, offset, cursor, response)
+    
+    # Convert to response format
+    return [to_search_result(row) for row in agents]
+
+def build_agent_profile(agent: Agent) -> AgentProfile:
+    """Profile response for an agent row"""
     return AgentProfile(
         agent_id=str(agent.agent_id),
         agent_name=agent.agent_name,
@@ -127,32 +294,19 @@ async def get_agent_profile(
         updated_at=agent.updated_at.isoformat()
     )
 
-@router.get("/agents/{agent_name}/a2a", response_model=A2ADescriptorResponse)
-async def get_agent_a2a_descriptor(
-    agent_name: str,
-    db: Session = Depends(get_db)
-):
-    """Get A2A descriptors for an agent"""
-    
-    agent = db.query(Agent).filter(Agent.agent_name == agent_name).first()
-    
-    if not agent:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Agent '{agent_name}' not found"
-        )
-    
+def build_a2a_descriptor(agent: Agent) -> A2ADescriptorResponse:
+    """A2A descriptor response for an agent row (410/404 if inactive or missing)"""
     if not agent.active:
         raise HTTPException(
             status_code=410,
-            detail=f"Agent '{agent_name}' is not active"
+            detail=f"Agent '{agent.agent_name}' is not active"
         )
     
     a2a_metadata = agent.agent_metadata.get('a2a')
     if not a2a_metadata:
         raise HTTPException(
             status_code=404,
-            detail=f"Agent '{agent_name}' does not have A2A descriptors"
+            detail=f"Agent '{agent.agent_name}' does not have A2A descriptors"
         )
     
     return A2ADescriptorResponse(
@@ -163,35 +317,153 @@ async def get_agent_a2a_descriptor(
         token_budget=a2a_metadata.get('token_budget', 0)
     )
 
+async def lookup_agents_batch(db: AsyncSession, agent_names: List[str], include: List[str]) -> AgentBatchResponse:
+    """
+    Resolve many agents with a single WHERE agent_name = ANY(:names) query
+    
+    Names are de-duplicated and passed as one array parameter, so the statement
+    is the same for every batch size. Descriptor-only lookups skip loading
+    certificate_pem.
+    """
+    names = list(dict.fromkeys(name for name in agent_names if name))
+    max_names = get_settings().max_agents_per_batch
+    if not names:
+        raise HTTPException(status_code=400, detail="At least one agent name is required")
+    if len(names) > max_names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {max_names} agent names can be requested per batch"
+        )
+    
+    query = select(Agent).where(Agent.agent_name == any_(literal(names, ARRAY(String))))
+    if "profile" not in include:
+        query = query.options(load_only(Agent.agent_name, Agent.active, Agent.agent_metadata))
+    
+    found = {}
+    for agent in (await db.scalars(query)).all():
+        item = AgentBatchItem()
+        if "profile" in include:
+            item.profile = build_agent_profile(agent)
+        if "a2a" in include:
+            try:
+                item.a2a = build_a2a_descriptor(agent)
+            except HTTPException:
+                pass  # Inactive or no descriptor; the single-agent endpoint reports why
+        found[agent.agent_name] = item
+    
+    return AgentBatchResponse(
+        agents={name: found[name] for name in names if name in found},
+        not_found=[name for name in names if name not in found]
+    )
+
+class CachedBody(NamedTuple):
+    """A serialized response body and its strong ETag"""
+    body: bytes
+    etag: str
+
+def make_cached_body(model: BaseModel, updated_at: str) -> CachedBody:
+    """Serialize a response model and derive its ETag from updated_at plus a content hash"""
+    body = model.model_dump_json().encode()
+    digest = hashlib.sha256(updated_at.encode() + b"\0" + body).hexdigest()[:32]
+    return CachedBody(body=body, etag=f'"{digest}"')
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for this header)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def conditional_response(entry: CachedBody, if_none_match: Optional[str]) -> Response:
+    """200 with the cached body, or a bodiless 304 if the client already has it"""
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+# Registered before /agents/{agent_name} so "batch" is not taken for an agent name
+@router.get("/agents/batch", response_model=AgentBatchResponse)
+async def get_agents_batch(
+    names: Optional[List[str]] = Query(None, description="Agent names (repeat the parameter)"),
+    include: List[BatchInclude] = Query(["profile", "a2a"], description="Parts to return"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get profiles and/or A2A descriptors for several agents in one request"""
+    return await lookup_agents_batch(db, names or [], include)
+
+@router.post("/agents/batch", response_model=AgentBatchResponse)
+async def post_agents_batch(
+    request: AgentBatchRequest,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Batch lookup with the names in the request body (for long name lists)"""
+    return await lookup_agents_batch(db, request.agent_names, request.include)
+
+@router.get("/agents/{agent_name}", response_model=AgentProfile)
+async def get_agent_profile(
+    agent_name: str,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_async_db)  # Fills the cache; a lagging replica would pin a stale body for the TTL
+):
+    """Get an agent's complete profile (supports ETag / If-None-Match)"""
+    
+    # Read-through cache of the serialized profile; invalidated in every worker by invalidate_agents().
+    # A cached entry answers conditional requests without touching the database.
+    entry = agent_profile_cache.get(agent_name)
+    if entry is None:
+        agent = await db.scalar(select(Agent).where(Agent.agent_name == agent_name))
+        
+        if not agent:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Agent '{agent_name}' not found"
+            )
+        
+        entry = make_cached_body(build_agent_profile(agent), agent.updated_at.isoformat())
+        agent_profile_cache.set(agent_name, entry)
+    
+    return conditional_response(entry, if_none_match)
+
+@router.get("/agents/{agent_name}/a2a", response_model=A2ADescriptorResponse)
+async def get_agent_a2a_descriptor(
+    agent_name: str,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_async_db)  # Fills the cache; a lagging replica would pin a stale body for the TTL
+):
+    """Get A2A descriptors for an agent (supports ETag / If-None-Match)"""
+    
+    entry = agent_descriptor_cache.get(agent_name)
+    if entry is None:
+        agent = await db.scalar(select(Agent).where(Agent.agent_name == agent_name))
+        
+        if not agent:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Agent '{agent_name}' not found"
+            )
+        
+        entry = make_cached_body(build_a2a_descriptor(agent), agent.updated_at.isoformat())
+        agent_descriptor_cache.set(agent_name, entry)
+    
+    return conditional_response(entry, if_none_match)
+
 @router.get("/agents", response_model=List[AgentSearchResult])
 async def list_all_agents(
+    response: Response,
     active_only: bool = Query(True, description="Only return active agents"),
-    limit: int = Query(50, le=100, description="Maximum number of results"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, description="Offset for pagination (deprecated, use cursor)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List all agents (with optional filtering)"""
     
-    query = db.query(Agent)
+    query = select(*AGENT_SUMMARY_COLUMNS)
     
     if active_only:
-        query = query.filter(Agent.active == True)
-    
-    agents = query.offset(offset).limit(limit).all()
-    
-    results = []
-    for agent in agents:
-        metadata = agent.agent_metadata
-        results.append(AgentSearchResult(
-            agent_id=str(agent.agent_id),
-            agent_name=agent.agent_name,
-            description=metadata.get('description', ''),
-            skills=metadata.get('skills', []),
-            protocols=metadata.get('protocols', []),
-            a2a_compliant=metadata.get('a2a_compliant', False),
-            verified=agent.verified,
-            active=agent.active,
-            api_endpoint=metadata.get('api_endpoint', '')
-        ))
+        query = query.where(Agent.active == True)
+    
+    agents = await paginate_agents(db, query, limit, offset, cursor, response)
     
-    return results
+    return [to_search_result(row) for row in agents]
@@ -0,0 +1,103 @@
+"""
+Certificate expiry sweep for ParkBench API
+
+Clears Agent.verified once certificate_not_after has passed, in batches,
+using the stored certificate columns (no PEM parsing) and the partial index
+on verified agents' not_after. Renewing with a valid certificate sets
+verified again. Also counts agents whose certificates expire soon.
+
+Each sweep first fills the certificate columns of agents registered before
+they existed (a no-op once done), so those agents can expire too.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Any, Dict
+
+from sqlalchemy import func, select, update
+
+from config.settings import get_settings
+from db.models import get_async_db, Agent
+from .background import PeriodicTask
+from .discovery import invalidate_agents
+from .registration import backfill_certificate_columns
+
+logger = logging.getLogger(__name__)
+
+def expired_agents(batch_size: int):
+    """
+    Up to batch_size verified agents whose certificates have expired, oldest first
+
+    SKIP LOCKED lets several workers sweep at once without waiting on each other.
+    """
+    return (
+        select(Agent.agent_id)
+        .where(Agent.verified, Agent.certificate_not_after <= func.now())  # Bare column: matches the partial index predicate
+        .order_by(Agent.certificate_not_after)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+def expired_agents_batch(batch_size: int):
+    """UPDATE clearing verified for one batch of expired_agents(), returning their names"""
+    return (
+        update(Agent)
+        .where(Agent.agent_id.in_(expired_agents(batch_size).scalar_subquery()))
+        .values(verified=False)
+        .returning(Agent.agent_name)
+        .execution_options(synchronize_session=False)
+    )
+
+def expiring_agents_count(within: timedelta):
+    """Verified agents whose certificates expire in the next `within`"""
+    return (
+        select(func.count())
+        .select_from(Agent)
+        .where(
+            Agent.verified,
+            Agent.certificate_not_after > func.now(),
+            Agent.certificate_not_after <= func.now() + within
+        )
+    )
+
+async def sweep_expired_certificates(progress: Dict[str, Any]) -> Dict[str, Any]:
+    """One sweep: backfill certificate columns, unverify expired agents batch by batch (one commit each), then count the ones expiring soon"""
+    settings = get_settings()
+    batch_size = settings.certificate_expiry_sweep_batch_size
+    progress.update(batches=0, unverified=0)
+
+    async for db in get_async_db():
+        backfilled, unparseable = await backfill_certificate_columns(db, batch_size)
+        if backfilled or unparseable:
+            logger.info(f"Backfilled certificate columns for {backfilled} agents ({unparseable} certificates did not parse)")
+
+        while True:
+            names = (await db.scalars(expired_agents_batch(batch_size))).all()
+            await invalidate_agents(db, names)
+            await db.commit()
+
+            progress["batches"] += 1
+            progress["unverified"] += len(names)
+            if len(names) < batch_size:
+                break
+
+        expiring = await db.scalar(expiring_agents_count(timedelta(days=settings.certificate_expiry_warning_days)))
+
+    if progress["unverified"]:
+        logger.info(f"Certificate expiry sweep: {progress['unverified']} agents no longer verified")
+
+    return {
+        "unverified": progress["unverified"],
+        "batches": progress["batches"],
+        "expiring_soon": expiring,
+        "backfilled": backfilled,
+        "unparseable": unparseable
+    }
+
+certificate_expiry_sweeper = PeriodicTask(
+    "certificate_expiry_sweep",
+    sweep_expired_certificates,
+    interval_seconds=get_settings().certificate_expiry_sweep_interval_seconds,
+    initial_delay_seconds=5,  # Let startup finish (schema upgrade) first
+    cumulative=("unverified", "batches", "backfilled", "unparseable")
+)
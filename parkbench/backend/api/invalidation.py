@@ -0,0 +1,125 @@
+"""
+Cross-worker cache invalidation for ParkBench API
+
+Each worker keeps one asyncpg connection LISTENing on a notification
+channel. A writer calls notify_invalidation() inside its transaction;
+Postgres delivers the notification to every worker when it commits, and
+each drops the key from its own copy of the cache. Notifications sent while
+a worker is not listening are lost, so registered caches are cleared
+whenever the listener (re)connects; their TTLs bound staleness while it is
+down.
+
+Other per-worker state can subscribe() to a name to receive its keys, e.g.
+the session token denylist, which adds revoked sessions rather than
+dropping entries.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import asyncpg
+from sqlalchemy import Text, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import get_settings
+from .background import PeriodicTask
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "parkbench_cache_invalidation"
+
+# Caches other workers may invalidate, by name
+_caches: Dict[str, TTLCache] = {}
+
+def register_cache(cache: TTLCache) -> TTLCache:
+    """Make a cache invalidatable from other workers; its keys must be strings"""
+    _caches[cache.name] = cache
+    return cache
+
+# Callbacks for other notifications, by name
+_subscribers: Dict[str, Callable[[str], None]] = {}
+
+def subscribe(name: str, callback: Callable[[str], None]) -> None:
+    """Call callback(key) in every worker for each notify(db, name, key)"""
+    _subscribers[name] = callback
+
+async def notify(db: AsyncSession, name: str, key: str) -> None:
+    """Deliver key to every worker's subscriber (or cache) for name once db's transaction commits"""
+    await db.execute(select(func.pg_notify(CHANNEL, f"{name}:{key}")))
+
+async def notify_many(db: AsyncSession, name: str, keys: Sequence[str]) -> None:
+    """notify() for several keys in one statement"""
+    if not keys:
+        return
+    payloads = func.unnest(bindparam("keys", list(keys), type_=ARRAY(Text)))
+    await db.execute(select(func.pg_notify(CHANNEL, func.concat(f"{name}:", payloads))))
+
+async def notify_invalidation(db: AsyncSession, cache: TTLCache, key: str) -> None:
+    """Drop key from cache in this worker now, and in every worker once db's transaction commits"""
+    cache.invalidate(key)
+    await notify(db, cache.name, key)
+
+class InvalidationListener:
+    """Holds the LISTEN connection; check() is run periodically to (re)connect it"""
+
+    def __init__(self, dsn: Optional[str] = None, check_timeout_seconds: float = 2.0):
+        self.dsn = dsn
+        self.check_timeout_seconds = check_timeout_seconds
+        self.connection: Optional[asyncpg.Connection] = None
+        self._received = 0
+
+    def _dsn(self) -> str:
+        # asyncpg takes a plain libpq URL
+        url = make_url(get_settings().database_url.replace("postgres://", "postgresql://", 1))
+        return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        name, _, key = payload.partition(":")
+        cache = _caches.get(name)
+        if cache is not None:
+            cache.invalidate(key)
+        elif name in _subscribers:
+            _subscribers[name](key)
+        self._received += 1
+
+    async def check(self, progress: Dict[str, Any]) -> Dict[str, Any]:
+        """PeriodicTask job: ping the connection, reconnecting (and clearing caches) if it is gone"""
+        if self.connection is not None:
+            try:
+                await asyncio.wait_for(self.connection.fetchval("SELECT 1"), timeout=self.check_timeout_seconds)
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener lost its connection: {e}")
+                await self.close()
+
+        connects = 0
+        if self.connection is None:
+            connection = await asyncpg.connect(self.dsn or self._dsn(), timeout=10)
+            await connection.add_listener(CHANNEL, self._on_notification)
+            self.connection = connection
+            for cache in _caches.values():
+                cache.clear()
+            connects = 1
+
+        received, self._received = self._received, 0
+        return {"connected": True, "connects": connects, "notifications": received}
+
+    async def close(self) -> None:
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            try:
+                await connection.close(timeout=self.check_timeout_seconds)
+            except Exception:
+                connection.terminate()
+
+listener = InvalidationListener()
+
+invalidation_listener_task = PeriodicTask(
+    "cache_invalidation_listener",
+    listener.check,
+    interval_seconds=get_settings().cache_invalidation_check_interval_seconds,
+    cumulative=("connects", "notifications")
+)
@@ -0,0 +1,54 @@
+"""
+Internal metrics endpoint for ParkBench API
+
+Reports per-process counters (cache hit rates, connection pool occupancy and
+checkout waits, background task runs, rate limiter decisions) for capacity
+planning. Each uvicorn worker reports its own numbers.
+
+The endpoint is for operators, not agents: it answers only requests bearing
+INTERNAL_METRICS_TOKEN, and 404 while that is not configured.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from typing import Dict, Any, Optional
+import os
+import secrets
+
+from config.settings import get_settings
+from db.models import database_pool_stats
+from .background import all_task_stats
+from .cache import all_cache_stats
+from .rate_limit import rate_limiter
+from .session_tokens import denylist
+
+router = APIRouter()
+
+metrics_security = HTTPBearer(auto_error=False)
+
+def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_security)) -> None:
+    """Allow only requests bearing INTERNAL_METRICS_TOKEN"""
+    expected = get_settings().internal_metrics_token
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    if credentials is None or not secrets.compare_digest(credentials.credentials.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+@router.get("/internal/metrics", dependencies=[Depends(require_metrics_token)], include_in_schema=False)
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Get in-process metrics for this worker
+    """
+    return {
+        "pid": os.getpid(),
+        "caches": all_cache_stats(),
+        "database_pools": database_pool_stats(),
+        "background_tasks": all_task_stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "session_denylist": denylist.stats()
+    }
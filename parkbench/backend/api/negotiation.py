@@ -1,13 +1,16 @@
 # Placeholder for negotiation API logic
 
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
 import uuid
 
-from db.models import get_db, Agent, A2ASession, SessionStatus
+from db.models import get_async_db, Agent, AgentTask, A2ASession, SessionStatus
 from .validation import validate_negotiation_request, validate_agent_name
+from .task_index import task_index, IndexedAgent
+from .session_tokens import create_session_token
 from config.settings import get_settings
 
 router = APIRouter()
@@ -44,15 +47,15 @@ class SessionInitiationResponse(BaseModel):
 @router.post("/a2a/negotiate", response_model=TaskNegotiationResponse)
 async def negotiate_task(
     request: TaskNegotiationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Negotiate a task with candidate agents"""
     
     # Verify initiating agent exists
-    initiating_agent = db.query(Agent).filter(
+    initiating_agent = await db.scalar(select(Agent.agent_id).where(
         Agent.agent_name == request.initiating_agent_name,
         Agent.active == True
-    ).first()
+    ))
     
     if not initiating_agent:
         raise HTTPException(
@@ -61,66 +64,67 @@ async def negotiate_task(
         )
     
     # Find candidate agents that support the requested task
-    # This is a simplified matching algorithm - in production, this would be more sophisticated
-    candidate_agents = db.query(Agent).filter(
-        Agent.active == True,
-        Agent.agent_name != request.initiating_agent_name  # Exclude self
-    ).all()
+    # The in-process task index only touches agents whose tasks can match
+    if not task_index.loaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Agent task index is not loaded yet"
+        )
     
-    candidates = []
-    for agent in candidate_agents:
-        metadata = agent.agent_metadata
-        a2a_data = metadata.get('a2a', {})
-        supported_tasks = a2a_data.get('supported_tasks', [])
+    preferred_budget = request.preferred_capabilities.get('token_budget', 0)
+    prefers_negotiation = request.preferred_capabilities.get('negotiation')
+    
+    def match_score(agent: IndexedAgent) -> float:
+        # Calculate a simple match score based on task relevance and capabilities
+        score = 0.8  # Base score for task match
+        
+        # Boost score for negotiation capability if preferred
+        if prefers_negotiation and agent.negotiation:
+            score += 0.1
         
-        # Simple task matching (contains check)
-        if any(request.requested_task.lower() in task.lower() for task in supported_tasks):
-            # Calculate a simple match score based on task relevance and capabilities
-            match_score = 0.8  # Base score for task match
-            
-            # Boost score for negotiation capability if preferred
-            if (request.preferred_capabilities.get('negotiation') and 
-                a2a_data.get('negotiation', False)):
-                match_score += 0.1
-            
-            # Boost score for adequate token budget
-            preferred_budget = request.preferred_capabilities.get('token_budget', 0)
-            agent_budget = a2a_data.get('token_budget', 0)
-            if agent_budget >= preferred_budget:
-                match_score += 0.1
-            
-            match_score = min(match_score, 1.0)  # Cap at 1.0
-            
-            candidates.append(CandidateAgent(
-                agentName=agent.agent_name,
-                matchScore=match_score,
-                supportedTasks=supported_tasks,
-                negotiation=a2a_data.get('negotiation', False),
-                tokenBudget=agent_budget
-            ))
+        # Boost score for adequate token budget
+        if agent.token_budget >= preferred_budget:
+            score += 0.1
+        
+        return min(score, 1.0)  # Cap at 1.0
+    
+    matches = task_index.top_k(
+        request.requested_task,
+        score=match_score,
+        k=10,  # Return top 10
+        exclude=request.initiating_agent_name  # Exclude self
+    )
     
-    # Sort by match score (highest first)
-    candidates.sort(key=lambda x: x.match_score, reverse=True)
+    candidates = [
+        CandidateAgent(
+            agentName=agent.agent_name,
+            matchScore=score,
+            supportedTasks=list(agent.supported_tasks),
+            negotiation=agent.negotiation,
+            tokenBudget=agent.token_budget
+        )
+        for agent, score in matches
+    ]
     
-    return TaskNegotiationResponse(candidateAgents=candidates[:10])  # Return top 10
+    return TaskNegotiationResponse(candidateAgents=candidates)
 
 @router.post("/a2a/session/initiate", response_model=SessionInitiationResponse)
 async def initiate_a2a_session(
     request: SessionInitiationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Initiate an A2A session"""
     
     # Verify both agents exist and are active
-    initiating_agent = db.query(Agent).filter(
+    initiating_agent = await db.scalar(select(Agent.agent_id).where(
         Agent.agent_name == request.initiating_agent_name,
         Agent.active == True
-    ).first()
+    ))
     
-    target_agent = db.query(Agent).filter(
+    target_agent_id = await db.scalar(select(Agent.agent_id).where(
         Agent.agent_name == request.target_agent_name,
         Agent.active == True
-    ).first()
+    ))
     
     if not initiating_agent:
         raise HTTPException(
@@ -128,18 +132,19 @@ async def initiate_a2a_session(
             detail=f"Initiating agent '{request.initiating_agent_name}' not found or inactive"
         )
     
-    if not target_agent:
+    if not target_agent_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Target agent '{request.target_agent_name}' not found or inactive"
         )
     
-    # Check if target agent supports the requested task
-    target_metadata = target_agent.agent_metadata
-    a2a_data = target_metadata.get('a2a', {})
-    supported_tasks = a2a_data.get('supported_tasks', [])
+    # Check if target agent supports the requested task (probe on agent_tasks primary key)
+    supports_task = await db.scalar(select(exists().where(
+        AgentTask.agent_id == target_agent_id,
+        AgentTask.task.contains(request.task.lower(), autoescape=True)
+    )))
     
-    if not any(request.task.lower() in task.lower() for task in supported_tasks):
+    if not supports_task:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Target agent does not support task '{request.task}'"
@@ -148,7 +153,9 @@ async def initiate_a2a_session(
     try:
         # Create new session
         session_id = uuid.uuid4()
-        session_token = f"pb_session_{session_id.hex}"  # Simple token format
+        session_token = create_session_token(
+            str(session_id), request.initiating_agent_name, request.target_agent_name, request.task
+        )
         
         new_session = A2ASession(
             session_id=session_id,
@@ -161,8 +168,7 @@ async def initiate_a2a_session(
         )
         
         db.add(new_session)
-        db.commit()
-        db.refresh(new_session)
+        await db.commit()
         
         return SessionInitiationResponse(
             sessionID=str(session_id),
@@ -171,8 +177,10 @@ async def initiate_a2a_session(
             targetAgent=request.target_agent_name
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to initiate session: {str(e)}"
@@ -0,0 +1,79 @@
+"""
+Keyset (cursor) pagination helpers for ParkBench list endpoints
+
+Cursors are opaque, URL-safe tokens that encode the sort key of the last row
+on a page, (created_at, id). The next page is fetched with a row-value
+comparison against that key, so every page is an index range scan no matter
+how deep the crawl goes. Ranked full-text results use (score, id) instead.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+
+# Response header carrying the cursor of the next page, set by every cursor-paginated list endpoint
+# (their bodies are bare lists where the original API returned one); exposed to browsers through CORS
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _encode(key: list) -> str:
+    payload = json.dumps(key, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    if not isinstance(key, list) or len(key) != 2:
+        raise ValueError("Malformed cursor")
+    return key
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """Encode a (created_at, id) sort key as an opaque cursor"""
+    return _encode([created_at.isoformat(), str(row_id)])
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode a cursor produced by encode_cursor (400 on anything else)"""
+    try:
+        created_at, row_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise _invalid_cursor()
+
+def encode_rank_cursor(score: float, row_id: uuid.UUID) -> str:
+    """Encode a (relevance score, id) sort key as an opaque cursor"""
+    return _encode([score, str(row_id)])
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    """Decode a cursor produced by encode_rank_cursor (400 on anything else)"""
+    try:
+        score, row_id = _decode(cursor)
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            raise ValueError("Not a ranked cursor")
+        return float(score), uuid.UUID(row_id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise _invalid_cursor()
+
+def split_page(rows: Sequence[Any], limit: int, sort_attr: str, id_attr: str,
+               encode: Callable[[Any, Any], str] = encode_cursor) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim a limit + 1 fetch to one page and build the cursor for the next one
+
+    Returns the page rows and the next cursor (None on the last page).
+    encode builds the cursor from the last row's (sort_attr, id_attr) values;
+    ranked results pass encode_rank_cursor.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+
+    last = page[-1]
+    return page, encode(getattr(last, sort_attr), getattr(last, id_attr))
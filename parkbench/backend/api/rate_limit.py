@@ -0,0 +1,372 @@
+"""
+Rate limiting for ParkBench API
+
+GCRA (generic cell rate algorithm) limiters behind one interface, selected by
+RATE_LIMIT_BACKEND:
+
+  memory    per worker process; with N uvicorn workers a client effectively
+            gets N times the limit, and counters reset on restart
+  postgres  one row per identifier in the rate_limits table, updated by a
+            single atomic upsert, so all workers and restarts share counters
+
+RateLimitMiddleware enforces the limit on every HTTP request and sets the
+X-RateLimit-* headers on every response.
+"""
+
+import abc
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import cast, delete, func, select, text
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import get_settings
+from db import models
+from db.models import RateLimitBucket
+from .auth import verify_api_key, verify_token
+from .background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# Never limited: health checks and API docs
+EXEMPT_PATHS = frozenset({"/", "/health", "/api/health", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json",
+                          "/.well-known/jwks.json"})
+
+class RateLimitInfo(BaseModel):
+    requests_remaining: int
+    reset_time: datetime  # Full allowance available again
+    limit: int
+    allowed: bool = True
+    retry_after_seconds: float = 0  # When rejected: wait this long before the next request fits
+
+    @classmethod
+    def from_gcra(cls, tat: float, now: float, limit: int, window: float, allowed: bool) -> "RateLimitInfo":
+        """Info for an identifier whose theoretical arrival time is now `tat`"""
+        interval = window / limit
+        # Requests that would still fit right now (epsilon absorbs float rounding)
+        remaining = int((window - (tat - now)) / interval + 1e-9)
+        return cls(
+            requests_remaining=max(remaining, 0),
+            reset_time=datetime.fromtimestamp(tat),
+            limit=limit,
+            allowed=allowed,
+            retry_after_seconds=0 if allowed else tat + interval - window - now
+        )
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.requests_remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_time.timestamp()))
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after_seconds))
+        return headers
+
+class RateLimiter(abc.ABC):
+    """
+    Rate limiter backend interface
+
+    Allows `limit` requests per `window` seconds per identifier: a burst of
+    up to `limit`, refilled at one request every window / limit seconds.
+    """
+
+    backend = ""
+
+    @abc.abstractmethod
+    async def is_allowed(self, identifier: str, limit: int = 100, window: float = 3600) -> RateLimitInfo:
+        """
+        Check if request is allowed under rate limit, counting it if it is
+
+        Args:
+            identifier: Unique identifier (IP, API key, agent name)
+            limit: Maximum requests allowed in window
+            window: Time window in seconds (default 1 hour)
+        """
+
+    def start(self) -> None:
+        """Start any background maintenance (called on application startup)"""
+
+    @abc.abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+
+class MemoryRateLimiter(RateLimiter):
+    """
+    In-process GCRA limiter
+
+    Only one timestamp is kept per identifier (its theoretical arrival time,
+    TAT), so checks are O(1) in time and memory. Identifiers whose allowance
+    has fully refilled carry no state and are dropped, oldest first.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_identifiers: int = 1_000_000, clock=time.time):
+        self.max_identifiers = max_identifiers
+        self.clock = clock
+        self._tats: "OrderedDict[str, float]" = OrderedDict()  # Least recently limited first
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    async def is_allowed(self, identifier: str, limit: int = 100, window: float = 3600) -> RateLimitInfo:
+        return self.check(identifier, limit, window)
+
+    def check(self, identifier: str, limit: int, window: float) -> RateLimitInfo:
+        """Synchronous is_allowed"""
+        now = self.clock()
+        interval = window / limit
+
+        with self._lock:
+            self._evict_idle(now)
+
+            tat = max(self._tats.get(identifier, now), now)
+            allowed = tat + interval - now <= window
+            if allowed:
+                tat += interval
+                self._tats[identifier] = tat
+                self._tats.move_to_end(identifier)
+                if len(self._tats) > self.max_identifiers:
+                    self._tats.popitem(last=False)  # Forgives the least recently limited identifier
+                    self.evicted += 1
+                self.allowed += 1
+            else:
+                self.rejected += 1
+
+        return RateLimitInfo.from_gcra(tat, now, limit, window, allowed)
+
+    def _evict_idle(self, now: float) -> None:
+        # A couple of entries per call keeps eviction amortized O(1)
+        for _ in range(2):
+            if not self._tats:
+                return
+            identifier, tat = next(iter(self._tats.items()))
+            if tat > now:
+                return
+            del self._tats[identifier]
+            self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "identifiers": len(self._tats),
+            "max_identifiers": self.max_identifiers,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evicted": self.evicted
+        }
+
+# One GCRA step as a single statement: the upsert only writes when the request fits, and
+# the row lock it takes serializes concurrent requests for the same identifier. Time comes
+# from the database so workers with skewed clocks share one timeline.
+GCRA_SQL = text("""
+    WITH clock AS (
+        SELECT extract(epoch FROM clock_timestamp())::float8 AS now
+    ), counted AS (
+        INSERT INTO rate_limits AS bucket (identifier, tat)
+        SELECT :identifier, clock.now + :interval FROM clock
+        ON CONFLICT (identifier) DO UPDATE
+            SET tat = greatest(bucket.tat, excluded.tat - :interval) + :interval
+            WHERE greatest(bucket.tat, excluded.tat - :interval) + :interval - (excluded.tat - :interval) <= :window
+        RETURNING tat
+    )
+    SELECT counted.tat, true AS allowed, clock.now FROM counted, clock
+    UNION ALL
+    SELECT bucket.tat, false, clock.now FROM rate_limits AS bucket, clock
+    WHERE bucket.identifier = :identifier AND NOT EXISTS (SELECT FROM counted)
+""")
+
+def idle_buckets_batch(batch_size: int):
+    """DELETE of up to batch_size rows whose allowance has fully refilled"""
+    now = cast(func.extract("epoch", func.now()), DOUBLE_PRECISION)
+    idle = (
+        select(RateLimitBucket.identifier)
+        .where(RateLimitBucket.tat <= now)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return delete(RateLimitBucket).where(RateLimitBucket.identifier.in_(idle.scalar_subquery()))
+
+class PostgresRateLimiter(RateLimiter):
+    """
+    GCRA limiter shared through the rate_limits table
+
+    Costs one round trip per request. While the database is unreachable,
+    requests are limited per process by an in-memory fallback.
+    """
+
+    backend = "postgres"
+
+    def __init__(self, engine: Optional[AsyncEngine] = None, prune_interval_seconds: float = 300,
+                 prune_batch_size: int = 1000, fallback: Optional[MemoryRateLimiter] = None):
+        self._engine = engine
+        self._autocommit_engine: Optional[AsyncEngine] = None
+        self.prune_batch_size = prune_batch_size
+        self.fallback = fallback or MemoryRateLimiter()
+        self.allowed = 0
+        self.rejected = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.pruner = PeriodicTask("rate_limit_prune", self.prune, interval_seconds=prune_interval_seconds,
+                                   initial_delay_seconds=prune_interval_seconds, cumulative=("deleted",))
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            if models.async_engine is None:
+                models.init_db()
+            self._engine = models.async_engine
+        return self._engine
+
+    @property
+    def autocommit_engine(self) -> AsyncEngine:
+        # The upsert is atomic on its own, so skip the BEGIN/COMMIT round trips
+        if self._autocommit_engine is None:
+            self._autocommit_engine = self.engine.execution_options(isolation_level="AUTOCOMMIT")
+        return self._autocommit_engine
+
+    async def is_allowed(self, identifier: str, limit: int = 100, window: float = 3600) -> RateLimitInfo:
+        try:
+            async with self.autocommit_engine.connect() as conn:
+                row = (await conn.execute(GCRA_SQL, {
+                    "identifier": identifier,
+                    "interval": window / limit,
+                    "window": float(window)
+                })).first()
+        except Exception as e:
+            if self.last_error is None:
+                logger.warning(f"Shared rate limiter unavailable, limiting per process: {e}")
+            self.errors += 1
+            self.last_error = str(e) or type(e).__name__
+            return await self.fallback.is_allowed(identifier, limit, window)
+        self.last_error = None
+
+        if row is None:
+            # Rejected, and the row was created after this statement's snapshot: it is at least full
+            now = time.time()
+            tat, allowed = now + window, False
+        else:
+            tat, allowed, now = row
+        if allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return RateLimitInfo.from_gcra(tat, now, limit, window, allowed)
+
+    async def prune(self, progress: Dict[str, Any]) -> Dict[str, Any]:
+        """Delete rows of identifiers with a full allowance (they carry no state), one batch per transaction"""
+        progress.update(deleted=0)
+        while True:
+            async with self.engine.begin() as conn:
+                deleted = (await conn.execute(idle_buckets_batch(self.prune_batch_size))).rowcount
+            progress["deleted"] += deleted
+            if deleted < self.prune_batch_size:
+                return {"deleted": progress["deleted"]}
+
+    def start(self) -> None:
+        self.pruner.start()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "fallback": self.fallback.stats()
+        }
+
+def create_rate_limiter() -> RateLimiter:
+    settings = get_settings()
+    if settings.rate_limit_backend == "postgres":
+        return PostgresRateLimiter(prune_interval_seconds=settings.rate_limit_prune_interval_seconds)
+    if settings.rate_limit_backend != "memory":
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND {settings.rate_limit_backend!r}: use 'memory' or 'postgres'")
+    return MemoryRateLimiter(max_identifiers=settings.rate_limit_max_identifiers)
+
+# Global rate limiter instance
+rate_limiter = create_rate_limiter()
+
+async def request_identity(scope: Scope) -> Tuple[str, int]:
+    """
+    Identifier and limit for a request
+
+    Agents presenting a valid JWT or API key are limited per agent (API keys
+    carry their own limit); everyone else per client IP, including when the
+    key cannot be checked. Whether the agent is still active is left to the
+    route's authentication.
+    """
+    settings = get_settings()
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+
+    if scheme.lower() == "bearer" and token:
+        if token.startswith("pk_"):
+            try:
+                async for db in models.get_async_db():  # Only queries when the key is not cached
+                    key_data = await verify_api_key(token, db)
+                return f"agent:{key_data.agent_name}", key_data.rate_limit
+            except HTTPException:
+                pass
+            except Exception as e:
+                logger.warning(f"Rate limiting by IP: API key lookup failed: {e}")
+        else:
+            try:
+                token_data = verify_token(token)
+                return f"agent:{token_data.agent_name}", settings.rate_limit_authenticated_requests
+            except HTTPException:
+                pass
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}", settings.rate_limit_anonymous_requests
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying rate_limiter to every HTTP request
+
+    Rejected requests get a 429 without reaching the app; every response
+    carries X-RateLimit-Limit, -Remaining and -Reset.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None, window_seconds: Optional[float] = None):
+        self.app = app
+        self.limiter = limiter  # Defaults to the global rate_limiter
+        self.window_seconds = window_seconds or get_settings().rate_limit_window_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        identifier, limit = await request_identity(scope)
+        limiter = self.limiter if self.limiter is not None else rate_limiter  # An empty MemoryRateLimiter is falsy
+        rate_info = await limiter.is_allowed(identifier, limit, self.window_seconds)
+        headers = rate_info.headers()
+
+        if not rate_info.allowed:
+            logger.debug(f"Rate limit exceeded for {identifier}")
+            response = JSONResponse({"detail": "Rate limit exceeded"}, status_code=429, headers=headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
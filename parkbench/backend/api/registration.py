@@ -1,13 +1,25 @@
 # Placeholder for registration API logic
 
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel, Field
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import binascii
+import hashlib
+import math
+import multiprocessing
+import os
 import uuid
 import json
-from datetime import datetime
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
 
 # Certificate validation imports
 import base64
@@ -17,11 +29,18 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.x509.oid import NameOID
 import logging
 
-from db.models import get_db, Agent
+from db.models import (
+    get_async_db, get_read_db, Agent, AgentSkill, AgentProtocol, AgentTask,
+    agent_capability_rows, sync_agent_capabilities, set_agent_capabilities_active
+)
 from config.settings import get_settings
 
 # Import enhanced validation
 from .validation import validate_agent_name, validate_agent_metadata, ValidationResult
+from .task_index import task_index
+from .cache import certificate_cache, principal_cache
+from .discovery import invalidate_agents
+from .invalidation import notify_invalidation
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -59,6 +78,23 @@ class AgentRegistrationResponse(BaseModel):
     agent_name: str = Field(alias="agentName")
     status: str
 
+class BulkRegistrationRequest(BaseModel):
+    agents: List[AgentRegistrationRequest] = Field(min_length=1)
+
+class BulkRegistrationItem(BaseModel):
+    index: int  # Position in the request's agents array
+    agent_name: str
+    status: str  # "registered" or "failed"
+    agent_id: Optional[str] = None
+    verified: Optional[bool] = None
+    errors: List[str] = []  # Why the agent was not registered
+    certificate_errors: List[str] = []  # Registered, but not verified because of these
+
+class BulkRegistrationResponse(BaseModel):
+    registered: int
+    failed: int
+    results: List[BulkRegistrationItem]
+
 class AgentStatusResponse(BaseModel):
     agent_id: str
     agent_name: str
@@ -66,6 +102,13 @@ class AgentStatusResponse(BaseModel):
     active: bool
     created_at: datetime
     updated_at: datetime
+    # From the columns stored at register/renew; None if the certificate could not be parsed
+    certificate_fingerprint: Optional[str] = None
+    certificate_serial: Optional[str] = None
+    certificate_issuer: Optional[str] = None
+    certificate_not_before: Optional[datetime] = None
+    certificate_not_after: Optional[datetime] = None
+    certificate_expired: Optional[bool] = None
 
 # Pydantic models for validation
 class AgentSkills(BaseModel):
@@ -88,6 +131,7 @@ class CertificateInfo(BaseModel):
     not_after: datetime
     is_valid: bool
     validation_errors: List[str]
+    fingerprint: Optional[str] = None  # SHA-256 of the DER certificate; None if it could not be parsed
 
 def extract_name_attributes(name: x509.Name) -> Dict[str, str]:
     """Extract common name attributes from X.509 Name object"""
@@ -106,9 +150,53 @@ def extract_name_attributes(name: x509.Name) -> Dict[str, str]:
             attributes['email'] = attribute.value
     return attributes
 
+PEM_CERTIFICATE_RE = re.compile(r"-----BEGIN CERTIFICATE-----(.+?)-----END CERTIFICATE-----", re.DOTALL)
+
+def certificate_fingerprint(certificate_pem: str) -> Optional[str]:
+    """SHA-256 fingerprint of the DER certificate inside a PEM, computed without parsing it"""
+    match = PEM_CERTIFICATE_RE.search(certificate_pem)
+    if not match:
+        return None
+    try:
+        der = base64.b64decode("".join(match.group(1).split()), validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return hashlib.sha256(der).hexdigest()
+
+def certificate_cache_ttl(cert_info: CertificateInfo) -> Optional[float]:
+    """
+    Cache lifetime: until the validity-period check could give a different
+    answer, capped at the cache TTL
+    
+    None (the cache default) once the certificate has expired or failed to
+    parse, since those results no longer change.
+    """
+    now = datetime.utcnow()
+    boundary = cert_info.not_before if now < cert_info.not_before else cert_info.not_after
+    remaining = (boundary - now).total_seconds()
+    return min(remaining, certificate_cache.ttl_seconds) if remaining > 0 else None
+
 def validate_certificate(certificate_pem: str, agent_name: str) -> CertificateInfo:
     """
-    Validate X.509 certificate and extract information
+    Validate a certificate, reusing the cached result for a certificate already seen
+    
+    Cached per (fingerprint, agent_name) until not_before/not_after is crossed
+    or the cache TTL runs out. The returned object is shared; don't modify it.
+    """
+    fingerprint = certificate_fingerprint(certificate_pem)
+    if fingerprint is None:
+        return parse_certificate(certificate_pem, agent_name)
+    
+    key = (fingerprint, agent_name)
+    cert_info = certificate_cache.get(key)
+    if cert_info is None:
+        cert_info = parse_certificate(certificate_pem, agent_name)
+        certificate_cache.set(key, cert_info, certificate_cache_ttl(cert_info))
+    return cert_info
+
+def parse_certificate(certificate_pem: str, agent_name: str) -> CertificateInfo:
+    """
+    Validate X.509 certificate and extract information (uncached)
     
     Args:
         certificate_pem: PEM-encoded certificate
@@ -128,6 +216,7 @@ def validate_certificate(certificate_pem: str, agent_name: str) -> CertificateIn
         subject = extract_name_attributes(cert.subject)
         issuer = extract_name_attributes(cert.issuer)
         serial_number = str(cert.serial_number)
+        fingerprint = cert.fingerprint(hashes.SHA256()).hex()
         not_before = cert.not_valid_before
         not_after = cert.not_valid_after
         
@@ -161,14 +250,8 @@ def validate_certificate(certificate_pem: str, agent_name: str) -> CertificateIn
         
         # Verify certificate signature (basic check)
         try:
-            # For self-signed certificates, verify against itself
-            public_key = cert.public_key()
-            # This will raise an exception if signature is invalid
-            public_key.verify(
-                cert.signature,
-                cert.tbs_certificate_bytes,
-                cert.signature_algorithm_oid._name
-            )
+            # For self-signed certificates, verify against itself (raises if the signature is invalid)
+            cert.verify_directly_issued_by(cert)
         except Exception as e:
             # Note: This is a basic check. In production, implement full chain validation
             logger.warning(f"Certificate signature validation failed: {e}")
@@ -183,7 +266,8 @@ def validate_certificate(certificate_pem: str, agent_name: str) -> CertificateIn
             not_before=not_before,
             not_after=not_after,
             is_valid=is_valid,
-            validation_errors=validation_errors
+            validation_errors=validation_errors,
+            fingerprint=fingerprint
         )
         
     except Exception as e:
@@ -198,10 +282,161 @@ def validate_certificate(certificate_pem: str, agent_name: str) -> CertificateIn
             validation_errors=validation_errors
         )
 
+# Pool for certificate parsing and signature checks, created on first use
+_certificate_pool: Optional[Executor] = None
+_certificate_pool_workers = 0
+
+def certificate_pool() -> Tuple[Optional[Executor], int]:
+    """The certificate validation pool and its worker count; (None, 1) for the inline executor"""
+    global _certificate_pool, _certificate_pool_workers
+    settings = get_settings()
+    kind = settings.certificate_validation_executor
+    if kind == "inline":
+        return None, 1
+    
+    if _certificate_pool is None:
+        _certificate_pool_workers = settings.certificate_validation_workers or os.cpu_count() or 1
+        if kind == "process":
+            # spawn rather than fork: the API process runs an event loop, threads and DB pools
+            _certificate_pool = ProcessPoolExecutor(
+                max_workers=_certificate_pool_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        elif kind == "thread":
+            _certificate_pool = ThreadPoolExecutor(
+                max_workers=_certificate_pool_workers,
+                thread_name_prefix="certificate-validation"
+            )
+        else:
+            raise ValueError(f"Unknown certificate_validation_executor '{kind}' (expected process, thread or inline)")
+    return _certificate_pool, _certificate_pool_workers
+
+def start_certificate_pool() -> None:
+    """Create the pool and start its workers now, so the first registration doesn't wait for them"""
+    pool, _ = certificate_pool()
+    if pool is not None:
+        pool.submit(parse_certificates, [])
+
+def shutdown_certificate_pool() -> None:
+    global _certificate_pool
+    if _certificate_pool is not None:
+        _certificate_pool.shutdown(wait=False, cancel_futures=True)
+        _certificate_pool = None
+
+def parse_certificates(items: List[Tuple[str, str]]) -> List[CertificateInfo]:
+    """parse_certificate over (certificate_pem, agent_name) pairs; runs in a pool worker"""
+    return [parse_certificate(certificate_pem, agent_name) for certificate_pem, agent_name in items]
+
+async def validate_certificates_parallel(items: List[Tuple[str, str]]) -> List[CertificateInfo]:
+    """
+    Validate certificates in input order without blocking the event loop
+    
+    Cache hits are answered here; only misses are parsed, across the
+    certificate pool in one chunk per worker, and then cached in this process.
+    """
+    results: List[Optional[CertificateInfo]] = [None] * len(items)
+    misses = []
+    for position, (certificate_pem, agent_name) in enumerate(items):
+        fingerprint = certificate_fingerprint(certificate_pem)
+        cached = certificate_cache.get((fingerprint, agent_name)) if fingerprint else None
+        if cached is None:
+            misses.append((position, fingerprint))
+        else:
+            results[position] = cached
+    
+    if misses:
+        pool, workers = certificate_pool()
+        pending = [items[position] for position, _ in misses]
+        chunk_size = math.ceil(len(pending) / workers)
+        chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+        
+        if pool is None:
+            parsed = [parse_certificates(chunk) for chunk in chunks]
+        else:
+            loop = asyncio.get_running_loop()
+            try:
+                parsed = await asyncio.gather(*(loop.run_in_executor(pool, parse_certificates, chunk) for chunk in chunks))
+            except BrokenProcessPool:
+                shutdown_certificate_pool()  # A worker died; start a fresh pool next time
+                raise
+        
+        for (position, fingerprint), cert_info in zip(misses, (info for chunk in parsed for info in chunk)):
+            results[position] = cert_info
+            if fingerprint:
+                certificate_cache.set((fingerprint, items[position][1]), cert_info, certificate_cache_ttl(cert_info))
+    
+    return results
+
+def certificate_columns(cert_info: CertificateInfo) -> Dict[str, Any]:
+    """Agent.certificate_* column values for a validated certificate (all None if it did not parse)"""
+    if cert_info.fingerprint is None:
+        return {
+            "certificate_fingerprint": None,
+            "certificate_serial": None,
+            "certificate_issuer": None,
+            "certificate_not_before": None,
+            "certificate_not_after": None,
+            "certificate_parse_failed": True
+        }
+    return {
+        "certificate_fingerprint": cert_info.fingerprint,
+        "certificate_serial": cert_info.serial_number,
+        "certificate_issuer": cert_info.issuer.get('common_name'),
+        # cryptography reports naive UTC datetimes
+        "certificate_not_before": cert_info.not_before.replace(tzinfo=timezone.utc),
+        "certificate_not_after": cert_info.not_after.replace(tzinfo=timezone.utc),
+        "certificate_parse_failed": False
+    }
+
+def unextracted_certificates(batch_size: int, after: Optional[uuid.UUID] = None):
+    """
+    Up to batch_size agents whose certificate columns were never extracted, by agent_id after `after`
+
+    Only the columns needed to parse the certificate are read. SKIP LOCKED
+    lets several workers backfill at once without waiting on each other.
+    """
+    query = select(Agent.agent_id, Agent.agent_name, Agent.certificate_pem).where(
+        Agent.certificate_fingerprint.is_(None), Agent.certificate_parse_failed.is_(None)  # ix_agents_certificate_unextracted
+    )
+    if after is not None:
+        query = query.where(Agent.agent_id > after)
+    return query.order_by(Agent.agent_id).limit(batch_size).with_for_update(skip_locked=True)
+
+async def backfill_certificate_columns(db: AsyncSession, batch_size: int) -> Tuple[int, int]:
+    """
+    Fill the certificate_* columns of agents registered before they existed, one commit per batch
+
+    Certificates that do not parse are marked certificate_parse_failed, so
+    they are not read again. Returns (filled, unparseable).
+    """
+    filled = unparseable = 0
+    after = None
+    while True:
+        rows = (await db.execute(unextracted_certificates(batch_size, after))).all()
+        if not rows:
+            break
+        
+        cert_infos = await validate_certificates_parallel([(row.certificate_pem, row.agent_name) for row in rows])
+        await db.execute(update(Agent), [
+            {"agent_id": row.agent_id, **certificate_columns(cert_info)} for row, cert_info in zip(rows, cert_infos)
+        ])
+        await db.commit()
+        
+        unparseable += sum(1 for cert_info in cert_infos if cert_info.fingerprint is None)
+        filled += len(rows)
+        after = rows[-1].agent_id
+        if len(rows) < batch_size:
+            break
+    return filled - unparseable, unparseable
+
+async def validate_certificate_async(certificate_pem: str, agent_name: str) -> CertificateInfo:
+    """validate_certificate for async handlers: a cache miss is parsed on the certificate pool"""
+    return (await validate_certificates_parallel([(certificate_pem, agent_name)]))[0]
+
 @router.post("/register", response_model=AgentRegistrationResponse)
 async def register_agent(
     request: AgentRegistrationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register a new agent with enhanced validation and certificate verification"""
     
@@ -238,7 +473,7 @@ async def register_agent(
             logger.warning(f"Validation warnings for {request.agent_name}: {validation_warnings}")
         
         # Validate certificate
-        cert_info = validate_certificate(request.certificate_pem, request.agent_name)
+        cert_info = await validate_certificate_async(request.certificate_pem, request.agent_name)
         
         # Log certificate validation results
         logger.info(f"Certificate validation for {request.agent_name}: valid={cert_info.is_valid}")
@@ -255,46 +490,171 @@ async def register_agent(
             certificate_pem=request.certificate_pem,
             agent_metadata=request.metadata.dict(),
             verified=verified,  # Set based on certificate validation
-            active=True
+            active=True,
+            **certificate_columns(cert_info)
         )
         
         db.add(new_agent)
-        db.commit()
-        db.refresh(new_agent)
+        await db.flush()
+        
+        # Skills, protocols and tasks are committed together with the agent row
+        await db.run_sync(sync_agent_capabilities, new_agent)
+        
+        await invalidate_agents(db, [new_agent.agent_name])
+        await db.commit()
+        await db.refresh(new_agent)
+        
+        task_index.upsert(new_agent.agent_name, new_agent.agent_metadata.get('a2a'))
         
         # Log successful registration
         logger.info(f"Agent {request.agent_name} registered successfully with ID {new_agent.agent_id}")
         
         return AgentRegistrationResponse(
             agent_id=str(new_agent.agent_id),
-            agent_name=new_agent.agent_name,
+            agentName=new_agent.agent_name,
             status="registered"
         )
         
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database integrity error during registration: {e}")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Agent with name '{request.agent_name}' already exists"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error during agent registration: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during registration"
         )
 
+@router.post("/register/bulk", response_model=BulkRegistrationResponse)
+async def register_agents_bulk(
+    request: BulkRegistrationRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Register many agents in one request
+    
+    Each agent is validated like POST /register and succeeds or fails on its
+    own; certificates are validated in parallel across worker processes and
+    all accepted agents are written with multi-row INSERTs in one transaction.
+    """
+    
+    max_agents = get_settings().max_agents_per_bulk_registration
+    if len(request.agents) > max_agents:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {max_agents} agents per bulk registration"
+        )
+    
+    results = [
+        BulkRegistrationItem(index=index, agent_name=item.agent_name, status="failed")
+        for index, item in enumerate(request.agents)
+    ]
+    
+    # Input validation, as /register does for a single agent
+    candidates = []
+    seen_names = set()
+    for index, item in enumerate(request.agents):
+        errors = []
+        for validation in (validate_agent_name(item.agent_name), validate_agent_metadata(item.metadata.dict())):
+            errors.extend(validation.errors)
+        if item.agent_name in seen_names:
+            errors.append(f"Agent name '{item.agent_name}' appears more than once in this request")
+        seen_names.add(item.agent_name)
+        
+        if errors:
+            results[index].errors = errors
+        else:
+            candidates.append(index)
+    
+    try:
+        cert_infos = await validate_certificates_parallel(
+            [(request.agents[index].certificate_pem, request.agents[index].agent_name) for index in candidates]
+        )
+        
+        agent_rows = []
+        capability_rows = {AgentSkill: [], AgentProtocol: [], AgentTask: []}
+        for index, cert_info in zip(candidates, cert_infos):
+            item = request.agents[index]
+            agent_id = uuid.uuid4()
+            metadata = item.metadata.dict()
+            agent_rows.append({
+                "agent_id": agent_id,
+                "agent_name": item.agent_name,
+                "certificate_pem": item.certificate_pem,
+                "agent_metadata": metadata,
+                "verified": cert_info.is_valid,
+                "active": True,
+                **certificate_columns(cert_info)
+            })
+            for model, rows in agent_capability_rows(agent_id, metadata, True).items():
+                capability_rows[model].extend(rows)
+            results[index].verified = cert_info.is_valid
+            results[index].certificate_errors = cert_info.validation_errors
+        
+        inserted = {}
+        if agent_rows:
+            # Names that already exist are skipped rather than aborting the batch
+            returned = await db.execute(
+                pg_insert(Agent)
+                .on_conflict_do_nothing(index_elements=[Agent.agent_name])
+                .returning(Agent.agent_id, Agent.agent_name),
+                agent_rows
+            )
+            inserted = {row.agent_name: row.agent_id for row in returned}
+            
+            inserted_ids = set(inserted.values())
+            for model, rows in capability_rows.items():
+                rows = [row for row in rows if row["agent_id"] in inserted_ids]
+                if rows:
+                    await db.execute(insert(model), rows)
+            
+            await invalidate_agents(db, list(inserted))
+        
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Unexpected error during bulk registration: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during bulk registration"
+        )
+    
+    for index in candidates:
+        item = request.agents[index]
+        agent_id = inserted.get(item.agent_name)
+        if agent_id is None:
+            results[index].verified = None
+            results[index].certificate_errors = []
+            results[index].errors = [f"Agent with name '{item.agent_name}' already exists"]
+            continue
+        
+        results[index].status = "registered"
+        results[index].agent_id = str(agent_id)
+        task_index.upsert(item.agent_name, item.metadata.a2a.dict())
+    
+    registered = sum(1 for result in results if result.status == "registered")
+    logger.info(f"Bulk registration: {registered} registered, {len(results) - registered} failed")
+    
+    return BulkRegistrationResponse(
+        registered=registered,
+        failed=len(results) - registered,
+        results=results
+    )
+
 @router.post("/renew")
 async def renew_agent(
     agent_name: str,
     certificate_pem: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Renew an agent's certificate"""
     
-    agent = db.query(Agent).filter(Agent.agent_name == agent_name).first()
+    agent = await db.scalar(select(Agent).where(Agent.agent_name == agent_name))
     if not agent:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -302,13 +662,26 @@ async def renew_agent(
         )
     
     # Validate new certificate
-    cert_info = validate_certificate(certificate_pem, agent_name)
+    cert_info = await validate_certificate_async(certificate_pem, agent_name)
     
-    # Update agent with new certificate
-    agent.certificate_pem = certificate_pem
-    agent.verified = cert_info.is_valid
-    
-    db.commit()
+    try:
+        # Update agent with new certificate
+        agent.certificate_pem = certificate_pem
+        agent.verified = cert_info.is_valid
+        for column, value in certificate_columns(cert_info).items():
+            setattr(agent, column, value)
+        
+        # Re-derive side tables in the same transaction in case they drifted
+        await db.run_sync(sync_agent_capabilities, agent)
+        
+        await invalidate_agents(db, [agent_name])
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to renew agent: {str(e)}"
+        )
     
     logger.info(f"Certificate renewed for agent {agent_name}, verified={cert_info.is_valid}")
     
@@ -322,10 +695,10 @@ async def renew_agent(
 @router.post("/deactivate")
 async def deactivate_agent(
     agent_name: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Deactivate an agent"""
-    agent = db.query(Agent).filter(Agent.agent_name == agent_name).first()
+    agent = await db.scalar(select(Agent).where(Agent.agent_name == agent_name))
     
     if not agent:
         raise HTTPException(
@@ -335,35 +708,51 @@ async def deactivate_agent(
     
     try:
         agent.active = False
-        db.commit()
+        await db.run_sync(set_agent_capabilities_active, agent.agent_id, False)
+        # Authenticated requests stop resolving to this agent in every worker
+        await notify_invalidation(db, principal_cache, agent_name)
+        await invalidate_agents(db, [agent_name])
+        await db.commit()
+        
+        task_index.remove(agent_name)
         
         logger.info(f"Agent {agent_name} deactivated")
         
         return {"status": "deactivated", "agent_name": agent_name}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to deactivate agent: {str(e)}"
         )
 
+# Everything /status returns; the PEM and metadata are not loaded
+STATUS_COLUMNS = (
+    Agent.agent_id, Agent.agent_name, Agent.verified, Agent.active, Agent.created_at, Agent.updated_at,
+    Agent.certificate_fingerprint, Agent.certificate_serial, Agent.certificate_issuer,
+    Agent.certificate_not_before, Agent.certificate_not_after
+)
+
 @router.get("/status", response_model=AgentStatusResponse)
 async def get_agent_status(
     agent_name: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get agent registration status and certificate information"""
+    """Get agent registration status and certificate information (from stored columns, no certificate parsing)"""
     
-    agent = db.query(Agent).filter(Agent.agent_name == agent_name).first()
+    agent = await db.scalar(
+        select(Agent)
+        .options(load_only(*STATUS_COLUMNS))
+        .where(Agent.agent_name == agent_name)
+    )
     if not agent:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Agent '{agent_name}' not found"
         )
     
-    # Re-validate certificate to get current status
-    cert_info = validate_certificate(agent.certificate_pem, agent.agent_name)
+    not_after = agent.certificate_not_after
     
     return AgentStatusResponse(
         agent_id=str(agent.agent_id),
@@ -371,7 +760,13 @@ async def get_agent_status(
         verified=agent.verified,
         active=agent.active,
         created_at=agent.created_at,
-        updated_at=agent.updated_at
+        updated_at=agent.updated_at,
+        certificate_fingerprint=agent.certificate_fingerprint,
+        certificate_serial=agent.certificate_serial,
+        certificate_issuer=agent.certificate_issuer,
+        certificate_not_before=agent.certificate_not_before,
+        certificate_not_after=not_after,
+        certificate_expired=not_after <= datetime.now(timezone.utc) if not_after else None
     )
 
 @router.post("/validate-certificate")
@@ -381,7 +776,7 @@ async def validate_certificate_endpoint(certificate_pem: str, agent_name: Option
     Useful for testing and verification before registration
     """
     
-    cert_info = validate_certificate(certificate_pem, agent_name or "")
+    cert_info = await validate_certificate_async(certificate_pem, agent_name or "")
     
     return {
         "valid": cert_info.is_valid,
@@ -0,0 +1,114 @@
+"""
+Session reaper for ParkBench API
+
+Ends active sessions that have not been updated for
+DEFAULT_SESSION_TIMEOUT_MINUTES (status TERMINATED), in batches, using the
+index on (status, updated_at). Their tokens have expired by then, as a
+token lives that long and every update issues a fresh one. With
+SESSION_ARCHIVE_AFTER_DAYS set, finished sessions are then moved to
+a2a_sessions_archive once they are that old, keeping the hot table to live
+and recent sessions.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Any, Dict
+
+from sqlalchemy import delete, func, insert, select, update
+
+from config.settings import get_settings
+from db.models import get_async_db, A2ASession, A2ASessionArchive, SessionStatus
+from .background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = (SessionStatus.COMPLETED, SessionStatus.FAILED, SessionStatus.TERMINATED)
+
+def sessions_last_updated_before(session_status: SessionStatus, age: timedelta, batch_size: int):
+    """
+    Up to batch_size sessions with session_status not updated for `age`, oldest first
+
+    One status per query, so the (status, updated_at) index returns them in
+    order and the scan stops after batch_size rows. SKIP LOCKED lets several
+    workers reap at once without waiting on each other.
+    """
+    return (
+        select(A2ASession.session_id)
+        .where(A2ASession.status == session_status, A2ASession.updated_at < func.now() - age)
+        .order_by(A2ASession.updated_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+def stale_sessions_batch(timeout: timedelta, batch_size: int):
+    """UPDATE ending one batch of active sessions idle for longer than timeout, returning their ids"""
+    return (
+        update(A2ASession)
+        .where(A2ASession.session_id.in_(
+            sessions_last_updated_before(SessionStatus.ACTIVE, timeout, batch_size).scalar_subquery()
+        ))
+        .values(status=SessionStatus.TERMINATED, updated_at=func.now())
+        .returning(A2ASession.session_id)
+        .execution_options(synchronize_session=False)
+    )
+
+def archive_sessions_batch(session_status: SessionStatus, age: timedelta, batch_size: int):
+    """Move one batch of session_status sessions finished more than `age` ago to a2a_sessions_archive, returning their ids"""
+    columns = [column.name for column in A2ASession.__table__.columns]
+    moved = (
+        delete(A2ASession)
+        .where(A2ASession.session_id.in_(
+            sessions_last_updated_before(session_status, age, batch_size).scalar_subquery()
+        ))
+        .returning(*A2ASession.__table__.columns)
+        .cte("moved")
+    )
+    return (
+        insert(A2ASessionArchive)
+        .from_select(columns, select(*(moved.c[name] for name in columns)))
+        .returning(A2ASessionArchive.session_id)
+    )
+
+async def reap_sessions(progress: Dict[str, Any]) -> Dict[str, Any]:
+    """One run: end stale active sessions, then archive old finished ones, one commit per batch"""
+    settings = get_settings()
+    batch_size = settings.session_reaper_batch_size
+    timeout = timedelta(minutes=settings.default_session_timeout_minutes)
+    progress.update(batches=0, timed_out=0, archived=0)
+
+    async for db in get_async_db():
+        while True:
+            ended = (await db.scalars(stale_sessions_batch(timeout, batch_size))).all()
+            await db.commit()
+            progress["batches"] += 1
+            progress["timed_out"] += len(ended)
+            if len(ended) < batch_size:
+                break
+
+        if settings.session_archive_after_days > 0:
+            age = timedelta(days=settings.session_archive_after_days)
+            for session_status in FINISHED_STATUSES:
+                while True:
+                    moved = (await db.scalars(archive_sessions_batch(session_status, age, batch_size))).all()
+                    await db.commit()
+                    progress["batches"] += 1
+                    progress["archived"] += len(moved)
+                    if len(moved) < batch_size:
+                        break
+
+    if progress["timed_out"] or progress["archived"]:
+        logger.info(f"Session reaper: {progress['timed_out']} sessions timed out, {progress['archived']} archived")
+
+    return {
+        "timed_out": progress["timed_out"],
+        "archived": progress["archived"],
+        "batches": progress["batches"]
+    }
+
+session_reaper = PeriodicTask(
+    "session_reaper",
+    reap_sessions,
+    interval_seconds=get_settings().session_reaper_interval_seconds,
+    initial_delay_seconds=5,  # Let startup finish (schema upgrade) first
+    cumulative=("timed_out", "archived", "batches")
+)
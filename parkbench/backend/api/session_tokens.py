@@ -0,0 +1,169 @@
+"""
+Signed A2A session tokens for ParkBench API
+
+A session token is "pb_session_" followed by a JWT signed with the access
+token keys (api.signing) that carries the session id, both agents, the task
+and an expiry, so it can be checked without reading the session row: by
+POST /a2a/session/verify, or by the agents themselves against the JWKS.
+Updating an active session returns a fresh token, so a token outlives the
+session only when the session sits idle long enough for the reaper.
+
+Sessions ended before their token expires are added to a small denylist:
+the revoked_session_tokens table, mirrored in every worker's memory and
+kept current with the cache invalidation channel. Rows are deleted once the
+token has expired, so the denylist only holds recently ended sessions.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import jwt
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import get_settings
+from db.models import get_async_db, RevokedSessionToken
+from .background import PeriodicTask
+from .invalidation import notify, subscribe
+from .signing import decode_token, encode_token
+
+SESSION_TOKEN_PREFIX = "pb_session_"
+SESSION_TOKEN_TYPE = "a2a_session"
+
+class SessionTokenData(BaseModel):
+    session_id: str
+    initiating_agent: str
+    target_agent: str
+    task: str
+    expires_at: datetime
+
+def create_session_token(session_id: str, initiating_agent: str, target_agent: str, task: str) -> str:
+    """Sign a session token valid for DEFAULT_SESSION_TIMEOUT_MINUTES"""
+    now = datetime.now(timezone.utc)
+    return SESSION_TOKEN_PREFIX + encode_token({
+        "type": SESSION_TOKEN_TYPE,
+        "sid": session_id,
+        "ini": initiating_agent,
+        "tgt": target_agent,
+        "task": task,
+        "iat": now,
+        "exp": now + timedelta(minutes=get_settings().default_session_timeout_minutes)
+    })
+
+def session_token_expiry(token: str) -> Optional[datetime]:
+    """Expiry of a signed session token, without verifying it; None for unsigned (legacy) tokens"""
+    try:
+        claims = jwt.decode(token[len(SESSION_TOKEN_PREFIX):], options={"verify_signature": False})
+        return datetime.fromtimestamp(claims["exp"], timezone.utc)
+    except (jwt.InvalidTokenError, KeyError):
+        return None
+
+class SessionDenylist:
+    """Session ids whose tokens were revoked, with the time each token would have expired anyway"""
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+
+    def add(self, session_id: str, expires_at: float) -> None:
+        self._revoked[session_id] = expires_at
+
+    def is_revoked(self, session_id: str) -> bool:
+        expires_at = self._revoked.get(session_id)
+        if expires_at is None:
+            return False
+        if expires_at < time.time():
+            self._revoked.pop(session_id, None)
+            return False
+        return True
+
+    def load(self, revoked: Iterable[Tuple[str, float]]) -> None:
+        """Merge in the table's rows and drop expired entries (revocations are never undone)"""
+        self._revoked.update(revoked)
+        self._revoked = self.entries()
+
+    def on_notification(self, key: str) -> None:
+        session_id, _, expires_at = key.partition(":")
+        self.add(session_id, float(expires_at))
+
+    def entries(self) -> Dict[str, float]:
+        now = time.time()
+        return {session_id: expires_at for session_id, expires_at in self._revoked.items() if expires_at >= now}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"revoked": len(self._revoked)}
+
+denylist = SessionDenylist()
+subscribe("revoked_sessions", denylist.on_notification)
+
+def verify_session_token(token: str) -> SessionTokenData:
+    """Check a session token's signature, expiry and revocation; no database access"""
+    try:
+        if not token.startswith(SESSION_TOKEN_PREFIX):
+            raise jwt.InvalidTokenError("Not a session token")
+        claims = decode_token(token[len(SESSION_TOKEN_PREFIX):])
+        if claims.get("type") != SESSION_TOKEN_TYPE:
+            raise jwt.InvalidTokenError("Not a session token")
+        token_data = SessionTokenData(
+            session_id=claims["sid"],
+            initiating_agent=claims["ini"],
+            target_agent=claims["tgt"],
+            task=claims["task"],
+            expires_at=datetime.fromtimestamp(claims["exp"], timezone.utc)
+        )
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session token has expired"
+        )
+    except (jwt.InvalidTokenError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid session token"
+        )
+
+    if denylist.is_revoked(token_data.session_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session has ended"
+        )
+    return token_data
+
+async def revoke_session_token(db: AsyncSession, session_id: str, session_token: str) -> bool:
+    """
+    Deny a session's token in every worker (this one included) once db's transaction commits
+
+    Returns False (and does nothing) for expired or unsigned tokens, which
+    verification rejects anyway.
+    """
+    expires_at = session_token_expiry(session_token)
+    if expires_at is None or expires_at <= datetime.now(timezone.utc):
+        return False
+
+    await db.execute(
+        insert(RevokedSessionToken)
+        .values(session_id=session_id, expires_at=expires_at)
+        .on_conflict_do_nothing()
+    )
+    await notify(db, "revoked_sessions", f"{session_id}:{expires_at.timestamp()}")
+    return True
+
+async def refresh_session_denylist(progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Delete rows for expired tokens and reload the denylist, covering notifications missed while disconnected"""
+    async for db in get_async_db():
+        pruned = (await db.execute(delete(RevokedSessionToken).where(RevokedSessionToken.expires_at < func.now()))).rowcount
+        await db.commit()
+        rows = (await db.execute(select(RevokedSessionToken.session_id, RevokedSessionToken.expires_at))).all()
+
+    denylist.load((str(session_id), expires_at.timestamp()) for session_id, expires_at in rows)
+    return {"revoked": len(rows), "pruned": pruned}
+
+session_denylist_refresher = PeriodicTask(
+    "session_denylist_refresh",
+    refresh_session_denylist,
+    interval_seconds=get_settings().session_denylist_refresh_interval_seconds,
+    cumulative=("pruned",)
+)
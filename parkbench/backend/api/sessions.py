@@ -1,13 +1,15 @@
 # Placeholder for sessions API logic
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional
-from datetime import datetime
 
-from db.models import get_db, A2ASession, SessionStatus
+from db.models import get_async_db, get_read_db, A2ASession, A2ASessionArchive, SessionStatus
 from config.settings import get_settings
+from .pagination import decode_cursor, split_page, NEXT_CURSOR_HEADER
+from .session_tokens import create_session_token, denylist, revoke_session_token, verify_session_token
 
 router = APIRouter()
 
@@ -30,11 +32,47 @@ class SessionUpdateResponse(BaseModel):
     session_id: str = Field(alias="sessionID")
     status: str
     updated_at: str = Field(alias="updatedAt")
+    session_token: Optional[str] = Field(None, alias="sessionToken")  # Fresh token while the session stays active
+
+class SessionTokenVerifyRequest(BaseModel):
+    session_token: str = Field(alias="sessionToken")
+
+class SessionTokenVerifyResponse(BaseModel):
+    valid: bool
+    session_id: str = Field(alias="sessionID")
+    initiating_agent: str = Field(alias="initiatingAgent")
+    target_agent: str = Field(alias="targetAgent")
+    task: str
+    expires_at: str = Field(alias="expiresAt")
+
+@router.post("/a2a/session/verify", response_model=SessionTokenVerifyResponse)
+async def verify_session(request: SessionTokenVerifyRequest):
+    """Validate a session token from its signature and the revocation denylist, without reading the session"""
+    token_data = verify_session_token(request.session_token)
+    
+    return SessionTokenVerifyResponse(
+        valid=True,
+        sessionID=token_data.session_id,
+        initiatingAgent=token_data.initiating_agent,
+        targetAgent=token_data.target_agent,
+        task=token_data.task,
+        expiresAt=token_data.expires_at.isoformat()
+    )
+
+@router.get("/a2a/session/revoked")
+async def list_revoked_sessions():
+    """Sessions whose tokens were revoked before expiring, for clients that verify tokens locally"""
+    return {
+        "revoked": [
+            {"session_id": session_id, "expires_at": expires_at}
+            for session_id, expires_at in denylist.entries().items()
+        ]
+    }
 
 @router.get("/a2a/session/{session_id}/status", response_model=SessionStatusResponse)
 async def get_session_status(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get the status of an A2A session"""
     
@@ -48,7 +86,11 @@ async def get_session_status(
             detail="Invalid session ID format"
         )
     
-    session = db.query(A2ASession).filter(A2ASession.session_id == session_uuid).first()
+    session = await db.scalar(select(A2ASession).where(A2ASession.session_id == session_uuid))
+    
+    if not session:
+        # Finished sessions may have been moved out by the session reaper
+        session = await db.get(A2ASessionArchive, session_uuid)
     
     if not session:
         raise HTTPException(
@@ -71,7 +113,7 @@ async def get_session_status(
 async def update_session(
     session_id: str,
     request: SessionUpdateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an A2A session status and context"""
     
@@ -85,7 +127,7 @@ async def update_session(
             detail="Invalid session ID format"
         )
     
-    session = db.query(A2ASession).filter(A2ASession.session_id == session_uuid).first()
+    session = await db.scalar(select(A2ASession).where(A2ASession.session_id == session_uuid))
     
     if not session:
         raise HTTPException(
@@ -101,24 +143,43 @@ async def update_session(
             detail=f"Invalid status. Must be one of: {valid_statuses}"
         )
     
+    # An ended session's token is revoked for good, so it cannot be reopened
+    if session.status != SessionStatus.ACTIVE and request.status == "active":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Session '{session_id}' has ended ({session.status.value}) and cannot be reactivated"
+        )
+    
     try:
-        # Update session
+        # Update session; a session that has ended no longer accepts its token
+        if session.status == SessionStatus.ACTIVE and request.status != "active":
+            await revoke_session_token(db, session.session_id, session.session_token)
         session.status = SessionStatus(request.status)
         if request.context is not None:
             session.context = request.context
-        session.updated_at = datetime.utcnow()
+        session.updated_at = func.now()  # The database clock, which the session reaper compares against
         
-        db.commit()
-        db.refresh(session)
+        # The reaper ends sessions idle for the token lifetime, so an update renews the token
+        if session.status == SessionStatus.ACTIVE:
+            session.session_token = create_session_token(
+                str(session.session_id), session.initiating_agent, session.target_agent, session.task
+            )
+        
+        await db.commit()
+        await db.refresh(session)
         
         return SessionUpdateResponse(
             sessionID=str(session.session_id),
             status=session.status.value,
-            updatedAt=session.updated_at.isoformat()
+            updatedAt=session.updated_at.isoformat(),
+            sessionToken=session.session_token if session.status == SessionStatus.ACTIVE else None
         )
         
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update session: {str(e)}"
@@ -127,7 +188,7 @@ async def update_session(
 @router.delete("/a2a/session/{session_id}")
 async def terminate_session(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Terminate (mark as failed) an A2A session"""
     
@@ -141,7 +202,7 @@ async def terminate_session(
             detail="Invalid session ID format"
         )
     
-    session = db.query(A2ASession).filter(A2ASession.session_id == session_uuid).first()
+    session = await db.scalar(select(A2ASession).where(A2ASession.session_id == session_uuid))
     
     if not session:
         raise HTTPException(
@@ -150,11 +211,12 @@ async def terminate_session(
         )
     
     try:
-        # Mark session as failed
+        # Mark session as failed and revoke its token
+        await revoke_session_token(db, session.session_id, session.session_token)
         session.status = SessionStatus.FAILED
-        session.updated_at = datetime.utcnow()
+        session.updated_at = func.now()
         
-        db.commit()
+        await db.commit()
         
         return {
             "message": f"Session '{session_id}' terminated",
@@ -162,7 +224,7 @@ async def terminate_session(
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to terminate session: {str(e)}"
@@ -170,34 +232,53 @@ async def terminate_session(
 
 @router.get("/a2a/sessions")
 async def list_sessions(
+    response: Response,
     initiating_agent: Optional[str] = None,
     target_agent: Optional[str] = None,
     status_filter: Optional[str] = None,
-    limit: int = 50,
-    offset: int = 0,
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, description="Offset for pagination (deprecated, use cursor)"),
+    cursor: Optional[str] = Query(None, description="next_cursor (or the X-Next-Cursor header) from the previous page"),
+    include_total: bool = Query(False, description="Also count all matching sessions (extra query)"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """List A2A sessions with optional filtering"""
+    """List A2A sessions with optional filtering, newest first"""
     
-    query = db.query(A2ASession)
+    filters = []
     
     # Apply filters
     if initiating_agent:
-        query = query.filter(A2ASession.initiating_agent == initiating_agent)
+        filters.append(A2ASession.initiating_agent == initiating_agent)
     
     if target_agent:
-        query = query.filter(A2ASession.target_agent == target_agent)
+        filters.append(A2ASession.target_agent == target_agent)
     
     if status_filter:
-        if status_filter not in ["active", "completed", "failed"]:
+        if status_filter not in ["active", "completed", "failed", "terminated"]:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status filter. Must be one of: active, completed, failed"
+                detail=f"Invalid status filter. Must be one of: active, completed, failed, terminated"
             )
-        query = query.filter(A2ASession.status == SessionStatus(status_filter))
+        filters.append(A2ASession.status == SessionStatus(status_filter))
+    
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(A2ASession).where(*filters))
+    
+    query = select(A2ASession).where(*filters)
+    
+    # Keyset pagination on (created_at, session_id), most recent first
+    if cursor:
+        created_at, session_id = decode_cursor(cursor)
+        query = query.where(tuple_(A2ASession.created_at, A2ASession.session_id) < tuple_(created_at, session_id))
+    elif offset:
+        query = query.offset(offset)
     
-    # Apply pagination and order by most recent first
-    sessions = query.order_by(A2ASession.created_at.desc()).offset(offset).limit(limit).all()
+    query = query.order_by(A2ASession.created_at.desc(), A2ASession.session_id.desc()).limit(limit + 1)
+    rows = (await db.scalars(query)).all()
+    sessions, next_cursor = split_page(rows, limit, "created_at", "session_id")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     # Convert to response format
     results = []
@@ -214,7 +295,9 @@ async def list_sessions(
     
     return {
         "sessions": results,
-        "total": len(results),
+        "count": len(results),
+        "total": total,  # Only computed when include_total=true
+        "next_cursor": next_cursor,
         "offset": offset,
         "limit": limit
     }
@@ -0,0 +1,261 @@
+"""
+JWT signing keys for ParkBench API
+
+Access tokens are signed with an asymmetric key (EdDSA/Ed25519 by default,
+or RS256) so other services can verify them locally against the public keys
+at /.well-known/jwks.json instead of calling the API.
+
+Keys live in the signing_keys table, shared by all workers, and rotate every
+SIGNING_KEY_ROTATION_DAYS. A new key is published
+SIGNING_KEY_PUBLISH_LEAD_SECONDS before it starts signing, so verifiers'
+cached key sets already contain it, and stays published until every token
+it signed has expired. Private keys are stored encrypted with SECRET_KEY.
+Each worker keeps the parsed keys in memory by kid and reloads them
+periodically.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from fastapi import APIRouter, HTTPException, Response, status
+from jwt.algorithms import get_default_algorithms
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from config.settings import get_settings
+from db.models import get_async_db, get_db, SigningKey
+from .background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+ALGORITHMS = ("EdDSA", "RS256")
+
+# Members of each key type's RFC 7638 thumbprint, used as the kid
+THUMBPRINT_MEMBERS = {"OKP": ("crv", "kty", "x"), "RSA": ("e", "kty", "n")}
+
+# Advisory lock serializing rotation between workers
+ROTATION_LOCK_ID = 7_160_023
+
+class PublishedKey(NamedTuple):
+    kid: str
+    algorithm: str
+    public_jwk: Dict[str, Any]
+    private_key_pem: str
+    not_before: datetime
+    expires_at: datetime
+
+def generate_private_key(algorithm: str):
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+def jwk_thumbprint(jwk: Dict[str, Any]) -> str:
+    members = {name: jwk[name] for name in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    digest = hashlib.sha256(json.dumps(members, separators=(",", ":"), sort_keys=True).encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+def public_jwk(private_key, algorithm: str) -> Dict[str, Any]:
+    jwk = get_default_algorithms()[algorithm].to_jwk(private_key.public_key(), as_dict=True)
+    jwk.pop("key_ops", None)
+    jwk.update(kid=jwk_thumbprint(jwk), alg=algorithm, use="sig")
+    return jwk
+
+def max_token_lifetime() -> timedelta:
+    """Longest lifetime of a token signed with these keys (access or A2A session token)"""
+    settings = get_settings()
+    return timedelta(minutes=max(settings.access_token_expire_minutes, settings.default_session_timeout_minutes))
+
+def new_signing_key(algorithm: str, not_before: datetime) -> SigningKey:
+    settings = get_settings()
+    private_key = generate_private_key(algorithm)
+    jwk = public_jwk(private_key, algorithm)
+    return SigningKey(
+        kid=jwk["kid"],
+        algorithm=algorithm,
+        private_key_pem=private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.BestAvailableEncryption(settings.secret_key.encode())
+        ).decode(),
+        public_jwk=jwk,
+        not_before=not_before,
+        # Signs for one rotation period; then every token it signed expires, plus a margin for clock skew
+        expires_at=(not_before + timedelta(days=settings.signing_key_rotation_days) + max_token_lifetime()
+                    + timedelta(seconds=settings.signing_key_publish_lead_seconds))
+    )
+
+def current_signing_key(keys, algorithm: str, now: datetime):
+    """The newest key of `algorithm` that has started signing and outlives tokens signed now, if any"""
+    usable = [
+        key for key in keys
+        if key.algorithm == algorithm and key.not_before <= now and key.expires_at >= now + max_token_lifetime()
+    ]
+    return max(usable, key=lambda key: key.not_before, default=None)
+
+def rotate_signing_keys(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Delete expired keys and create the next key when due; the caller commits
+
+    Holds an advisory lock until the transaction ends, so workers rotating at
+    the same time create one key between them.
+    """
+    settings = get_settings()
+    now = now or datetime.now(timezone.utc)
+    rotation = timedelta(days=settings.signing_key_rotation_days)
+    lead = timedelta(seconds=settings.signing_key_publish_lead_seconds)
+
+    db.execute(select(func.pg_advisory_xact_lock(ROTATION_LOCK_ID)))
+    deleted = db.execute(delete(SigningKey).where(SigningKey.expires_at < now)).rowcount
+
+    keys = db.scalars(select(SigningKey).where(SigningKey.algorithm == settings.algorithm)).all()
+    current = current_signing_key(keys, settings.algorithm, now)
+    newest = max(keys, key=lambda key: key.not_before, default=None)
+
+    if current is None:
+        # Nothing can sign: start now. Tokens it signs only verify on workers that have reloaded.
+        db.add(new_signing_key(settings.algorithm, now))
+    elif newest.not_before <= now and now >= current.not_before + rotation - lead:
+        # Publish the successor now; it takes over when the current key's period ends
+        db.add(new_signing_key(settings.algorithm, max(current.not_before + rotation, now + lead)))
+    else:
+        return {"created": 0, "deleted": deleted}
+    return {"created": 1, "deleted": deleted}
+
+def published_keys_query(now: datetime):
+    return select(SigningKey).where(SigningKey.expires_at >= now).order_by(SigningKey.not_before)
+
+def published_key(row: SigningKey) -> PublishedKey:
+    return PublishedKey(row.kid, row.algorithm, row.public_jwk, row.private_key_pem, row.not_before, row.expires_at)
+
+class KeyRing:
+    """This worker's copy of the published keys, parsed once per kid"""
+
+    def __init__(self):
+        self.keys: Dict[str, PublishedKey] = {}
+        self.load_attempted = False
+        self._public: Dict[str, Any] = {}
+        self._private: Dict[str, Any] = {}
+
+    def load(self, keys: List[PublishedKey]) -> None:
+        self.load_attempted = True
+        self.keys = {key.kid: key for key in keys}
+        for kid in list(self._public):
+            if kid not in self.keys:
+                self._public.pop(kid)
+                self._private.pop(kid, None)
+        for key in keys:
+            if key.kid not in self._public:
+                self._public[key.kid] = jwt.PyJWK(key.public_jwk, key.algorithm).key
+
+    def ensure_loaded(self) -> None:
+        """Load synchronously if startup did not (scripts and tests); tried once per process"""
+        if self.load_attempted:
+            return
+        self.load_attempted = True
+        try:
+            db = next(get_db())
+            try:
+                rotate_signing_keys(db)
+                db.commit()
+                self.load([published_key(row) for row in db.scalars(published_keys_query(datetime.now(timezone.utc)))])
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Could not load signing keys: {e}")
+
+    def signing_key(self) -> Tuple[str, Any]:
+        """(kid, private key) to sign with now; 503 until a shared key has been loaded"""
+        self.ensure_loaded()
+        settings = get_settings()
+        key = current_signing_key(self.keys.values(), settings.algorithm, datetime.now(timezone.utc))
+        if key is None:
+            # A key only this worker knew would sign tokens that other workers and verifiers reject
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="No token signing key is available",
+                headers={"Retry-After": str(settings.signing_key_refresh_interval_seconds)}
+            )
+
+        private_key = self._private.get(key.kid)
+        if private_key is None:
+            password = get_settings().secret_key.encode()
+            private_key = serialization.load_pem_private_key(key.private_key_pem.encode(), password)
+            self._private[key.kid] = private_key
+        return key.kid, private_key
+
+    def verification_key(self, kid: Optional[str]) -> Optional[Tuple[str, Any]]:
+        """(algorithm, public key) for a published kid"""
+        self.ensure_loaded()
+        key = self.keys.get(kid)
+        if key is None or key.expires_at < datetime.now(timezone.utc):
+            return None
+        return key.algorithm, self._public[kid]
+
+    def jwks(self) -> Dict[str, Any]:
+        self.ensure_loaded()
+        now = datetime.now(timezone.utc)
+        return {"keys": [key.public_jwk for key in self.keys.values() if key.expires_at >= now]}
+
+    def signing_kid(self) -> Optional[str]:
+        key = current_signing_key(self.keys.values(), get_settings().algorithm, datetime.now(timezone.utc))
+        return key.kid if key else None
+
+keyring = KeyRing()
+
+def encode_token(claims: Dict[str, Any]) -> str:
+    """Sign claims with the current key (or SECRET_KEY under HS256)"""
+    settings = get_settings()
+    if settings.algorithm == "HS256":
+        return jwt.encode(claims, settings.secret_key, algorithm="HS256")
+    kid, private_key = keyring.signing_key()
+    return jwt.encode(claims, private_key, algorithm=settings.algorithm, headers={"kid": kid})
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """Verify a token's signature and expiry; raises jwt.InvalidTokenError (or a subclass)"""
+    settings = get_settings()
+    if settings.algorithm == "HS256":
+        return jwt.decode(token, settings.secret_key, algorithms=["HS256"])
+
+    verification_key = keyring.verification_key(jwt.get_unverified_header(token).get("kid"))
+    if verification_key is None:
+        raise jwt.InvalidTokenError("Unknown signing key")
+    algorithm, public_key = verification_key
+    return jwt.decode(token, public_key, algorithms=[algorithm])
+
+async def refresh_signing_keys(progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Rotate keys when due, then reload this worker's key ring"""
+    keyring.load_attempted = True  # Never fall back to a blocking load on the event loop
+    async for db in get_async_db():
+        result = await db.run_sync(rotate_signing_keys)
+        await db.commit()
+        rows = (await db.scalars(published_keys_query(datetime.now(timezone.utc)))).all()
+        keyring.load([published_key(row) for row in rows])
+
+    return {**result, "published": len(keyring.keys), "signing_kid": keyring.signing_kid()}
+
+signing_key_refresher = PeriodicTask(
+    "signing_key_refresh",
+    refresh_signing_keys,
+    interval_seconds=get_settings().signing_key_refresh_interval_seconds,
+    initial_delay_seconds=get_settings().signing_key_refresh_interval_seconds,  # Startup runs it once directly
+    cumulative=("created", "deleted")
+)
+
+router = APIRouter()
+
+@router.get("/.well-known/jwks.json")
+async def get_jwks(response: Response) -> Dict[str, Any]:
+    """
+    Public keys that verify ParkBench access tokens (RFC 7517), including the next key before it is used
+    """
+    response.headers["Cache-Control"] = f"public, max-age={get_settings().jwks_max_age_seconds}"
+    if get_settings().algorithm == "HS256":
+        return {"keys": []}
+    return keyring.jwks()
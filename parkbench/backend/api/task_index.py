@@ -0,0 +1,222 @@
+"""
+In-process inverted index over A2A supported tasks
+
+Used by /a2a/negotiate to find candidate agents without loading every active
+agent. Tasks are indexed by character trigrams, so the substring semantics of
+the original matcher ("requested task appears in a supported task") are kept
+while only agents that can match are ever looked at.
+
+This worker's registration endpoints update the index directly; the
+"task_index_refresh" background task rebuilds it from the database every
+TASK_INDEX_REFRESH_INTERVAL_SECONDS to pick up other workers' writes.
+Requests never load it.
+"""
+
+import asyncio
+import heapq
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from config.settings import get_settings
+from db.models import get_async_db, Agent
+from .background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+
+@dataclass(frozen=True)
+class IndexedAgent:
+    """The slice of an agent that negotiation needs"""
+    agent_name: str
+    supported_tasks: Tuple[str, ...]
+    negotiation: bool
+    token_budget: int
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+# Journal marker for a removal
+_REMOVED = object()
+
+class TaskIndex:
+    """
+    Inverted index: trigram -> normalized task -> agent names
+
+    Postings are kept per distinct (lower-cased) task rather than per agent,
+    so the trigram sets stay small even with many agents sharing a task.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._agents: Dict[str, IndexedAgent] = {}
+        self._task_agents: Dict[str, Set[str]] = {}
+        self._gram_tasks: Dict[str, Set[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._journal: Optional[List[Tuple[str, Any]]] = None  # Writes made while a rebuild is in progress
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def upsert(self, agent_name: str, a2a_data: Optional[Dict]) -> None:
+        """Add or replace an active agent's tasks"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((agent_name, a2a_data))
+            self._upsert_locked(agent_name, a2a_data)
+
+    def _upsert_locked(self, agent_name: str, a2a_data: Optional[Dict]) -> None:
+        a2a_data = a2a_data or {}
+        entry = IndexedAgent(
+            agent_name=agent_name,
+            supported_tasks=tuple(a2a_data.get('supported_tasks', [])),
+            negotiation=a2a_data.get('negotiation', False),
+            token_budget=a2a_data.get('token_budget', 0)
+        )
+
+        self._remove_locked(agent_name)
+        self._agents[agent_name] = entry
+        for task in {task.lower() for task in entry.supported_tasks}:
+            agents = self._task_agents.get(task)
+            if agents is None:
+                agents = self._task_agents[task] = set()
+                for gram in _ngrams(task):
+                    self._gram_tasks.setdefault(gram, set()).add(task)
+            agents.add(agent_name)
+
+    def remove(self, agent_name: str) -> None:
+        """Drop an agent (e.g. on deactivation)"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((agent_name, _REMOVED))
+            self._remove_locked(agent_name)
+
+    def _remove_locked(self, agent_name: str) -> None:
+        entry = self._agents.pop(agent_name, None)
+        if entry is None:
+            return
+
+        for task in {task.lower() for task in entry.supported_tasks}:
+            agents = self._task_agents.get(task)
+            if agents is None:
+                continue
+            agents.discard(agent_name)
+            if not agents:
+                del self._task_agents[task]
+                for gram in _ngrams(task):
+                    tasks = self._gram_tasks.get(gram)
+                    if tasks is not None:
+                        tasks.discard(task)
+                        if not tasks:
+                            del self._gram_tasks[gram]
+
+    def begin_rebuild(self) -> None:
+        """Start recording upserts and removals; call before reading the rows for rebuild()"""
+        with self._lock:
+            self._journal = []
+
+    def cancel_rebuild(self) -> None:
+        """Stop recording without replacing the index"""
+        with self._lock:
+            self._journal = None
+
+    def rebuild(self, rows: Iterable[Tuple[str, Optional[Dict]]]) -> None:
+        """
+        Replace the whole index from (agent_name, a2a_data) pairs
+
+        The new index is built beside the live one, which keeps serving
+        lookups, and swapped in under the lock. Writes recorded since
+        begin_rebuild() are replayed on it first, as the rows may predate them.
+        """
+        fresh = TaskIndex()
+        try:
+            for agent_name, a2a_data in rows:
+                fresh._upsert_locked(agent_name, a2a_data)
+        except BaseException:
+            self.cancel_rebuild()
+            raise
+
+        with self._lock:
+            for agent_name, a2a_data in self._journal or ():
+                if a2a_data is _REMOVED:
+                    fresh._remove_locked(agent_name)
+                else:
+                    fresh._upsert_locked(agent_name, a2a_data)
+            self._agents, self._task_agents, self._gram_tasks = fresh._agents, fresh._task_agents, fresh._gram_tasks
+            self._journal = None
+            self._loaded_at = time.monotonic()
+
+    def _matching_tasks(self, query: str) -> Set[str]:
+        if len(query) < NGRAM_SIZE:
+            # Too short for trigram lookup; the distinct-task vocabulary is still far smaller than the agent set
+            return {task for task in self._task_agents if query in task}
+
+        postings = sorted((self._gram_tasks.get(gram, set()) for gram in _ngrams(query)), key=len)
+        if not postings[0]:
+            return set()
+
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return candidates
+
+        # Trigram overlap is necessary but not sufficient for a substring match
+        return {task for task in candidates if query in task}
+
+    def lookup(self, requested_task: str) -> List[IndexedAgent]:
+        """Agents with at least one supported task containing requested_task (case-insensitive)"""
+        query = requested_task.lower()
+
+        with self._lock:
+            agent_names: Set[str] = set()
+            for task in self._matching_tasks(query):
+                agent_names |= self._task_agents[task]
+            return [self._agents[name] for name in agent_names]
+
+    def top_k(self,
+              requested_task: str,
+              score: Callable[[IndexedAgent], float],
+              k: int = 10,
+              exclude: Optional[str] = None) -> List[Tuple[IndexedAgent, float]]:
+        """Best k matching agents by score (ties broken by agent name)"""
+        scored = [
+            (entry, score(entry))
+            for entry in self.lookup(requested_task)
+            if entry.agent_name != exclude
+        ]
+        return heapq.nsmallest(k, scored, key=lambda item: (-item[1], item[0].agent_name))
+
+# Global task index instance
+task_index = TaskIndex()
+
+async def refresh_task_index(progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the task index from the active agents in the database (A2A block only)"""
+    task_index.begin_rebuild()
+    try:
+        async for db in get_async_db():
+            rows = (await db.execute(
+                select(Agent.agent_name, Agent.agent_metadata['a2a']).where(Agent.active == True)
+            )).all()
+    except BaseException:
+        task_index.cancel_rebuild()
+        raise
+    # Building is CPU-bound; keep it off the event loop
+    await asyncio.to_thread(task_index.rebuild, rows)
+    return {"agents": len(task_index), "tasks": len(task_index._task_agents)}
+
+task_index_refresher = PeriodicTask(
+    "task_index_refresh",
+    refresh_task_index,
+    interval_seconds=get_settings().task_index_refresh_interval_seconds,
+    initial_delay_seconds=get_settings().task_index_refresh_interval_seconds  # Startup runs it once directly
+)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: onboarding a fleet of agents, one POST /register per agent vs. POST /register/bulk
+
+Generates self-signed certificates for N agents, then registers them once
+through the single-agent endpoint and once through the bulk endpoint in
+chunks. Runs the app in-process (TestClient) against the database from
+DATABASE_URL and deletes its agents afterwards.
+
+Usage:
+    python benchmarks/bench_bulk_registration.py [--agents 1000] [--chunk-size 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from fastapi.testclient import TestClient
+
+from db.models import get_db, Agent
+
+AGENT_PREFIX = "bench-bulk-"
+
+def make_certificate(agent_name: str, key) -> str:
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, agent_name)])
+    now = datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=90))
+        .sign(key, hashes.SHA256())
+    )
+    return certificate.public_bytes(serialization.Encoding.PEM).decode()
+
+def make_agents(count: int, run: str) -> list:
+    key = ec.generate_private_key(ec.SECP256R1())
+    agents = []
+    for i in range(count):
+        agent_name = f"{AGENT_PREFIX}{run}-{i}.example.com"
+        agents.append({
+            "agentName": agent_name,
+            "certificatePEM": make_certificate(agent_name, key),
+            "metadata": {
+                "description": "Bulk registration benchmark agent",
+                "version": "1.0.0",
+                "maintainer_contact": "bench@example.com",
+                "api_endpoint": f"https://{agent_name}/api",
+                "protocols": ["REST", "A2A"],
+                "a2a_compliant": True,
+                "skills": ["bench", f"skill-{i % 20}"],
+                "input_formats": ["JSON"],
+                "output_formats": ["JSON"],
+                "pricing_model": "free",
+                "public_key": "ssh-ed25519 AAAA",
+                "a2a": {"supported_tasks": [f"task-{i % 50}"], "negotiation": True, "context_required": [], "token_budget": 1000}
+            }
+        })
+    return agents
+
+def cleanup() -> None:
+    db = next(get_db())
+    try:
+        db.query(Agent).filter(Agent.agent_name.like(f"{AGENT_PREFIX}%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    from main import app
+
+    print(f"Generating {2 * args.agents} certificates...")
+    single_agents = make_agents(args.agents, f"single{uuid.uuid4().hex[:6]}")
+    bulk_agents = make_agents(args.agents, f"bulk{uuid.uuid4().hex[:6]}")
+
+    try:
+        with TestClient(app) as client:
+            start = time.perf_counter()
+            for agent in single_agents:
+                client.post("/api/v1/register", json=agent)
+            single_seconds = time.perf_counter() - start
+
+            registered = 0
+            start = time.perf_counter()
+            for offset in range(0, len(bulk_agents), args.chunk_size):
+                response = client.post("/api/v1/register/bulk", json={"agents": bulk_agents[offset:offset + args.chunk_size]})
+                response.raise_for_status()
+                registered += response.json()["registered"]
+            bulk_seconds = time.perf_counter() - start
+
+        print(f"{args.agents} agents, bulk chunks of {args.chunk_size}, {os.cpu_count()} CPUs")
+        print(f"  POST /register      : {single_seconds:7.2f} s  ({args.agents / single_seconds:8.1f} agents/s)")
+        print(f"  POST /register/bulk : {bulk_seconds:7.2f} s  ({args.agents / bulk_seconds:8.1f} agents/s, {registered} registered)")
+        print(f"  speedup             : {single_seconds / bulk_seconds:7.1f}x")
+    finally:
+        cleanup()
+
+if __name__ == "__main__":  # Required: certificate validation workers are spawned processes
+    main()
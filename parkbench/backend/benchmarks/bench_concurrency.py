@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Benchmark: request throughput under many concurrent clients, sync vs. async DB access
+
+Serves the same profile lookup two ways from one uvicorn worker:
+
+  /sync/agents/{name}   async handler on the synchronous Session (get_db), the
+                        pattern every router used before the asyncpg port -
+                        each query blocks the event loop
+  /async/agents/{name}  async handler on AsyncSession (get_async_db), as the
+                        routers do now
+
+and drives each with N concurrent clients for a fixed duration, while a probe
+measures /health latency to show event-loop stalls. --query-delay-ms adds a
+pg_sleep to every lookup to model a slow query. Seeds (and afterwards deletes)
+its own agents in the database from DATABASE_URL.
+
+Both engines use the default pool (5 + 10 overflow). On the sync path a
+blocked pool checkout also stalls the event loop, which is what has to hand
+connections back, so under load requests wait out the pool timeout; those
+show up as errors (client --timeout) rather than as a slow number.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--clients 500] [--duration 10] [--query-delay-ms 0]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.models import get_async_db, get_db, init_db, sync_agent_capabilities, Agent
+from api.discovery import build_agent_profile
+
+AGENT_PREFIX = "bench-concurrency-"
+QUERY_DELAY_SECONDS = float(os.getenv("BENCH_QUERY_DELAY_MS", "0")) / 1000
+
+app = FastAPI()
+
+@app.on_event("startup")
+async def startup():
+    init_db()  # As main.py does, so concurrent first requests don't race the lazy init
+
+@app.get("/sync/agents/{agent_name}")
+async def sync_profile(agent_name: str, db: Session = Depends(get_db)):
+    if QUERY_DELAY_SECONDS:
+        db.execute(text("SELECT pg_sleep(:s)"), {"s": QUERY_DELAY_SECONDS})
+    agent = db.query(Agent).filter(Agent.agent_name == agent_name).first()
+    if not agent:
+        raise HTTPException(status_code=404)
+    return build_agent_profile(agent)
+
+@app.get("/async/agents/{agent_name}")
+async def async_profile(agent_name: str, db: AsyncSession = Depends(get_async_db)):
+    if QUERY_DELAY_SECONDS:
+        await db.execute(text("SELECT pg_sleep(:s)"), {"s": QUERY_DELAY_SECONDS})
+    agent = await db.scalar(select(Agent).where(Agent.agent_name == agent_name))
+    if not agent:
+        raise HTTPException(status_code=404)
+    return build_agent_profile(agent)
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy"}
+
+def seed(count: int) -> list:
+    init_db()
+    db = next(get_db())
+    try:
+        names = [f"{AGENT_PREFIX}{uuid.uuid4().hex[:12]}.example.com" for _ in range(count)]
+        for name in names:
+            agent = Agent(
+                agent_name=name,
+                certificate_pem="-----BEGIN CERTIFICATE-----\nBENCH\n-----END CERTIFICATE-----",
+                agent_metadata={"description": "Concurrency benchmark agent", "skills": ["bench"], "protocols": ["REST"]},
+                verified=True,
+                active=True
+            )
+            db.add(agent)
+            db.flush()
+            sync_agent_capabilities(db, agent)
+        db.commit()
+        return names
+    finally:
+        db.close()
+
+def cleanup() -> None:
+    db = next(get_db())
+    try:
+        db.query(Agent).filter(Agent.agent_name.like(f"{AGENT_PREFIX}%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+async def wait_until_up(base_url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(f"{base_url}/health")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("benchmark server did not start")
+
+async def run_load(base_url: str, mode: str, names: list, clients: int, duration: float, timeout: float) -> dict:
+    latencies, probe_latencies = [], []
+    ok = errors = 0
+    deadline = time.perf_counter() + duration
+
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        async def worker(offset: int):
+            nonlocal ok, errors
+            i = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(f"/{mode}/agents/{names[i % len(names)]}")
+                    if response.status_code == 200:
+                        ok += 1
+                    else:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+                i += clients
+
+        async def probe():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    await client.get("/health")
+                except httpx.HTTPError:
+                    pass
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        await asyncio.gather(probe(), *(worker(i) for i in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": ok / elapsed,  # Successful responses only
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "health_p50_ms": statistics.median(probe_latencies) * 1000 if probe_latencies else float("nan"),
+        "health_max_ms": max(probe_latencies) * 1000 if probe_latencies else float("nan"),
+        "errors": errors
+    }
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "bench_concurrency:app", "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env
+    )
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()  # A stalled event loop may never finish a graceful shutdown
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--query-delay-ms", type=float, default=0)
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=15, help="Client request timeout in seconds")
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    args = parser.parse_args()
+
+    names = seed(args.agents)
+    base_url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, BENCH_QUERY_DELAY_MS=str(args.query_delay_ms))
+
+    try:
+        print(f"{args.clients} clients, {args.duration:.0f}s per mode, query delay {args.query_delay_ms:.0f} ms, one uvicorn worker")
+        for mode in args.modes:
+            # A fresh server per mode: a stalled sync run must not leak into the next one
+            server = start_server(args.port, env)
+            try:
+                asyncio.run(wait_until_up(base_url))
+                asyncio.run(run_load(base_url, mode, names, 5, 1, args.timeout))  # Warm up the pool
+                result = asyncio.run(run_load(base_url, mode, names, args.clients, args.duration, args.timeout))
+            finally:
+                stop_server(server)
+            print(f"  {mode:>5}: {result['rps']:8.1f} req/s | p50 {result['p50_ms']:8.1f} ms p99 {result['p99_ms']:8.1f} ms | "
+                  f"/health p50 {result['health_p50_ms']:7.1f} ms max {result['health_max_ms']:7.1f} ms | "
+                  f"errors {result['errors']}/{result['requests']}")
+    finally:
+        cleanup()
+
+if __name__ == "__main__":
+    main()
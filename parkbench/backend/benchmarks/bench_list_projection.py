@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: discovery list views, full Agent rows vs. summary projection
+
+Seeds agents with realistic certificate and metadata sizes inside a
+transaction that is rolled back, then times fetching and serializing one
+page (default 100) both ways and records peak Python allocations with
+tracemalloc. Needs the database from DATABASE_URL.
+
+Usage:
+    python benchmarks/bench_list_projection.py [--agents 2000] [--page-size 100] [--repeat 50]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from config.settings import get_settings
+from db.models import Base, Agent
+from api.discovery import AGENT_SUMMARY_COLUMNS, AgentSearchResult, to_search_result
+
+# Roughly the size of a 4096-bit RSA certificate in PEM form
+FAKE_PEM = "-----BEGIN CERTIFICATE-----\n" + ("A" * 64 + "\n") * 30 + "-----END CERTIFICATE-----"
+
+def seed(db: Session, count: int) -> None:
+    for i in range(count):
+        db.add(Agent(
+            agent_name=f"bench-{uuid.uuid4().hex[:12]}.example.com",
+            certificate_pem=FAKE_PEM,
+            agent_metadata={
+                "description": f"Benchmark agent {i} " + "lorem ipsum " * 10,
+                "version": "1.0.0",
+                "maintainer_contact": "bench@example.com",
+                "api_endpoint": f"https://bench-{i}.example.com/api",
+                "protocols": ["REST", "A2A"],
+                "a2a_compliant": True,
+                "skills": [f"skill-{i % 20}", "translation", "summarization"],
+                "input_formats": ["JSON", "text"],
+                "output_formats": ["JSON"],
+                "pricing_model": "free",
+                "public_key": "ssh-rsa " + "B" * 700,
+                "a2a": {
+                    "supported_tasks": [f"task-{i % 30}", "translate", "summarize"],
+                    "negotiation": True,
+                    "context_required": ["source_language"],
+                    "token_budget": 5000
+                }
+            },
+            verified=True,
+            active=True
+        ))
+    db.flush()
+
+def full_rows(db: Session, page_size: int):
+    """The pre-projection list path: whole Agent entities, then serialize"""
+    agents = db.query(Agent).filter(Agent.active == True).order_by(
+        Agent.created_at, Agent.agent_id).limit(page_size).all()
+    results = []
+    for agent in agents:
+        metadata = agent.agent_metadata
+        results.append(AgentSearchResult(
+            agent_id=str(agent.agent_id),
+            agent_name=agent.agent_name,
+            description=metadata.get('description', ''),
+            skills=metadata.get('skills', []),
+            protocols=metadata.get('protocols', []),
+            a2a_compliant=metadata.get('a2a_compliant', False),
+            verified=agent.verified,
+            active=agent.active,
+            api_endpoint=metadata.get('api_endpoint', '')
+        ))
+    db.expunge_all()
+    return results
+
+def projected(db: Session, page_size: int):
+    rows = db.query(*AGENT_SUMMARY_COLUMNS).filter(Agent.active == True).order_by(
+        Agent.created_at, Agent.agent_id).limit(page_size).all()
+    return [to_search_result(row) for row in rows]
+
+def measure(fn, db: Session, page_size: int, repeat: int):
+    fn(db, page_size)  # Warm up caches and the statement cache
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(db, page_size)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn(db, page_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(samples), peak / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(get_settings().database_url)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        db = Session(bind=connection)
+        try:
+            seed(db, args.agents)
+
+            full_ms, full_kb = measure(full_rows, db, args.page_size, args.repeat)
+            proj_ms, proj_kb = measure(projected, db, args.page_size, args.repeat)
+            assert full_rows(db, args.page_size) == projected(db, args.page_size)
+
+            print(f"page size {args.page_size}, {args.agents} seeded agents")
+            print(f"  full Agent rows : {full_ms:7.2f} ms median, {full_kb:8.1f} KiB peak")
+            print(f"  projection      : {proj_ms:7.2f} ms median, {proj_kb:8.1f} KiB peak")
+            print(f"  -> {full_ms / proj_ms:.1f}x faster, {full_kb / proj_kb:.1f}x less memory")
+        finally:
+            db.close()
+            transaction.rollback()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rate limiter cost per request and memory per identifier
+
+Compares the original sliding-log limiter (a list of request timestamps per
+identifier, rebuilt on every call) with the GCRA MemoryRateLimiter:
+
+  hot key  one API key at its 1000 req/h limit, calls per second
+  fleet    N identifiers with M requests each, traced memory per identifier
+
+Runs in-process; no database or server needed.
+
+Usage:
+    python benchmarks/bench_rate_limiter.py [--limit 1000] [--calls 20000] [--identifiers 100000] [--requests-each 20]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from api.rate_limit import MemoryRateLimiter, RateLimitInfo
+
+class LegacyRateLimiter:
+    """The sliding-log limiter MemoryRateLimiter replaced"""
+
+    def __init__(self):
+        self.requests = defaultdict(list)
+        self.locks = defaultdict(asyncio.Lock)
+
+    async def is_allowed(self, identifier: str, limit: int = 100, window: int = 3600) -> RateLimitInfo:
+        now = time.time()
+        window_start = now - window
+        async with self.locks[identifier]:
+            self.requests[identifier] = [t for t in self.requests[identifier] if t > window_start]
+            current_count = len(self.requests[identifier])
+            if current_count >= limit:
+                oldest_request = min(self.requests[identifier]) if self.requests[identifier] else now
+                return RateLimitInfo(requests_remaining=0, reset_time=datetime.fromtimestamp(oldest_request + window), limit=limit)
+            self.requests[identifier].append(now)
+            return RateLimitInfo(requests_remaining=limit - (current_count + 1), reset_time=datetime.fromtimestamp(now + window), limit=limit)
+
+async def hot_key(limiter, limit: int, calls: int) -> float:
+    """Calls per second for one identifier that has already used its whole allowance"""
+    for _ in range(limit):
+        await limiter.is_allowed("apikey:hot", limit=limit)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await limiter.is_allowed("apikey:hot", limit=limit)
+    return calls / (time.perf_counter() - start)
+
+async def fleet(limiter, identifiers: list, requests_each: int, limit: int) -> float:
+    """Traced bytes of limiter state per identifier"""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in range(requests_each):
+            for identifier in identifiers:
+                await limiter.is_allowed(identifier, limit=limit)
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return used / len(identifiers)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=1000, help="Requests per hour (APIKeyData.rate_limit)")
+    parser.add_argument("--calls", type=int, default=20000, help="Calls timed on the hot key")
+    parser.add_argument("--identifiers", type=int, default=100000)
+    parser.add_argument("--requests-each", type=int, default=20)
+    args = parser.parse_args()
+
+    identifiers = [f"agent:agent-{i}.bench.example.com" for i in range(args.identifiers)]
+    print(f"limit {args.limit}/h, {args.identifiers} identifiers x {args.requests_each} requests")
+    for name, factory in (("list (old)", LegacyRateLimiter), ("GCRA", MemoryRateLimiter)):
+        rate = asyncio.run(hot_key(factory(), args.limit, args.calls))
+        bytes_each = asyncio.run(fleet(factory(), identifiers, args.requests_each, args.limit))
+        print(f"  {name:>10}: hot key {rate:10.0f} calls/s ({1e6 / rate:7.1f} us/call) | "
+              f"fleet {bytes_each:7.0f} B/identifier ({bytes_each * args.identifiers / 2**20:6.1f} MiB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /health latency while a storm of registrations is in flight
+
+Registers agents with fresh RSA certificates (so every one misses the
+certificate cache) from N concurrent clients, while a probe measures /health
+latency, once per certificate executor:
+
+  inline   parsing and signature checks on the event loop (the old behaviour)
+  thread   on a thread pool
+  process  on a process pool (the default)
+
+Each executor gets a fresh uvicorn worker. Registers against the database
+from DATABASE_URL and deletes its agents afterwards.
+
+Usage:
+    python benchmarks/bench_registration_storm.py [--clients 50] [--agents 1000] [--key-size 4096]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from db.models import get_db, init_db, Agent
+
+AGENT_PREFIX = "bench-storm-"
+
+def make_registrations(count: int, key_size: int) -> list:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    run = uuid.uuid4().hex[:8]
+    now = datetime.utcnow()
+    registrations = []
+    for i in range(count):
+        agent_name = f"{AGENT_PREFIX}{run}-{i}.example.com"
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, agent_name)])
+        certificate = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(days=1))
+            .not_valid_after(now + timedelta(days=90))
+            .sign(key, hashes.SHA256())
+        )
+        registrations.append({
+            "agentName": agent_name,
+            "certificatePEM": certificate.public_bytes(serialization.Encoding.PEM).decode(),
+            "metadata": {
+                "description": "Registration storm benchmark agent",
+                "version": "1.0.0",
+                "maintainer_contact": "bench@example.com",
+                "api_endpoint": f"https://{agent_name}/api",
+                "protocols": ["REST"],
+                "a2a_compliant": True,
+                "skills": ["bench"],
+                "input_formats": ["JSON"],
+                "output_formats": ["JSON"],
+                "pricing_model": "free",
+                "public_key": "ssh-rsa AAAA",
+                "a2a": {"supported_tasks": ["bench"], "negotiation": False, "context_required": [], "token_budget": 100}
+            }
+        })
+    return registrations
+
+def cleanup() -> None:
+    init_db()
+    db = next(get_db())
+    try:
+        db.query(Agent).filter(Agent.agent_name.like(f"{AGENT_PREFIX}%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+async def wait_until_up(base_url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(200):
+            try:
+                await client.get(f"{base_url}/health")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("benchmark server did not start")
+
+async def run_storm(base_url: str, registrations: list, clients: int) -> dict:
+    register_latencies, probe_latencies = [], []
+    errors = 0
+    queue = list(reversed(registrations))
+    done = False
+
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while queue:
+                registration = queue.pop()
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/api/v1/register", json=registration)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                register_latencies.append(time.perf_counter() - start)
+
+        async def probe():
+            while not done:
+                start = time.perf_counter()
+                try:
+                    await client.get("/health")
+                except httpx.HTTPError:
+                    pass
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        done = True
+        await probe_task
+
+    probe_latencies.sort()
+    return {
+        "registrations_per_second": len(register_latencies) / elapsed,
+        "register_p50_ms": statistics.median(register_latencies) * 1000,
+        "health_p50_ms": statistics.median(probe_latencies) * 1000,
+        "health_p99_ms": probe_latencies[max(int(len(probe_latencies) * 0.99) - 1, 0)] * 1000,
+        "health_max_ms": probe_latencies[-1] * 1000,
+        "errors": errors
+    }
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."),
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env
+    )
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--agents", type=int, default=1000, help="Registrations per executor")
+    parser.add_argument("--key-size", type=int, default=4096, help="RSA key size of the generated certificates")
+    parser.add_argument("--workers", type=int, default=0, help="CERTIFICATE_VALIDATION_WORKERS (0 = one per CPU)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--executors", nargs="+", choices=["inline", "thread", "process"], default=["inline", "thread", "process"])
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(f"Generating {args.agents * len(args.executors)} RSA-{args.key_size} certificates...")
+    storms = {executor: make_registrations(args.agents, args.key_size) for executor in args.executors}
+
+    try:
+        print(f"{args.clients} clients, {args.agents} registrations per executor, {os.cpu_count()} CPUs, one uvicorn worker")
+        for executor in args.executors:
+            env = dict(
+                os.environ,
+                CERTIFICATE_VALIDATION_EXECUTOR=executor,
+                CERTIFICATE_VALIDATION_WORKERS=str(args.workers)
+            )
+            server = start_server(args.port, env)
+            try:
+                asyncio.run(wait_until_up(base_url))
+                time.sleep(2)  # Let pool workers finish starting
+                result = asyncio.run(run_storm(base_url, storms[executor], args.clients))
+            finally:
+                stop_server(server)
+            print(f"  {executor:>7}: {result['registrations_per_second']:7.1f} reg/s (p50 {result['register_p50_ms']:7.1f} ms) | "
+                  f"/health p50 {result['health_p50_ms']:6.1f} ms p99 {result['health_p99_ms']:6.1f} ms max {result['health_max_ms']:6.1f} ms | "
+                  f"errors {result['errors']}")
+    finally:
+        cleanup()
+
+if __name__ == "__main__":
+    main()
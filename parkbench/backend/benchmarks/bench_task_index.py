@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /a2a/negotiate candidate matching
+
+Compares the original full scan (substring test against every active agent's
+supported_tasks) with the trigram TaskIndex at 10k and 100k agents. Runs
+in-process on synthetic agents; no database required.
+
+Usage:
+    python benchmarks/bench_task_index.py [--agents 10000 100000] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from api.task_index import TaskIndex
+
+VERBS = ["translate", "summarize", "classify", "extract", "detect", "generate", "review",
+         "transcribe", "rank", "route", "plan", "audit", "forecast", "tag", "score"]
+OBJECTS = ["text", "language", "entities", "sentiment", "code", "invoice", "image", "audio",
+           "contract", "ticket", "email", "report", "schedule", "dataset", "query", "log"]
+
+def make_agents(count: int, rng: random.Random):
+    agents = []
+    for i in range(count):
+        tasks = [f"{rng.choice(VERBS)}-{rng.choice(OBJECTS)}-{rng.randrange(40)}"
+                 for _ in range(rng.randint(1, 5))]
+        agents.append((f"agent-{i}.bench.example.com", {
+            "supported_tasks": tasks,
+            "negotiation": rng.random() < 0.5,
+            "token_budget": rng.choice([500, 1000, 5000, 20000]),
+        }))
+    return agents
+
+def score(negotiation: bool, token_budget: int, preferred_budget: int = 1000) -> float:
+    value = 0.8
+    if negotiation:
+        value += 0.1
+    if token_budget >= preferred_budget:
+        value += 0.1
+    return min(value, 1.0)
+
+def legacy_scan(agents, requested_task: str, exclude: str):
+    """The pre-index algorithm from negotiation.negotiate_task"""
+    candidates = []
+    for agent_name, a2a_data in agents:
+        if agent_name == exclude:
+            continue
+        supported_tasks = a2a_data.get("supported_tasks", [])
+        if any(requested_task.lower() in task.lower() for task in supported_tasks):
+            candidates.append((agent_name, score(a2a_data.get("negotiation", False), a2a_data.get("token_budget", 0))))
+    candidates.sort(key=lambda x: x[1], reverse=True)
+    return candidates[:10]
+
+def indexed(index: TaskIndex, requested_task: str, exclude: str):
+    return index.top_k(requested_task, score=lambda a: score(a.negotiation, a.token_budget), k=10, exclude=exclude)
+
+def timed(fn, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), sorted(samples)[int(len(samples) * 0.95) - 1]
+
+def run(count: int, query_count: int):
+    rng = random.Random(count)
+    agents = make_agents(count, rng)
+
+    start = time.perf_counter()
+    index = TaskIndex()
+    index.rebuild(agents)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Mix of exact task names, selective fragments and broad fragments
+    queries = []
+    for _ in range(query_count):
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(f"{rng.choice(VERBS)}-{rng.choice(OBJECTS)}-{rng.randrange(40)}")
+        elif kind < 0.8:
+            queries.append(f"{rng.choice(VERBS)}-{rng.choice(OBJECTS)}")
+        else:
+            queries.append(rng.choice(VERBS))
+
+    exclude = agents[0][0]
+    for query in queries[:20]:
+        expected = {name for name, _ in legacy_scan(agents, query, exclude)}
+        got = {entry.agent_name for entry, _ in indexed(index, query, exclude)}
+        # Both return a top 10 out of possibly many equal scores, so compare match counts instead of names
+        assert len(expected) == len(got), (query, expected, got)
+
+    scan_p50, scan_p95 = timed(lambda q: legacy_scan(agents, q, exclude), queries)
+    index_p50, index_p95 = timed(lambda q: indexed(index, q, exclude), queries)
+
+    print(f"{count:>7} agents | build {build_ms:8.1f} ms | "
+          f"scan p50 {scan_p50:8.3f} ms p95 {scan_p95:8.3f} ms | "
+          f"index p50 {index_p50:8.3f} ms p95 {index_p95:8.3f} ms | "
+          f"speedup x{scan_p50 / index_p50:,.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    for count in args.agents:
+        run(count, args.queries)
+
+if __name__ == "__main__":
+    main()
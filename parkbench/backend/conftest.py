@@ -0,0 +1,58 @@
+"""
+Shared fixtures for the backend tests
+
+db and module_db are sessions on the database from DATABASE_URL, with the
+schema brought up to date, inside a transaction that is rolled back
+afterwards. Tests using them are skipped when no database is reachable.
+A module that needs its own rows or settings overrides the fixture and
+builds on it:
+
+    @pytest.fixture
+    def db(db):
+        db.execute(text("UPDATE a2a_sessions SET updated_at = now()"))
+        return db
+"""
+
+from typing import Iterator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from config.settings import get_settings
+from db.models import Base, Agent, A2ASession, add_missing_columns
+
+def rolled_back_session() -> Iterator[Session]:
+    engine = create_engine(get_settings().database_url)
+    try:
+        connection = engine.connect()
+    except OperationalError:
+        engine.dispose()
+        pytest.skip("PostgreSQL is not available")
+
+    # As init_db() does, so tables created by an older checkout get the newer columns
+    Base.metadata.create_all(bind=connection)
+    for table in (Agent.__table__, A2ASession.__table__):
+        add_missing_columns(connection, table)
+    connection.commit()
+
+    transaction = connection.begin()
+    session = Session(bind=connection)
+
+    yield session
+
+    session.close()
+    transaction.rollback()
+    connection.close()
+    engine.dispose()
+
+@pytest.fixture
+def db():
+    """Session inside a transaction that is rolled back after each test"""
+    yield from rolled_back_session()
+
+@pytest.fixture(scope="module")
+def module_db():
+    """Session inside a transaction that is rolled back after the module"""
+    yield from rolled_back_session()
@@ -1,14 +1,19 @@
 # Placeholder for database models
 
-from sqlalchemy import create_engine, Column, String, Boolean, Text, TIMESTAMP, Enum, Integer
+from sqlalchemy import create_engine, inspect, select, text, Column, String, Boolean, Text, TIMESTAMP, Enum, Integer, Index, ForeignKey, Computed, exists
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, Session, deferred
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR, DOUBLE_PRECISION, insert as pg_insert
 from sqlalchemy.sql import func
+import asyncio
 import uuid
 import enum
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
 from config.settings import get_settings
+from db.pool import TimedQueuePool, TimedAsyncQueuePool, pool_status
+from db.replica import ReplicaLagMonitor
 import logging
 
 # Database setup
@@ -20,6 +25,16 @@ class SessionStatus(enum.Enum):
     FAILED = "failed"
     TERMINATED = "terminated"
 
+# Text search configuration shared by the agents.search_vector column and queries against it
+TEXT_SEARCH_CONFIG = "english"
+
+# Skills and supported tasks rank above the free-text description
+AGENT_SEARCH_VECTOR_SQL = (
+    f"setweight(jsonb_to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(agent_metadata->'skills', '[]'::jsonb), '[\"string\"]'), 'A') || "
+    f"setweight(jsonb_to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(agent_metadata->'a2a'->'supported_tasks', '[]'::jsonb), '[\"string\"]'), 'A') || "
+    f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(agent_metadata->>'description', '')), 'B')"
+)
+
 class Agent(Base):
     """Agent registration table"""
     __tablename__ = "agents"
@@ -27,10 +42,82 @@ class Agent(Base):
     agent_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     agent_name = Column(String(255), unique=True, nullable=False, index=True)
     certificate_pem = Column(Text, nullable=False)
-    a2a_descriptor = Column(JSONB, nullable=False)  # Updated to match frontend expectations
+    agent_metadata = Column(JSONB, nullable=False)  # Full registration metadata, incl. the "a2a" descriptor
+    verified = Column(Boolean, default=False, nullable=False)
     active = Column(Boolean, default=True, nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Maintained by Postgres from agent_metadata; only read by full-text search, so never loaded with the row
+    search_vector = deferred(Column(TSVECTOR, Computed(AGENT_SEARCH_VECTOR_SQL, persisted=True)))
+    # Extracted from certificate_pem on register/renew; NULL if it could not be parsed
+    certificate_fingerprint = Column(String(64), index=True)  # SHA-256 of the DER certificate, hex
+    certificate_serial = Column(String(64))
+    certificate_issuer = Column(String(255))  # Issuer common name
+    certificate_not_before = Column(TIMESTAMP(timezone=True))
+    certificate_not_after = Column(TIMESTAMP(timezone=True), index=True)
+    certificate_parse_failed = Column(Boolean)  # NULL until the columns above have been extracted
+    
+    __table_args__ = (
+        # jsonb_path_ops GIN index backing the @> containment filters used by discovery
+        Index(
+            "ix_agents_metadata_gin",
+            "agent_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"agent_metadata": "jsonb_path_ops"},
+        ),
+        # Sort key for keyset pagination of /agents and /agents/search
+        Index("ix_agents_created_at_agent_id", "created_at", "agent_id"),
+        # Full-text search (/agents/search?q=)
+        Index("ix_agents_search_vector", "search_vector", postgresql_using="gin"),
+        # Certificate expiry sweep: only verified agents can still need updating
+        Index(
+            "ix_agents_verified_certificate_not_after",
+            "certificate_not_after",
+            postgresql_where=text("verified"),
+        ),
+        # Certificate column backfill: agents registered before the columns existed
+        Index(
+            "ix_agents_certificate_unextracted",
+            "agent_id",
+            postgresql_where=text("certificate_fingerprint IS NULL AND certificate_parse_failed IS NULL"),
+        ),
+    )
+
+class AgentSkill(Base):
+    """Normalized copy of agent_metadata['skills'] for indexed lookups"""
+    __tablename__ = "agent_skills"
+    
+    agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.agent_id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String(255), primary_key=True)
+    active = Column(Boolean, default=True, nullable=False)  # Mirrors Agent.active
+    
+    __table_args__ = (
+        Index("ix_agent_skills_skill_active", "skill", "active", "agent_id"),
+    )
+
+class AgentProtocol(Base):
+    """Normalized copy of agent_metadata['protocols'] for indexed lookups"""
+    __tablename__ = "agent_protocols"
+    
+    agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.agent_id", ondelete="CASCADE"), primary_key=True)
+    protocol = Column(String(255), primary_key=True)
+    active = Column(Boolean, default=True, nullable=False)  # Mirrors Agent.active
+    
+    __table_args__ = (
+        Index("ix_agent_protocols_protocol_active", "protocol", "active", "agent_id"),
+    )
+
+class AgentTask(Base):
+    """Normalized copy of agent_metadata['a2a']['supported_tasks'] (lower-cased)"""
+    __tablename__ = "agent_tasks"
+    
+    agent_id = Column(UUID(as_uuid=True), ForeignKey("agents.agent_id", ondelete="CASCADE"), primary_key=True)
+    task = Column(Text, primary_key=True)
+    active = Column(Boolean, default=True, nullable=False)  # Mirrors Agent.active
+    
+    __table_args__ = (
+        Index("ix_agent_tasks_task_active", "task", "active", "agent_id"),
+    )
 
 class A2ASession(Base):
     """A2A session management table"""
@@ -46,14 +133,214 @@ class A2ASession(Base):
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # Keyset pagination of /a2a/sessions (newest first), optionally per agent
+        Index("ix_a2a_sessions_created_at_session_id", "created_at", "session_id"),
+        Index("ix_a2a_sessions_initiating_created_at", "initiating_agent", "created_at", "session_id"),
+        Index("ix_a2a_sessions_target_created_at", "target_agent", "created_at", "session_id"),
+        # Session reaper: stale active sessions, and finished sessions due for archival, oldest first
+        Index("ix_a2a_sessions_status_updated_at", "status", "updated_at"),
+    )
+
+class A2ASessionArchive(Base):
+    """Finished A2A sessions moved out of a2a_sessions by the session reaper (SESSION_ARCHIVE_AFTER_DAYS)"""
+    __tablename__ = "a2a_sessions_archive"
+    
+    session_id = Column(UUID(as_uuid=True), primary_key=True)
+    initiating_agent = Column(String(255), nullable=False)
+    target_agent = Column(String(255), nullable=False)
+    task = Column(String(255), nullable=False)
+    session_token = Column(Text, nullable=False)
+    status = Column(Enum(SessionStatus), nullable=False)
+    context = Column(JSONB)
+    created_at = Column(TIMESTAMP(timezone=True))
+    updated_at = Column(TIMESTAMP(timezone=True))
+    archived_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+class APIKey(Base):
+    """API keys issued to agents; only a SHA-256 hash of each key is stored"""
+    __tablename__ = "api_keys"
+    
+    key_id = Column(String(32), primary_key=True)  # Public identifier, used to list and revoke
+    key_hash = Column(String(64), unique=True, nullable=False)  # Hex SHA-256 of the full key; verification looks keys up by it
+    agent_name = Column(String(255), nullable=False, index=True)
+    permissions = Column(JSONB, nullable=False)
+    rate_limit = Column(Integer, nullable=False, default=1000)  # Requests per rate limit window
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    expires_at = Column(TIMESTAMP(timezone=True))
+
+class SigningKey(Base):
+    """JWT signing keys, shared by all workers and rotated by api.signing"""
+    __tablename__ = "signing_keys"
+    
+    kid = Column(String(64), primary_key=True)  # RFC 7638 thumbprint of the public key
+    algorithm = Column(String(16), nullable=False)  # "EdDSA" or "RS256"
+    private_key_pem = Column(Text, nullable=False)  # PKCS#8, encrypted with SECRET_KEY
+    public_jwk = Column(JSONB, nullable=False)  # As published at /.well-known/jwks.json
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())  # Published from here on
+    not_before = Column(TIMESTAMP(timezone=True), nullable=False)  # Signs from here until a newer key takes over
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)  # Unpublished; every token it signed has expired
+
+class RevokedSessionToken(Base):
+    """Session tokens ended before they expired; rows are pruned once the token has expired anyway"""
+    __tablename__ = "revoked_session_tokens"
+    
+    session_id = Column(UUID(as_uuid=True), primary_key=True)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)  # The token's own expiry
+
+class RateLimitBucket(Base):
+    """Shared rate limiter state (RATE_LIMIT_BACKEND=postgres): one GCRA arrival time per identifier"""
+    __tablename__ = "rate_limits"
+    
+    identifier = Column(String(255), primary_key=True)  # "agent:<name>" or "ip:<address>"
+    tat = Column(DOUBLE_PRECISION, nullable=False)  # Theoretical arrival time, Unix epoch seconds
+    
+    __table_args__ = (
+        # Pruning of identifiers whose allowance has fully refilled
+        Index("ix_rate_limits_tat", "tat"),
+        # Written on every request; losing it in a crash only resets the limits
+        {"prefixes": ["UNLOGGED"]},
+    )
+
+def sync_agent_capabilities(db: Session, agent: Agent) -> None:
+    """
+    Rebuild the agent_skills / agent_protocols / agent_tasks rows for an agent
+    
+    Runs inside the caller's transaction (the caller commits), so the side
+    tables always change together with the agents row they are derived from.
+    The agent must already have an agent_id (i.e. be flushed).
+    """
+    for model in (AgentSkill, AgentProtocol, AgentTask):
+        db.query(model).filter(model.agent_id == agent.agent_id).delete(synchronize_session=False)
+    
+    for model, rows in agent_capability_rows(agent.agent_id, agent.agent_metadata, bool(agent.active)).items():
+        db.add_all([model(**row) for row in rows])
+
+def agent_capability_rows(agent_id, metadata: Optional[Dict[str, Any]], active: bool) -> Dict[type, List[Dict[str, Any]]]:
+    """Side-table rows derived from an agent's metadata, as column dicts per model"""
+    metadata = metadata or {}
+    a2a_data = metadata.get('a2a') or {}
+    
+    skills = {skill for skill in metadata.get('skills', []) if skill}
+    protocols = {protocol for protocol in metadata.get('protocols', []) if protocol}
+    tasks = {task.lower() for task in a2a_data.get('supported_tasks', []) if task}
+    
+    return {
+        AgentSkill: [{"agent_id": agent_id, "skill": skill, "active": active} for skill in skills],
+        AgentProtocol: [{"agent_id": agent_id, "protocol": protocol, "active": active} for protocol in protocols],
+        AgentTask: [{"agent_id": agent_id, "task": task, "active": active} for task in tasks]
+    }
+
+def set_agent_capabilities_active(db: Session, agent_id, active: bool) -> None:
+    """Propagate an Agent.active change to its side-table rows (caller commits)"""
+    for model in (AgentSkill, AgentProtocol, AgentTask):
+        db.query(model).filter(model.agent_id == agent_id).update(
+            {model.active: active}, synchronize_session=False
+        )
+
+def add_missing_columns(connection, table) -> List[str]:
+    """
+    Add nullable columns and indexes a table gained after it was created
+    
+    create_all() skips tables that already exist, so this keeps older
+    databases in step with the models. Adding a stored generated column
+    (agents.search_vector) rewrites the table, filling it for existing rows.
+    """
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    added = []
+    for column in table.columns:
+        if column.name in existing or not column.nullable:
+            continue
+        column_type = column.type.compile(dialect=connection.dialect)
+        if column.computed is not None:
+            column_type += f" GENERATED ALWAYS AS ({column.computed.sqltext}) STORED"
+        connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS "{column.name}" {column_type}'))
+        added.append(column.name)
+    
+    # Indexes on columns the table still lacks would fail and take startup down with them
+    present = existing | set(added)
+    for index in table.indexes:
+        if all(column.name in present for column in index.columns):
+            index.create(connection, checkfirst=True)
+    return added
+
+def agents_missing_capabilities(batch_size: int, after=None):
+    """
+    Up to batch_size agents whose metadata lists capabilities but who have no side-table rows, by agent_id after `after`
+
+    Agents whose skills, protocols and supported tasks are all empty have
+    nothing to backfill, so they are not selected again on every start.
+    """
+    def listed(value):
+        return (func.jsonb_typeof(value) == "array") & (value != text("'[]'::jsonb"))
+    
+    metadata = Agent.agent_metadata
+    query = select(Agent.agent_id, Agent.agent_metadata, Agent.active).where(
+        listed(metadata["skills"]) | listed(metadata["protocols"]) | listed(metadata[("a2a", "supported_tasks")]),
+        ~exists().where(AgentSkill.agent_id == Agent.agent_id),
+        ~exists().where(AgentProtocol.agent_id == Agent.agent_id),
+        ~exists().where(AgentTask.agent_id == Agent.agent_id)
+    )
+    if after is not None:
+        query = query.where(Agent.agent_id > after)
+    return query.order_by(Agent.agent_id).limit(batch_size)
+
+def backfill_agent_capabilities(db: Session, batch_size: int = 500) -> int:
+    """
+    Populate side tables for agents registered before they existed, one commit per batch
+    
+    Rows another worker inserted meanwhile are skipped rather than duplicated.
+    """
+    backfilled = 0
+    after = None
+    while True:
+        agents = db.execute(agents_missing_capabilities(batch_size, after)).all()
+        if not agents:
+            break
+        
+        batch_rows: Dict[type, List[Dict[str, Any]]] = {AgentSkill: [], AgentProtocol: [], AgentTask: []}
+        for agent in agents:
+            for model, rows in agent_capability_rows(agent.agent_id, agent.agent_metadata, bool(agent.active)).items():
+                batch_rows[model].extend(rows)
+        for model, rows in batch_rows.items():
+            if rows:
+                db.execute(pg_insert(model).values(rows).on_conflict_do_nothing())
+        db.commit()
+        
+        backfilled += len(agents)
+        after = agents[-1].agent_id
+        if len(agents) < batch_size:
+            break
+    return backfilled
+
 # Database engine and session
 engine = None
 SessionLocal = None
+# asyncpg engine used by the API routers (the sync engine above serves schema setup and scripts)
+async_engine = None
+AsyncSessionLocal = None
+# Optional asyncpg engine on a read replica, used by get_read_db
+replica_engine = None
+ReplicaSessionLocal = None
+replica_monitor = None
 _db_initialized = False
 
+def async_database_url(database_url: str) -> URL:
+    """The postgresql+asyncpg form of a libpq-style database URL"""
+    url = make_url(database_url.replace("postgres://", "postgresql://", 1))
+    url = url.set(drivername="postgresql+asyncpg")
+    
+    # asyncpg spells libpq's sslmode as ssl
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    
+    return url
+
 def init_db():
     """Initialize database connection with error handling"""
-    global engine, SessionLocal, _db_initialized
+    global engine, SessionLocal, async_engine, AsyncSessionLocal, _db_initialized
+    global replica_engine, ReplicaSessionLocal, replica_monitor
     
     if _db_initialized:
         return
@@ -62,21 +349,83 @@ def init_db():
         settings = get_settings()
         logging.info(f"Initializing database connection...")
         
+        pool_options = {
+            "pool_size": settings.database_pool_size,
+            "max_overflow": settings.database_max_overflow,
+            "pool_timeout": settings.database_pool_timeout,
+            "pool_pre_ping": True,
+            "pool_recycle": 300  # Recycle connections every 5 minutes
+        }
+        statement_timeout = settings.database_statement_timeout_ms
+        
+        connect_args = {
+            "connect_timeout": 10,
+            "application_name": "parkbench-api"
+        }
+        if statement_timeout:
+            connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+        
         engine = create_engine(
             settings.database_url,
             echo=settings.database_echo,
-            pool_pre_ping=True,
-            pool_recycle=300,  # Recycle connections every 5 minutes
-            connect_args={
-                "connect_timeout": 10,
-                "application_name": "parkbench-api"
-            }
+            poolclass=TimedQueuePool,
+            connect_args=connect_args,
+            **pool_options
         )
         
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         
+        server_settings = {"application_name": "parkbench-api"}
+        if statement_timeout:
+            server_settings["statement_timeout"] = str(statement_timeout)
+        
+        async_connect_args = {
+            "timeout": 10,
+            "server_settings": server_settings
+        }
+        
+        async_engine = create_async_engine(
+            async_database_url(settings.database_url),
+            echo=settings.database_echo,
+            poolclass=TimedAsyncQueuePool,
+            connect_args=async_connect_args,
+            **pool_options
+        )
+        
+        # Attributes stay loaded after commit: lazy refreshes would need IO outside an await
+        AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+        
+        if settings.database_replica_url:
+            replica_engine = create_async_engine(
+                async_database_url(settings.database_replica_url),
+                echo=settings.database_echo,
+                poolclass=TimedAsyncQueuePool,
+                connect_args=async_connect_args,
+                **pool_options
+            )
+            ReplicaSessionLocal = async_sessionmaker(replica_engine, expire_on_commit=False, autoflush=False)
+            replica_monitor = ReplicaLagMonitor(
+                max_lag_seconds=settings.database_replica_max_lag_seconds,
+                check_interval_seconds=settings.database_replica_check_interval_seconds
+            )
+            logging.info("Read replica configured for read-only routes")
+        
         # Create tables
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            for table in (Agent.__table__, A2ASession.__table__):
+                added = add_missing_columns(connection, table)
+                if added:
+                    logging.info(f"Added columns to {table.name}: {', '.join(added)}")
+        
+        db = SessionLocal()
+        try:
+            backfilled = backfill_agent_capabilities(db)
+            if backfilled:
+                logging.info(f"Backfilled capability tables for {backfilled} agents")
+        finally:
+            db.close()
+        
         _db_initialized = True
         logging.info("Database initialized successfully")
         
@@ -95,4 +444,54 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Async database dependency for FastAPI (queries never block the event loop)"""
+    if not _db_initialized:
+        # Schema setup is synchronous; keep it off the event loop
+        await asyncio.to_thread(init_db)
+    
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database dependency for read-only routes
+    
+    Uses the read replica when one is configured and its replication lag is
+    within database_replica_max_lag_seconds, otherwise the primary.
+    """
+    if not _db_initialized:
+        await asyncio.to_thread(init_db)
+    
+    session_factory = AsyncSessionLocal
+    if replica_engine is not None and await replica_monitor.is_fresh(replica_engine):
+        session_factory = ReplicaSessionLocal
+    
+    async with session_factory() as db:
+        yield db
+
+def database_pool_stats() -> Dict[str, Any]:
+    """Occupancy and checkout wait times per pool ("async" serves the API routers, "replica" the read-only ones)"""
+    if not _db_initialized:
+        return {}
+    
+    max_overflow = get_settings().database_max_overflow
+    stats = {
+        "async": pool_status(async_engine.sync_engine.pool, max_overflow),
+        "sync": pool_status(engine.pool, max_overflow)
+    }
+    if replica_engine is not None:
+        stats["replica"] = pool_status(replica_engine.sync_engine.pool, max_overflow)
+        stats["replica"]["routing"] = replica_monitor.stats()
+    return stats
+
+async def close_db() -> None:
+    """Dispose of all engines' connection pools"""
+    if replica_engine is not None:
+        await replica_engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+
 # Don't initialize database on module import - let it be lazy
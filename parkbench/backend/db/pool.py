@@ -0,0 +1,91 @@
+"""
+Instrumented connection pools for ParkBench
+
+QueuePool variants that time every checkout, i.e. how long a request waited
+for a connection (including pool timeouts), so pool_size / max_overflow can
+be sized from real numbers. Stats are per process and reset when the pool is
+recreated (engine.dispose()).
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+class PoolWaitStats:
+    """Checkout wait times: running totals plus a window of recent samples for percentiles"""
+
+    def __init__(self, sample_size: int = 1000):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=sample_size)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self._recent.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            attempts = self.checkouts + self.timeouts
+
+            def percentile(fraction: float) -> float:
+                return round(recent[min(len(recent) - 1, int(len(recent) * fraction))] * 1000, 3)
+
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.total_wait / attempts * 1000, 3) if attempts else None,
+                "wait_max_ms": round(self.max_wait * 1000, 3),
+                "wait_p50_ms": percentile(0.5) if recent else None,
+                "wait_p99_ms": percentile(0.99) if recent else None
+            }
+
+class _TimedCheckout:
+    """Mixin timing Pool.connect(); pre-ping and new-connection time count as wait"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool for the psycopg2 engine"""
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """QueuePool for the asyncpg engine"""
+
+def pool_status(pool: Pool, max_overflow: Optional[int] = None) -> Dict[str, Any]:
+    """Current occupancy of a QueuePool plus its checkout wait stats"""
+    status = {
+        "size": pool.size(),
+        "max_overflow": max_overflow,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),  # QueuePool counts from -size until the pool is full
+        "timeout_seconds": pool.timeout()
+    }
+    if isinstance(pool, _TimedCheckout):
+        status.update(pool.wait_stats.snapshot())
+    return status
@@ -0,0 +1,85 @@
+"""
+Read replica routing for ParkBench
+
+Tracks how far the optional read replica lags the primary so read-only
+routes can use it only while it is fresh enough. Lag is measured on the
+replica itself and re-measured at most once per check interval; an
+unreachable replica counts as infinitely stale until the next check.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Seconds since the replica last replayed a transaction, or 0 when it has replayed
+# everything it received (an idle primary must not look like a lagging replica).
+# Also 0 on a server that is not in recovery, i.e. a replica URL pointing at a primary.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp())::float8, 'Infinity'::float8)
+    END
+""")
+
+class ReplicaLagMonitor:
+    """Decides per request whether the replica is fresh enough to serve reads"""
+
+    def __init__(self, max_lag_seconds: float, check_interval_seconds: float, check_timeout_seconds: float = 2.0):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.check_timeout_seconds = check_timeout_seconds
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _due(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval_seconds
+
+    async def is_fresh(self, engine: AsyncEngine) -> bool:
+        """True if reads may go to the replica; counts the routing decision"""
+        if self._due():
+            async with self._lock:
+                if self._due():  # Another request may have measured while we waited
+                    await self._measure(engine)
+
+        fresh = self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
+        if fresh:
+            self.replica_reads += 1
+        else:
+            self.primary_fallbacks += 1
+        return fresh
+
+    async def _measure(self, engine: AsyncEngine) -> None:
+        try:
+            lag = await asyncio.wait_for(self._query_lag(engine), timeout=self.check_timeout_seconds)
+            self.lag_seconds = float(lag)
+            self.last_error = None
+        except Exception as e:
+            if self.last_error is None:
+                logging.warning(f"Read replica unavailable, reading from primary: {e}")
+            self.lag_seconds = None
+            self.last_error = str(e) or type(e).__name__
+        self._checked_at = time.monotonic()
+
+    @staticmethod
+    async def _query_lag(engine: AsyncEngine) -> float:
+        async with engine.connect() as conn:
+            return await conn.scalar(REPLICA_LAG_SQL)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            # None while unreachable or before anything was replayed
+            "lag_seconds": round(self.lag_seconds, 3) if self.lag_seconds is not None and math.isfinite(self.lag_seconds) else None,
+            "max_lag_seconds": self.max_lag_seconds,
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+            "last_error": self.last_error
+        }
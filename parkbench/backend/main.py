@@ -8,8 +8,8 @@ from typing import Optional, List
 import logging
 
 from config.settings import get_settings
-from db.models import get_db, init_db
-from api import registration, discovery, negotiation, sessions
+from db.models import get_db, init_db, close_db
+from api import registration, discovery, negotiation, sessions, metrics, background, expiry, rate_limit, invalidation, signing, session_tokens, session_reaper, task_index, pagination
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +22,10 @@ app = FastAPI(
     description="An open, vendor-neutral AI agent identity, discovery, negotiation, and orchestration platform"
 )
 
+# Rate limiting; added first so it runs inside CORS and 429 responses still carry CORS headers
+if get_settings().rate_limit_enabled:
+    app.add_middleware(rate_limit.RateLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +33,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After",
+                    pagination.NEXT_CURSOR_HEADER],
 )
 
 @app.on_event("startup")
@@ -41,6 +47,13 @@ async def startup_event():
         # Try to initialize database
         init_db()
         
+        # Token signing keys: create or rotate, and load them before serving requests
+        if get_settings().algorithm != "HS256":
+            await signing.signing_key_refresher.run_once()
+        
+        # Negotiation task index, before serving requests
+        await task_index.task_index_refresher.run_once()
+        
         # Test the database connection by querying table information
         from db.models import get_db
         db = next(get_db())
@@ -61,16 +74,50 @@ async def startup_event():
         
         # Don't fail startup - continue without database for now
         logger.warning("Continuing without database connection - API will have limited functionality")
+    
+    # Cross-worker cache invalidation (API key revocation)
+    invalidation.invalidation_listener_task.start()
+    
+    # Start certificate validation workers up front rather than on the first registration
+    registration.start_certificate_pool()
+    
+    if get_settings().certificate_expiry_sweep_enabled:
+        expiry.certificate_expiry_sweeper.start()
+    
+    if get_settings().session_reaper_enabled:
+        session_reaper.session_reaper.start()
+    
+    if get_settings().rate_limit_enabled:
+        rate_limit.rate_limiter.start()
+    
+    if get_settings().algorithm != "HS256":
+        signing.signing_key_refresher.start()
+    
+    # Other workers' registrations reach the negotiation task index on the next rebuild
+    task_index.task_index_refresher.start()
+    
+    # Revoked session tokens (also delivered through the invalidation listener)
+    session_tokens.session_denylist_refresher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks, then close database connection pools and the certificate validation processes"""
+    await background.stop_all()
+    await invalidation.listener.close()
+    registration.shutdown_certificate_pool()
+    await close_db()
 
 # Include API routers
 app.include_router(registration.router, prefix="/api/v1", tags=["registration"])
 app.include_router(discovery.router, prefix="/api/v1", tags=["discovery"])
 app.include_router(negotiation.router, prefix="/api/v1", tags=["negotiation"])
 app.include_router(sessions.router, prefix="/api/v1", tags=["sessions"])
+app.include_router(metrics.router, prefix="/api/v1", tags=["metrics"])
 
 # Include authentication router
 from api import auth_endpoints
 app.include_router(auth_endpoints.router, prefix="/api/v1/auth", tags=["authentication"])
+app.include_router(signing.router, tags=["authentication"])
 
 @app.get("/")
 async def root():
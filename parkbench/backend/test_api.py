@@ -66,6 +66,53 @@ def test_register_agent():
         print(f"❌ Registration failed: {e}")
         return None
 
+def test_bulk_register_agents():
+    """Test bulk agent registration with per-agent results"""
+    print("🔍 Testing bulk agent registration...")
+    
+    metadata = {
+        "description": "Bulk test agent",
+        "version": "1.0.0",
+        "maintainer_contact": "test@example.com",
+        "api_endpoint": "https://bulk-test.example.com/api",
+        "protocols": ["REST"],
+        "a2a_compliant": True,
+        "skills": ["bulk-test"],
+        "input_formats": ["JSON"],
+        "output_formats": ["JSON"],
+        "pricing_model": "free",
+        "public_key": "ssh-rsa AAAAB3...EXAMPLE...KEY",
+        "a2a": {
+            "supported_tasks": ["bulk-test"],
+            "negotiation": False,
+            "context_required": [],
+            "token_budget": 100
+        }
+    }
+    agents = [
+        {
+            "agentName": f"bulk-test-{i}.agents.example.com",
+            "certificatePEM": "-----BEGIN CERTIFICATE-----\nMIIC...EXAMPLE...CERT\n-----END CERTIFICATE-----",
+            "metadata": metadata
+        }
+        for i in range(3)
+    ]
+    agents.append(agents[0])  # Repeated name: only this entry should fail
+    
+    response = requests.post(f"{BASE_URL}/api/v1/register/bulk", json={"agents": agents})
+    assert response.status_code == 200, f"Bulk registration failed: {response.status_code} - {response.text}"
+    
+    data = response.json()
+    statuses = [result["status"] for result in data["results"]]
+    assert len(statuses) == len(agents)
+    assert statuses[-1] == "failed"
+    assert data["registered"] + data["failed"] == len(agents)
+    print(f"✅ Bulk registration: {data['registered']} registered, {data['failed']} failed")
+    return True  # main() counts truthy results as passed; failures raise
+
+# Needs the API running at BASE_URL: run through main(), not collected by pytest
+test_bulk_register_agents.__test__ = False
+
 def test_search_agents():
     """Test agent search functionality"""
     print("🔍 Testing agent search...")
@@ -145,6 +192,7 @@ def main():
     tests = [
         test_health_check,
         test_register_agent,
+        test_bulk_register_agents,
         test_search_agents,
         test_get_agent_profile,
         test_a2a_negotiation
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Persistent API key store
+
+Runs against the database from DATABASE_URL and deletes its keys
+afterwards. Skipped when no database is reachable.
+"""
+
+import asyncio
+import uuid
+
+import asyncpg
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, delete, func, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config.settings import get_settings
+from db.models import Base, APIKey, async_database_url
+from api.auth import generate_api_key, hash_api_key, revoke_api_key, verify_api_key
+from api import cache as cache_module, invalidation
+from api.cache import TTLCache, agent_descriptor_cache, agent_profile_cache, api_key_cache
+from api.discovery import invalidate_agents
+from api.invalidation import CHANNEL, InvalidationListener, register_cache
+from test_discovery_indexes import Explain
+
+AGENT_NAME = f"keys-{uuid.uuid4().hex[:12]}.example.com"
+
+@pytest.fixture(scope="module")
+def session_factory():
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.begin() as connection:
+            Base.metadata.create_all(bind=connection, tables=[APIKey.__table__])
+    except OperationalError:
+        pytest.skip("PostgreSQL is not available")
+
+    yield lambda: async_sessionmaker(create_async_engine(async_database_url(get_settings().database_url)), expire_on_commit=False)
+
+    with engine.begin() as connection:
+        connection.execute(delete(APIKey).where(APIKey.agent_name == AGENT_NAME))
+    engine.dispose()
+
+def run(session_factory, test):
+    async def main():
+        factory = session_factory()
+        try:
+            async with factory() as db:
+                return await test(db, factory)
+        finally:
+            await factory.kw["bind"].dispose()
+    return asyncio.run(main())
+
+def test_keys_are_stored_hashed_and_verified_from_cache(session_factory):
+    async def test(db, factory):
+        api_key, key_data = await generate_api_key(db, AGENT_NAME, ["read"])
+        row = await db.scalar(select(APIKey).where(APIKey.key_id == key_data.key_id))
+        assert row.key_hash == hash_api_key(api_key) and api_key not in row.key_hash
+
+        misses = api_key_cache.misses
+        assert (await verify_api_key(api_key, db)).agent_name == AGENT_NAME
+        assert api_key_cache.misses == misses + 1
+
+        # Hot keys need no query: a session without a database still verifies them
+        hits = api_key_cache.hits
+        assert (await verify_api_key(api_key, None)).permissions == ["read"]
+        assert api_key_cache.hits == hits + 1
+
+        with pytest.raises(HTTPException) as error:
+            await verify_api_key("pk_not-a-key", db)
+        assert error.value.status_code == 401
+
+        # Repeating an unknown key is rejected without a query
+        with pytest.raises(HTTPException) as error:
+            await verify_api_key("pk_not-a-key", None)
+        assert error.value.status_code == 401
+
+    run(session_factory, test)
+
+async def wait_for(condition) -> None:
+    for _ in range(50):
+        if condition():
+            return
+        await asyncio.sleep(0.05)
+
+def test_revocation_notifies_every_worker(session_factory):
+    async def test(db, factory):
+        api_key, key_data = await generate_api_key(db, AGENT_NAME, ["read"])
+        await verify_api_key(api_key, db)
+
+        # Stand-in for another worker's LISTEN connection
+        payloads = []
+        connection = await asyncpg.connect(InvalidationListener()._dsn())
+        await connection.add_listener(CHANNEL, lambda *args: payloads.append(args[-1]))
+        try:
+            assert await revoke_api_key(db, key_data.key_id)
+            await wait_for(lambda: payloads)
+        finally:
+            await connection.close()
+
+        assert payloads == [f"api_keys:{hash_api_key(api_key)}"]
+        with pytest.raises(HTTPException):
+            await verify_api_key(api_key, db)
+        assert not await revoke_api_key(db, key_data.key_id)
+
+    run(session_factory, test)
+
+def test_listener_evicts_notified_keys(session_factory):
+    async def test(db, factory):
+        cache = register_cache(TTLCache("invalidation_test", maxsize=10, ttl_seconds=60))
+        cache.set("stale", 1)
+        cache.set("kept", 2)
+
+        listener = InvalidationListener()
+        try:
+            await listener.check({})
+            assert cache.get("stale") is None  # Caches are cleared on connect: notifications may have been missed
+            cache.set("stale", 1)
+            cache.set("kept", 2)
+
+            async with factory() as other_worker:
+                await other_worker.execute(select(func.pg_notify(CHANNEL, "invalidation_test:stale")))
+                await other_worker.commit()
+            await wait_for(lambda: cache.get("stale") is None)
+
+            assert cache.get("stale") is None and cache.get("kept") == 2
+            assert (await listener.check({}))["notifications"] == 1
+        finally:
+            await listener.close()
+            invalidation._caches.pop(cache.name)
+            cache_module._registry.pop(cache.name)
+
+    run(session_factory, test)
+
+def test_lookups_use_indexes(db):
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plans = [
+        "\n".join(db.scalars(Explain(query)).all())
+        for query in (
+            select(APIKey).where(APIKey.key_hash == hash_api_key("pk_example")),
+            select(APIKey).where(APIKey.agent_name == AGENT_NAME)
+        )
+    ]
+    assert "api_keys_key_hash_key" in plans[0]
+    assert "ix_api_keys_agent_name" in plans[1]
+
+def test_agent_invalidation_reaches_every_worker(session_factory):
+    async def test(db, factory):
+        names = [f"cached-{uuid.uuid4().hex[:8]}.example.com" for _ in range(3)]
+        listener = InvalidationListener()  # Another worker's listener, in this process
+        try:
+            await listener.check({})
+            for name in names + ["kept.example.com"]:
+                agent_profile_cache.set(name, b"{}")
+                agent_descriptor_cache.set(name, b"{}")
+
+            async with factory() as writer:
+                await invalidate_agents(writer, names)
+                # Other workers still serve their copies until the write commits
+                assert (await listener.check({}))["notifications"] == 0
+                for name in names:
+                    agent_profile_cache.set(name, b"{}")
+                await writer.commit()
+            await wait_for(lambda: all(agent_profile_cache.get(name) is None for name in names))
+
+            assert all(agent_profile_cache.get(name) is None and agent_descriptor_cache.get(name) is None
+                       for name in names)
+            assert agent_profile_cache.get("kept.example.com") == b"{}"
+            assert (await listener.check({}))["notifications"] == len(names)
+        finally:
+            await listener.close()
+
+    run(session_factory, test)
@@ -0,0 +1,104 @@
+"""
+Parsed-certificate cache used by validate_certificate
+
+Runs in-process against generated certificates; no database or server needed.
+"""
+
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from api import cache, registration
+from api.cache import certificate_cache
+
+AGENT_NAME = "cache-test.agents.example.com"
+
+def make_certificate(not_before: datetime, not_after: datetime) -> str:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, AGENT_NAME)])
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(not_before)
+        .not_valid_after(not_after)
+        .sign(key, hashes.SHA256())
+    )
+    return certificate.public_bytes(serialization.Encoding.PEM).decode()
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    certificate_cache.clear()
+    yield
+    certificate_cache.clear()
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    calls = []
+    parse = registration.parse_certificate
+    
+    def counting_parse(certificate_pem, agent_name):
+        calls.append(agent_name)
+        return parse(certificate_pem, agent_name)
+    
+    monkeypatch.setattr(registration, "parse_certificate", counting_parse)
+    return calls
+
+def test_repeat_validation_is_served_from_cache(parse_calls):
+    now = datetime.utcnow()
+    pem = make_certificate(now - timedelta(days=1), now + timedelta(days=30))
+    
+    first = registration.validate_certificate(pem, AGENT_NAME)
+    # Re-wrapped PEM text, same certificate: same fingerprint
+    second = registration.validate_certificate(pem.replace("\n", "\r\n"), AGENT_NAME)
+    
+    assert first.is_valid and second is first
+    assert parse_calls == [AGENT_NAME]
+    
+    # The name check depends on agent_name, so it is part of the key
+    other = registration.validate_certificate(pem, "other.example.com")
+    assert not other.is_valid
+    assert len(parse_calls) == 2
+
+def test_entry_expires_at_not_after(parse_calls, monkeypatch):
+    now = datetime.utcnow()
+    pem = make_certificate(now - timedelta(days=1), now + timedelta(seconds=60))
+    assert registration.validate_certificate(pem, AGENT_NAME).is_valid
+    
+    # Jump past not_after: the cached "valid" verdict must not be served
+    later = now + timedelta(seconds=120)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: time.monotonic() + 120))
+    
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return later
+    monkeypatch.setattr(registration, "datetime", FrozenDatetime)
+    
+    cert_info = registration.validate_certificate(pem, AGENT_NAME)
+    assert not cert_info.is_valid
+    assert "Certificate has expired" in cert_info.validation_errors
+    assert len(parse_calls) == 2
+
+def test_ttl_until_not_before_for_future_certificate():
+    now = datetime.utcnow()
+    pem = make_certificate(now + timedelta(seconds=300), now + timedelta(days=30))
+    cert_info = registration.parse_certificate(pem, AGENT_NAME)
+    
+    assert not cert_info.is_valid
+    assert 0 < registration.certificate_cache_ttl(cert_info) <= 300
+
+def test_malformed_pem_is_not_cached(parse_calls):
+    registration.validate_certificate("not a certificate", AGENT_NAME)
+    registration.validate_certificate("not a certificate", AGENT_NAME)
+    
+    assert len(parse_calls) == 2
+    assert len(certificate_cache) == 0
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Certificate expiry sweep
+
+Runs the sweep's batch UPDATE against the database from DATABASE_URL inside
+a transaction that is rolled back; the certificate backfill test commits its
+agents and deletes them afterwards. Skipped when no database is reachable.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, delete, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from config.settings import get_settings
+from db.models import Base, Agent, add_missing_columns, async_database_url
+from api.expiry import expired_agents, expired_agents_batch, expiring_agents_count
+from api.registration import backfill_certificate_columns, unextracted_certificates
+from test_certificate_cache import make_certificate
+from test_discovery_indexes import Explain
+
+@pytest.fixture
+def db(db):
+    # Only this test's agents may be swept
+    db.execute(text("UPDATE agents SET verified = false WHERE certificate_not_after <= now() + interval '30 days'"))
+    return db
+
+def add_agent(db: Session, not_after_offset: timedelta, verified: bool = True) -> str:
+    agent_name = f"expiry-{uuid.uuid4().hex[:12]}.example.com"
+    db.add(Agent(
+        agent_name=agent_name,
+        certificate_pem="-----BEGIN CERTIFICATE-----\nTEST\n-----END CERTIFICATE-----",
+        agent_metadata={"description": "Expiry test agent"},
+        verified=verified,
+        active=True,
+        certificate_not_after=datetime.now(timezone.utc) + not_after_offset
+    ))
+    db.flush()
+    return agent_name
+
+def test_sweep_unverifies_only_expired_agents_in_batches(db):
+    expired = {add_agent(db, timedelta(days=-days)) for days in (1, 2, 3)}
+    current = add_agent(db, timedelta(days=60))
+    expiring = add_agent(db, timedelta(days=2))
+
+    first = set(db.scalars(expired_agents_batch(2)).all())
+    second = set(db.scalars(expired_agents_batch(2)).all())
+
+    assert len(first) == 2 and len(second) == 1
+    assert first | second == expired
+    assert db.scalars(expired_agents_batch(2)).all() == []
+
+    verified = dict(db.execute(text("SELECT agent_name, verified FROM agents WHERE agent_name = ANY(:names)"),
+                               {"names": list(expired) + [current, expiring]}).all())
+    assert not any(verified[name] for name in expired)
+    assert verified[current] and verified[expiring]
+    assert db.scalar(expiring_agents_count(timedelta(days=7))) == 1
+
+def test_sweep_uses_partial_index(db):
+    add_agent(db, timedelta(days=-1))
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(row[0] for row in db.execute(Explain(expired_agents(500))).fetchall())
+    assert "ix_agents_verified_certificate_not_after" in plan, plan
+
+def test_backfill_fills_certificate_columns_once():
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.begin() as connection:
+            Base.metadata.create_all(bind=connection, tables=[Agent.__table__])
+            add_missing_columns(connection, Agent.__table__)
+    except OperationalError:
+        pytest.skip("PostgreSQL is not available")
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    pems = {
+        f"backfill-{uuid.uuid4().hex[:12]}.example.com": make_certificate(now - timedelta(days=1), now + timedelta(days=30)),
+        f"backfill-{uuid.uuid4().hex[:12]}.example.com": "-----BEGIN CERTIFICATE-----\nTEST\n-----END CERTIFICATE-----"
+    }
+    valid, broken = pems
+    with Session(engine) as db:
+        # As registered before the certificate columns existed
+        db.add_all(Agent(agent_name=name, certificate_pem=pem, agent_metadata={}, verified=True) for name, pem in pems.items())
+        db.commit()
+
+    async def backfill():
+        factory = async_sessionmaker(create_async_engine(async_database_url(get_settings().database_url)))
+        try:
+            async with factory() as db:
+                return await backfill_certificate_columns(db, 1)
+        finally:
+            await factory.kw["bind"].dispose()
+
+    try:
+        filled, unparseable = asyncio.run(backfill())
+        assert filled >= 1 and unparseable >= 1
+
+        with Session(engine) as db:
+            agents = {agent.agent_name: agent for agent in db.scalars(select(Agent).where(Agent.agent_name.in_(pems)))}
+            assert agents[valid].certificate_fingerprint and agents[valid].certificate_not_after is not None
+            assert agents[valid].certificate_parse_failed is False
+            assert agents[broken].certificate_fingerprint is None and agents[broken].certificate_parse_failed
+
+            # Neither is read again by the next sweep
+            assert not {row.agent_name for row in db.execute(unextracted_certificates(500))} & set(pems)
+            db.rollback()
+    finally:
+        with engine.begin() as connection:
+            connection.execute(delete(Agent).where(Agent.agent_name.in_(pems)))
+        engine.dispose()
+
+def test_backfill_uses_partial_index(db):
+    add_agent(db, timedelta(days=30))
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(row[0] for row in db.execute(Explain(unextracted_certificates(500, uuid.uuid4()))).fetchall())
+    assert "ix_agents_certificate_unextracted" in plan, plan
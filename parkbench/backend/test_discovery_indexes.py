@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Query plan checks for ParkBench discovery
+
+Runs EXPLAIN against the database from DATABASE_URL to confirm that the
+discovery filters are answered from their indexes. Skipped when no database
+is reachable.
+"""
+
+import uuid
+import pytest
+from sqlalchemy import text, and_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from db.models import Agent, sync_agent_capabilities
+from api.discovery import build_agent_search_filters, build_text_search
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper so the real ORM query (with its bind params) is planned"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN " + compiler.process(element.statement, **kw)
+
+@pytest.fixture(scope="module")
+def db(module_db):
+    """module_db with 50 agents to plan against"""
+    session = module_db
+    for i in range(50):
+        agent = Agent(
+            agent_name=f"explain-{uuid.uuid4().hex[:12]}.example.com",
+            certificate_pem="-----BEGIN CERTIFICATE-----\nTEST\n-----END CERTIFICATE-----",
+            agent_metadata={
+                "description": f"Explain test agent {i}",
+                "skills": [f"skill-{i % 5}", "common"],
+                "protocols": ["REST", "A2A"] if i % 2 else ["REST"],
+                "a2a_compliant": bool(i % 2),
+                "a2a": {"supported_tasks": [f"task-{i % 7}"]}
+            },
+            verified=True,
+            active=True
+        )
+        session.add(agent)
+        session.flush()
+        sync_agent_capabilities(session, agent)
+    session.flush()
+    # The table is tiny, so make sequential scans unattractive to the planner
+    session.execute(text("SET LOCAL enable_seqscan = off"))
+    return session
+
+def explain(db: Session, **criteria) -> str:
+    query = db.query(Agent).filter(and_(*build_agent_search_filters(**criteria)))
+    rows = db.execute(Explain(query.statement)).fetchall()
+    return "\n".join(row[0] for row in rows)
+
+@pytest.mark.parametrize("criteria, index_name", [
+    ({"skill": "skill-3", "active": True}, "ix_agent_skills_skill_active"),
+    ({"protocol": "A2A", "active": True}, "ix_agent_protocols_protocol_active"),
+    ({"a2a_compliant": True}, "ix_agents_metadata_gin"),
+])
+def test_search_filters_use_index(db, criteria, index_name):
+    plan = explain(db, **criteria)
+    assert index_name in plan, plan
+
+def test_combined_filters_avoid_sequential_scans(db):
+    plan = explain(db, skill="common", protocol="REST", a2a_compliant=False, active=True)
+    # The planner may probe either side table first; any of them is fine as long as nothing is scanned
+    assert "Seq Scan" not in plan, plan
+
+def test_skill_filter_matches_exact_element(db):
+    query = db.query(Agent).filter(and_(*build_agent_search_filters(skill="skill-1")))
+    agents = query.all()
+    assert agents
+    assert all("skill-1" in agent.agent_metadata["skills"] for agent in agents)
+    # Lookups match whole skills, not substrings of them
+    assert db.query(Agent).filter(and_(*build_agent_search_filters(skill="skill"))).count() == 0
+
+def count_seeded(db: Session, **criteria) -> int:
+    filters = build_agent_search_filters(**criteria)
+    return db.query(Agent).filter(Agent.agent_name.like("explain-%"), *filters).count()
+
+def test_multi_value_filters_match_any_or_all(db):
+    assert count_seeded(db, skill=["skill-1", "skill-2"], match="any") == 20
+    assert count_seeded(db, skill=["skill-1", "common"], match="all") == 10
+    assert count_seeded(db, skill=["skill-1", "skill-2"], match="all") == 0
+    assert count_seeded(db, protocol=["REST", "A2A"], match="all") == 25
+
+def test_match_all_uses_skill_index(db):
+    plan = explain(db, skill=["skill-1", "common"], match="all", active=True)
+    assert "ix_agent_skills_skill_active" in plan, plan
+    assert "Seq Scan" not in plan, plan
+
+def test_text_search_uses_gin_index(db):
+    text_match, _ = build_text_search("explain agent")
+    rows = db.execute(Explain(db.query(Agent.agent_id).filter(text_match).statement)).fetchall()
+    plan = "\n".join(row[0] for row in rows)
+    assert "ix_agents_search_vector" in plan, plan
+
+def test_text_search_matches_supported_tasks(db):
+    text_match, rank = build_text_search("task-3")
+    rows = db.query(Agent.agent_metadata, rank).filter(Agent.agent_name.like("explain-%"), text_match).all()
+    assert len(rows) == 7
+    assert all(row[0]["a2a"]["supported_tasks"] == ["task-3"] and 0 < row[1] < 1 for row in rows)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Internal metrics endpoint access
+
+Only requests bearing INTERNAL_METRICS_TOKEN get the metrics; without a
+token configured the endpoint does not exist.
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config.settings import get_settings
+from api import metrics
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/api/v1")
+    return TestClient(app)
+
+def test_metrics_are_off_without_a_token(monkeypatch):
+    monkeypatch.setattr(get_settings(), "internal_metrics_token", None)
+    assert make_client().get("/api/v1/internal/metrics").status_code == 404
+
+def test_metrics_require_the_token(monkeypatch):
+    monkeypatch.setattr(get_settings(), "internal_metrics_token", "scraper-secret")
+    client = make_client()
+
+    assert client.get("/api/v1/internal/metrics").status_code == 401
+    assert client.get("/api/v1/internal/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/api/v1/internal/metrics", headers={"Authorization": "Bearer scraper-secret"})
+    assert response.status_code == 200
+    assert {"caches", "background_tasks", "rate_limiter"} <= set(response.json())
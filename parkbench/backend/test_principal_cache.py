@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Principal cache used by get_current_user
+
+Runs against the database from DATABASE_URL and deletes its agent
+afterwards. Skipped when no database is reachable.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from config.settings import get_settings
+from db.models import Base, Agent, async_database_url
+from api.auth import create_access_token, get_current_user
+from api.cache import principal_cache
+from api.registration import deactivate_agent
+
+AGENT_NAME = f"principal-{uuid.uuid4().hex[:12]}.example.com"
+
+@pytest.fixture(scope="module")
+def agent_id():
+    engine = create_engine(get_settings().database_url)
+    try:
+        Base.metadata.create_all(bind=engine)
+    except OperationalError:
+        pytest.skip("PostgreSQL is not available")
+
+    with Session(engine) as db:
+        agent = Agent(
+            agent_name=AGENT_NAME,
+            certificate_pem="-----BEGIN CERTIFICATE-----\nTEST\n-----END CERTIFICATE-----",
+            agent_metadata={"description": "Principal cache test agent"},
+            verified=True,
+            active=True
+        )
+        db.add(agent)
+        db.commit()
+        yield str(agent.agent_id)
+
+        db.execute(delete(Agent).where(Agent.agent_name == AGENT_NAME))
+        db.commit()
+    engine.dispose()
+
+def test_hot_principals_need_no_database_round_trip(agent_id):
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer",
+        credentials=create_access_token({"sub": AGENT_NAME, "permissions": ["read"]})
+    )
+
+    async def run():
+        engine = create_async_engine(async_database_url(get_settings().database_url))
+        checkouts = []
+        event.listen(engine.sync_engine, "checkout", lambda *args: checkouts.append(1))
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async def authenticate():
+                async with sessions() as db:
+                    return await get_current_user(credentials, db)
+
+            hits, misses = principal_cache.hits, principal_cache.misses
+            first = await authenticate()
+            queries_after_first = len(checkouts)
+            second = await authenticate()
+            queries_after_second = len(checkouts)
+
+            async with sessions() as db:
+                await deactivate_agent(AGENT_NAME, db)
+
+            with pytest.raises(HTTPException) as error:
+                await authenticate()
+            return first, second, queries_after_first, queries_after_second, hits, misses, error.value
+        finally:
+            await engine.dispose()
+
+    principal_cache.invalidate(AGENT_NAME)
+    first, second, after_first, after_second, hits, misses, error = asyncio.run(run())
+
+    assert first == second and first["agent_id"] == agent_id
+    assert after_first == 1 and after_second == 1  # The cached lookup checked out no connection
+    assert principal_cache.hits == hits + 1
+    assert principal_cache.misses == misses + 2  # First lookup, and the one after deactivation
+    assert error.status_code == 401
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Schema upgrade on startup
+
+Creates a scratch database with the agents and a2a_sessions tables as the
+original routers used them (before the capability tables, full-text search
+and certificate columns), then runs init_db() against it. Needs a
+PostgreSQL role allowed to create databases; skipped otherwise. The
+capability backfill test uses the rolled-back db fixture instead.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from config.settings import get_settings
+from db import models
+
+ORIGINAL_SCHEMA = """
+CREATE TYPE sessionstatus AS ENUM ('ACTIVE', 'COMPLETED', 'FAILED', 'TERMINATED');
+CREATE TABLE agents (
+    agent_id UUID PRIMARY KEY,
+    agent_name VARCHAR(255) NOT NULL UNIQUE,
+    certificate_pem TEXT NOT NULL,
+    agent_metadata JSONB NOT NULL,
+    verified BOOLEAN NOT NULL DEFAULT false,
+    active BOOLEAN NOT NULL DEFAULT true,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+CREATE TABLE a2a_sessions (
+    session_id UUID PRIMARY KEY,
+    initiating_agent VARCHAR(255) NOT NULL,
+    target_agent VARCHAR(255) NOT NULL,
+    task VARCHAR(255) NOT NULL,
+    session_token TEXT NOT NULL,
+    status sessionstatus NOT NULL,
+    context JSONB,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+INSERT INTO agents (agent_id, agent_name, certificate_pem, agent_metadata, verified)
+VALUES (gen_random_uuid(), 'upgrade.example.com', 'TEST',
+        '{"description": "Translates legal documents", "skills": ["translation"], "a2a": {"supported_tasks": ["translate"]}}',
+        true),
+       (gen_random_uuid(), 'empty.example.com', 'TEST',
+        '{"description": "Lists no capabilities", "skills": [], "protocols": [], "a2a": {"supported_tasks": []}}',
+        true);
+"""
+
+@pytest.fixture
+def original_database(monkeypatch):
+    """Engine on a scratch database holding the original schema; dropped afterwards"""
+    settings = get_settings()
+    admin = create_engine(settings.database_url, isolation_level="AUTOCOMMIT")
+    name = f"parkbench_upgrade_{uuid.uuid4().hex[:8]}"
+    try:
+        with admin.connect() as connection:
+            connection.execute(text(f"CREATE DATABASE {name}"))
+    except (OperationalError, ProgrammingError):
+        admin.dispose()
+        pytest.skip("Cannot create a scratch PostgreSQL database")
+
+    url = make_url(settings.database_url).set(database=name).render_as_string(hide_password=False)
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(ORIGINAL_SCHEMA)
+
+    # A fresh, uninitialized database layer pointed at the scratch database
+    monkeypatch.setattr(settings, "database_url", url)
+    monkeypatch.setattr(settings, "database_replica_url", None)
+    for attribute in ("engine", "SessionLocal", "async_engine", "AsyncSessionLocal",
+                      "replica_engine", "ReplicaSessionLocal", "replica_monitor"):
+        monkeypatch.setattr(models, attribute, None)
+    monkeypatch.setattr(models, "_db_initialized", False)
+
+    yield engine
+
+    if models.engine is not None:
+        models.engine.dispose()
+    if models.async_engine is not None:
+        asyncio.run(models.async_engine.dispose())
+    engine.dispose()
+    with admin.connect() as connection:
+        connection.execute(text(f"DROP DATABASE {name} WITH (FORCE)"))
+    admin.dispose()
+
+def test_init_db_upgrades_original_schema(original_database):
+    models.init_db()
+    assert models._db_initialized
+
+    inspector = inspect(original_database)
+    columns = {column["name"] for column in inspector.get_columns("agents")}
+    assert {"certificate_fingerprint", "certificate_not_after", "certificate_parse_failed", "search_vector"} <= columns
+
+    indexes = {index["name"] for index in inspector.get_indexes("agents")}
+    assert {"ix_agents_metadata_gin", "ix_agents_created_at_agent_id", "ix_agents_verified_certificate_not_after",
+            "ix_agents_search_vector", "ix_agents_certificate_unextracted"} <= indexes
+    assert "ix_a2a_sessions_status_updated_at" in {index["name"] for index in inspector.get_indexes("a2a_sessions")}
+
+    # Existing agents get their capability rows and are found by full-text search
+    with original_database.connect() as connection:
+        assert connection.scalar(text("SELECT count(*) FROM agent_skills")) == 1
+        assert connection.scalar(text(
+            "SELECT agent_name FROM agents WHERE search_vector @@ websearch_to_tsquery(:config, 'legal translation')"
+        ), {"config": models.TEXT_SEARCH_CONFIG}) == "upgrade.example.com"
+
+    # Upgrading again is a no-op
+    with original_database.begin() as connection:
+        assert models.add_missing_columns(connection, models.Agent.__table__) == []
+        assert connection.execute(models.agents_missing_capabilities(500)).all() == []
+
+def test_capability_backfill_selects_only_agents_with_capabilities(db):
+    listed, empty, tasks_only = (
+        models.Agent(agent_name=f"backfill-{uuid.uuid4().hex[:12]}.example.com", certificate_pem="TEST", agent_metadata=metadata)
+        for metadata in (
+            {"skills": ["translation"], "protocols": ["a2a"]},
+            {"skills": [], "protocols": [], "a2a": {"supported_tasks": []}},
+            {"a2a": {"supported_tasks": ["Translate"]}}
+        )
+    )
+    db.add_all([listed, empty, tasks_only])
+    db.flush()
+    ids = {listed.agent_id, empty.agent_id, tasks_only.agent_id}
+
+    selected = {row.agent_id for row in db.execute(models.agents_missing_capabilities(500))} & ids
+    assert selected == {listed.agent_id, tasks_only.agent_id}
+
+    assert models.backfill_agent_capabilities(db, batch_size=1) >= 2
+    assert db.scalars(select(models.AgentSkill.skill).where(models.AgentSkill.agent_id == listed.agent_id)).all() == ["translation"]
+    assert db.scalars(select(models.AgentTask.task).where(models.AgentTask.agent_id == tasks_only.agent_id)).all() == ["translate"]
+    assert not {row.agent_id for row in db.execute(models.agents_missing_capabilities(500))} & ids
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Session reaper
+
+Runs the reaper's batch statements against the database from DATABASE_URL
+inside a transaction that is rolled back; the session update test commits
+its row and deletes it afterwards. Skipped when no database is reachable.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, delete, func, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from config.settings import get_settings
+from db.models import Base, A2ASession, A2ASessionArchive, SessionStatus, async_database_url
+from api.sessions import SessionUpdateRequest, update_session
+from api.session_reaper import archive_sessions_batch, sessions_last_updated_before, stale_sessions_batch
+from test_discovery_indexes import Explain
+
+@pytest.fixture
+def db(db):
+    # Only this test's sessions may be reaped
+    db.execute(text("UPDATE a2a_sessions SET updated_at = now()"))
+    return db
+
+def add_session(db: Session, session_status: SessionStatus, idle: timedelta):
+    session_id = uuid.uuid4()
+    updated_at = datetime.now(timezone.utc) - idle
+    db.add(A2ASession(
+        session_id=session_id,
+        initiating_agent="caller.example.com",
+        target_agent="callee.example.com",
+        task="summarization",
+        session_token=f"pb_session_{session_id.hex}",
+        status=session_status,
+        context={},
+        created_at=updated_at,
+        updated_at=updated_at
+    ))
+    db.flush()
+    return session_id
+
+def test_reaper_times_out_only_idle_active_sessions_in_batches(db):
+    timeout = timedelta(minutes=60)
+    idle = {add_session(db, SessionStatus.ACTIVE, timedelta(minutes=minutes)) for minutes in (61, 90, 600)}
+    busy = add_session(db, SessionStatus.ACTIVE, timedelta(minutes=5))
+    finished = add_session(db, SessionStatus.COMPLETED, timedelta(days=1))
+
+    first = set(db.scalars(stale_sessions_batch(timeout, 2)).all())
+    second = set(db.scalars(stale_sessions_batch(timeout, 2)).all())
+
+    assert len(first) == 2 and len(second) == 1
+    assert first | second == idle
+    assert db.scalars(stale_sessions_batch(timeout, 2)).all() == []
+
+    statuses = dict(db.execute(select(A2ASession.session_id, A2ASession.status).where(
+        A2ASession.session_id.in_(list(idle) + [busy, finished])
+    )).all())
+    assert all(statuses[session_id] == SessionStatus.TERMINATED for session_id in idle)
+    assert statuses[busy] == SessionStatus.ACTIVE and statuses[finished] == SessionStatus.COMPLETED
+
+def test_archival_moves_old_finished_sessions(db):
+    old = add_session(db, SessionStatus.FAILED, timedelta(days=40))
+    recent = add_session(db, SessionStatus.FAILED, timedelta(days=2))
+    active = add_session(db, SessionStatus.ACTIVE, timedelta(days=40))
+
+    moved = db.scalars(archive_sessions_batch(SessionStatus.FAILED, timedelta(days=30), 10)).all()
+    assert moved == [old]
+    assert db.scalar(select(A2ASession.session_id).where(A2ASession.session_id == old)) is None
+
+    archived = db.get(A2ASessionArchive, old)
+    assert archived.status == SessionStatus.FAILED and archived.task == "summarization"
+    assert archived.archived_at is not None
+    assert db.get(A2ASession, recent) is not None and db.get(A2ASession, active) is not None
+
+@pytest.mark.parametrize("session_status", [SessionStatus.ACTIVE, SessionStatus.COMPLETED])
+def test_reaper_uses_status_updated_at_index(db, session_status):
+    add_session(db, session_status, timedelta(days=1))
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    query = sessions_last_updated_before(session_status, timedelta(minutes=60), 500)
+    plan = "\n".join(row[0] for row in db.execute(Explain(query)).fetchall())
+    assert "ix_a2a_sessions_status_updated_at" in plan, plan
+    assert "Sort" not in plan, plan
+
+def test_updated_session_is_not_reaped(monkeypatch):
+    # asyncpg reads naive datetimes as host-local time; east of UTC they land hours in the past
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    time.tzset()
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.begin() as connection:
+            Base.metadata.create_all(bind=connection, tables=[A2ASession.__table__])
+    except OperationalError:
+        pytest.skip("PostgreSQL is not available")
+
+    with Session(engine) as db:
+        session_id = add_session(db, SessionStatus.ACTIVE, timedelta(minutes=5))
+        db.commit()
+
+    async def test():
+        factory = async_sessionmaker(create_async_engine(async_database_url(get_settings().database_url)))
+        try:
+            async with factory() as db:
+                await update_session(str(session_id), SessionUpdateRequest(status="active"), db)
+
+            async with factory() as db:
+                idle = await db.scalar(select(func.now() - A2ASession.updated_at).where(A2ASession.session_id == session_id))
+                ended = []
+                while batch := (await db.scalars(stale_sessions_batch(timedelta(minutes=60), 500))).all():
+                    ended += batch
+                await db.rollback()
+            return idle, ended
+        finally:
+            await factory.kw["bind"].dispose()
+
+    try:
+        idle, ended = asyncio.run(test())
+        assert abs(idle) < timedelta(minutes=1), idle
+        assert session_id not in ended
+    finally:
+        with engine.begin() as connection:
+            connection.execute(delete(A2ASession).where(A2ASession.session_id == session_id))
+        engine.dispose()
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Signed A2A session tokens and the revocation denylist
+
+The revocation test runs against the database from DATABASE_URL and
+deletes its rows afterwards; it is skipped when no database is reachable.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config.settings import get_settings
+from db.models import Base, RevokedSessionToken, async_database_url
+from api.auth import create_access_token, verify_token
+from api.invalidation import InvalidationListener
+from api.session_tokens import (
+    create_session_token, denylist, revoke_session_token, session_token_expiry, verify_session_token
+)
+from api.signing import encode_token
+
+def new_token(session_id=None):
+    return create_session_token(session_id or str(uuid.uuid4()), "caller.example.com", "callee.example.com", "summarization")
+
+def test_session_tokens_carry_the_session():
+    session_id = str(uuid.uuid4())
+    token_data = verify_session_token(new_token(session_id))
+    assert token_data.session_id == session_id
+    assert (token_data.initiating_agent, token_data.target_agent, token_data.task) == (
+        "caller.example.com", "callee.example.com", "summarization"
+    )
+    expected_expiry = datetime.now(timezone.utc) + timedelta(minutes=get_settings().default_session_timeout_minutes)
+    assert abs((token_data.expires_at - expected_expiry).total_seconds()) < 5
+
+def test_verification_takes_microseconds():
+    token = new_token()
+    verify_session_token(token)
+    start = time.perf_counter()
+    for _ in range(200):
+        verify_session_token(token)
+    assert (time.perf_counter() - start) / 200 < 0.002
+
+@pytest.mark.parametrize("forge", ["expired", "tampered", "access_token", "legacy"])
+def test_rejects_invalid_session_tokens(forge):
+    if forge == "expired":
+        token = "pb_session_" + encode_token({
+            "type": "a2a_session", "sid": str(uuid.uuid4()), "ini": "a", "tgt": "b", "task": "t",
+            "exp": datetime.now(timezone.utc) - timedelta(seconds=1)
+        })
+    elif forge == "tampered":
+        prefix, payload, signature = new_token().split(".")
+        other = new_token().split(".")[1]
+        token = ".".join([prefix, other, signature])
+    elif forge == "access_token":
+        token = "pb_session_" + create_access_token({"sub": "caller.example.com"})
+    else:
+        token = f"pb_session_{uuid.uuid4().hex}"
+
+    with pytest.raises(HTTPException) as error:
+        verify_session_token(token)
+    assert error.value.status_code == 401
+
+def test_session_tokens_are_not_access_tokens():
+    with pytest.raises(HTTPException):
+        verify_token(new_token()[len("pb_session_"):])
+
+def test_revocation_reaches_every_worker():
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.begin() as connection:
+            Base.metadata.create_all(bind=connection, tables=[RevokedSessionToken.__table__])
+    except OperationalError:
+        pytest.skip("PostgreSQL is not available")
+
+    session_id = uuid.uuid4()
+    token = new_token(str(session_id))
+
+    async def test():
+        factory = async_sessionmaker(create_async_engine(async_database_url(get_settings().database_url)))
+        listener = InvalidationListener()  # This worker's LISTEN connection
+        try:
+            await listener.check({})
+            async with factory() as db:
+                assert await revoke_session_token(db, session_id, token)
+                assert verify_session_token(token)  # Not before the transaction commits
+                await db.commit()
+
+                row = await db.scalar(select(RevokedSessionToken).where(RevokedSessionToken.session_id == session_id))
+                assert row.expires_at == session_token_expiry(token)
+
+            for _ in range(50):
+                if denylist.is_revoked(str(session_id)):
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await listener.close()
+            await factory.kw["bind"].dispose()
+
+    try:
+        asyncio.run(test())
+        with pytest.raises(HTTPException) as error:
+            verify_session_token(token)
+        assert error.value.detail == "Session has ended"
+    finally:
+        with engine.begin() as connection:
+            connection.execute(delete(RevokedSessionToken).where(RevokedSessionToken.session_id == session_id))
+        engine.dispose()
+
+def test_denylist_drops_expired_entries():
+    denylist.add("ended", time.time() + 60)
+    denylist.add("long-expired", time.time() - 1)
+    assert denylist.is_revoked("ended") and not denylist.is_revoked("long-expired")
+    denylist.load([("also-expired", time.time() - 1)])
+    assert "also-expired" not in denylist.entries() and "ended" in denylist.entries()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Asymmetric access token signing and key rotation
+
+The rotation test runs inside a transaction on the database from
+DATABASE_URL that is rolled back afterwards, and is skipped when no
+database is reachable.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from config.settings import get_settings
+from db.models import Base, SigningKey
+from api.auth import create_access_token, verify_token
+from api.signing import KeyRing, keyring, rotate_signing_keys
+
+def test_tokens_verify_against_published_keys():
+    token = create_access_token({"sub": "signing.example.com", "permissions": ["read"]})
+    header = jwt.get_unverified_header(token)
+    assert header["alg"] == get_settings().algorithm
+
+    # What an external verifier does with /.well-known/jwks.json
+    jwk = next(jwk for jwk in keyring.jwks()["keys"] if jwk["kid"] == header["kid"])
+    claims = jwt.decode(token, jwt.PyJWK(jwk).key, algorithms=[jwk["alg"]])
+    assert claims["sub"] == "signing.example.com"
+
+    assert verify_token(token).agent_name == "signing.example.com"
+
+@pytest.mark.parametrize("forge", ["hs256_secret", "unknown_kid", "tampered"])
+def test_rejects_tokens_not_signed_by_a_published_key(forge):
+    claims = {"sub": "signing.example.com", "exp": datetime.now(timezone.utc) + timedelta(minutes=5)}
+    if forge == "hs256_secret":
+        token = jwt.encode(claims, get_settings().secret_key, algorithm="HS256")
+    elif forge == "unknown_kid":
+        token = jwt.encode(claims, keyring.signing_key()[1], algorithm=get_settings().algorithm, headers={"kid": "unknown"})
+    else:
+        header, payload, signature = create_access_token({"sub": "signing.example.com"}).split(".")
+        other_payload = jwt.encode(claims, "x", algorithm="HS256").split(".")[1]
+        token = ".".join([header, other_payload, signature])
+
+    with pytest.raises(HTTPException) as error:
+        verify_token(token)
+    assert error.value.status_code == 401
+
+def test_rotation_publishes_successor_before_it_signs():
+    settings = get_settings()
+    rotation = timedelta(days=settings.signing_key_rotation_days)
+    lead = timedelta(seconds=settings.signing_key_publish_lead_seconds)
+
+    engine = create_engine(settings.database_url)
+    try:
+        Base.metadata.create_all(bind=engine)
+    except OperationalError:
+        pytest.skip("PostgreSQL is not available")
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        db = Session(bind=connection)
+        try:
+            db.execute(delete(SigningKey))
+            start = datetime.now(timezone.utc)
+
+            assert rotate_signing_keys(db, start) == {"created": 1, "deleted": 0}
+            first = db.scalar(select(SigningKey))
+            assert first.not_before == start
+            assert rotate_signing_keys(db, start + timedelta(hours=1)) == {"created": 0, "deleted": 0}
+
+            # Published `lead` before the first key's period ends, then takes over
+            assert rotate_signing_keys(db, start + rotation - lead)["created"] == 1
+            second = db.scalar(select(SigningKey).where(SigningKey.kid != first.kid))
+            assert second.not_before == start + rotation
+            assert rotate_signing_keys(db, start + rotation - lead / 2)["created"] == 0
+            assert first.expires_at >= second.not_before + timedelta(minutes=settings.access_token_expire_minutes)
+
+            # The first key is deleted once every token it signed has expired
+            result = rotate_signing_keys(db, first.expires_at + timedelta(seconds=1))
+            assert result["deleted"] == 1
+            assert db.get(SigningKey, first.kid) is None
+        finally:
+            db.close()
+            transaction.rollback()
+    engine.dispose()
+
+def test_no_signing_without_a_shared_key():
+    empty = KeyRing()
+    empty.load([])  # As after a failed load: nothing shared to sign with
+    with pytest.raises(HTTPException) as error:
+        empty.signing_key()
+    assert error.value.status_code == 503 and "Retry-After" in error.value.headers
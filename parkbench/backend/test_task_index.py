@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Negotiation task index rebuilds
+
+A rebuild is built beside the live index and swapped in; writes made while
+it runs are replayed on the new index.
+"""
+
+import pytest
+
+from api.task_index import TaskIndex
+
+def test_rebuild_keeps_serving_and_replays_concurrent_writes():
+    index = TaskIndex()
+    index.rebuild([("old.example.com", {"supported_tasks": ["summarization"]})])
+    assert index.loaded
+
+    index.begin_rebuild()
+    # Rows read from the database before these writes committed
+    rows = [
+        ("old.example.com", {"supported_tasks": ["summarization"]}),
+        ("leaving.example.com", {"supported_tasks": ["translation"]}),
+    ]
+    index.upsert("new.example.com", {"supported_tasks": ["text-summarization"]})
+    index.remove("leaving.example.com")
+
+    def rows_while_serving():
+        for row in rows:
+            # The live index answers lookups throughout the build
+            assert {agent.agent_name for agent in index.lookup("summarization")} == {
+                "old.example.com", "new.example.com"
+            }
+            yield row
+
+    index.rebuild(rows_while_serving())
+
+    assert {agent.agent_name for agent in index.lookup("summarization")} == {"old.example.com", "new.example.com"}
+    assert index.lookup("translation") == []
+
+    # Writes after the swap are no longer journaled
+    index.upsert("later.example.com", {"supported_tasks": ["translation"]})
+    assert index._journal is None
+
+def test_failed_rebuild_keeps_the_live_index():
+    index = TaskIndex()
+    index.rebuild([("old.example.com", {"supported_tasks": ["summarization"]})])
+    index.begin_rebuild()
+
+    def broken_rows():
+        yield ("other.example.com", {"supported_tasks": ["summarization"]})
+        raise RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        index.rebuild(broken_rows())
+
+    assert [agent.agent_name for agent in index.lookup("summarization")] == ["old.example.com"]
+    assert index._journal is None
@@ -0,0 +1,11 @@
+#!/bin/bash
+# Runs once, when the primary's data volume is first initialized:
+# creates the replication role and slot used by the db-replica service.
+set -e
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-EOSQL
+    CREATE ROLE ${REPLICATION_USER} WITH REPLICATION LOGIN PASSWORD '${REPLICATION_PASSWORD}';
+    SELECT pg_create_physical_replication_slot('parkbench_replica');
+EOSQL
+
+echo "host replication ${REPLICATION_USER} all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,21 @@
+#!/bin/bash
+# Hot standby for local testing of read-replica routing: clones the primary
+# with pg_basebackup on first start, then streams WAL from it.
+set -e
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    until pg_isready -h "$PRIMARY_HOST" -U "$REPLICATION_USER" -q; do
+        sleep 1
+    done
+
+    # The primary may still be running its init scripts; retry until the slot exists
+    until PGPASSWORD="$REPLICATION_PASSWORD" pg_basebackup \
+        -h "$PRIMARY_HOST" -U "$REPLICATION_USER" -D "$PGDATA" \
+        -S parkbench_replica -X stream -R; do
+        rm -rf "${PGDATA:?}"/*
+        sleep 2
+    done
+    chmod 0700 "$PGDATA"
+fi
+
+exec postgres -c hot_standby=on
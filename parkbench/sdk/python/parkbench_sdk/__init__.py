@@ -42,6 +42,9 @@ Usage:
         task="summarization",
         context={"input": "Long text to summarize..."}
     )
+    
+    # Check a calling agent's access token without contacting the API
+    claims = client.verify_token(token)
 """
 
 from typing import Optional
@@ -49,6 +52,7 @@ from .registration import RegistrationClient
 from .discovery import DiscoveryClient
 from .negotiation import NegotiationClient
 from .sessions import SessionClient
+from .tokens import TokenVerifier
 
 __version__ = "0.1.0"
 __author__ = "ParkBench Team"
@@ -92,6 +96,24 @@ class ParkBenchClient:
         self.discovery = DiscoveryClient(base_url, api_key)
         self.negotiation = NegotiationClient(base_url, api_key)
         self.sessions = SessionClient(base_url, api_key)
+        self._token_verifier: Optional[TokenVerifier] = None
+    
+    def verify_token(self, token: str) -> dict:
+        """
+        Verify another agent's access token locally, using cached public keys
+        
+        Args:
+            token: ParkBench access token presented by the calling agent
+            
+        Returns:
+            dict: Token claims (sub is the calling agent's name)
+            
+        Raises:
+            jwt.InvalidTokenError: If the token is invalid or expired
+        """
+        if self._token_verifier is None:
+            self._token_verifier = TokenVerifier(self.base_url)
+        return self._token_verifier.verify(token)
     
     def health_check(self) -> bool:
         """
@@ -131,5 +153,6 @@ __all__ = [
     'DiscoveryClient',
     'NegotiationClient',
     'SessionClient',
+    'TokenVerifier',
     '__version__'
 ]
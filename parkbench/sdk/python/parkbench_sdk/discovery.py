@@ -4,24 +4,35 @@ ParkBench Discovery Client
 Handles agent search, profile retrieval, and A2A descriptor access.
 """
 
+import copy
 import requests
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 import urllib.parse
 
+# Response header carrying the keyset pagination cursor for agent listings
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+# Names sent per POST /agents/batch request (the API default limit is 250)
+BATCH_CHUNK_SIZE = 250
+
 class DiscoveryClient:
     """Client for ParkBench agent discovery operations"""
     
-    def __init__(self, base_url: str, api_key: Optional[str] = None):
+    def __init__(self, base_url: str, api_key: Optional[str] = None, conditional_cache_size: int = 256):
         """
         Initialize discovery client
         
         Args:
             base_url: Base URL of the ParkBench API
             api_key: Optional API key for authentication
+            conditional_cache_size: Profiles/descriptors kept for If-None-Match revalidation (0 disables)
         """
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.session = requests.Session()
+        self.conditional_cache_size = conditional_cache_size
+        self._conditional_cache: 'OrderedDict[str, Tuple[str, Any]]' = OrderedDict()
         
         # Set default headers
         self.session.headers.update({
@@ -35,24 +46,30 @@ class DiscoveryClient:
             })
     
     def search(self, 
-               skill: Optional[str] = None,
-               protocol: Optional[str] = None,
+               skill: Union[str, List[str], None] = None,
+               protocol: Union[str, List[str], None] = None,
                a2a_compliant: Optional[bool] = None,
                verified: Optional[bool] = None,
                active: Optional[bool] = True,
                limit: int = 50,
-               offset: int = 0) -> List[Dict[str, Any]]:
+               offset: int = 0,
+               cursor: Optional[str] = None,
+               match: str = 'any',
+               q: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Search for agents based on criteria
         
         Args:
-            skill: Filter by specific skill
-            protocol: Filter by protocol (REST, GraphQL, A2A)
+            skill: Filter by a skill, or a list of skills
+            protocol: Filter by protocol (REST, GraphQL, A2A), or a list of protocols
+            match: 'any' or 'all' - how several skills/protocols are combined
             a2a_compliant: Filter by A2A compliance
             verified: Filter by verification status
             active: Filter by active status
             limit: Maximum number of results (default: 50)
-            offset: Offset for pagination (default: 0)
+            offset: Offset for pagination (default: 0, prefer cursor)
+            cursor: Cursor for the page to fetch (see iter_search)
+            q: Full-text query; results are ranked and carry a 'score'
             
         Returns:
             list: List of matching agents
@@ -60,13 +77,62 @@ class DiscoveryClient:
         Raises:
             requests.HTTPError: If search fails
         """
+        agents, _ = self._search_page(skill, protocol, a2a_compliant, verified, active, limit, offset, cursor, match, q)
+        return agents
+    
+    def iter_search(self,
+                    skill: Union[str, List[str], None] = None,
+                    protocol: Union[str, List[str], None] = None,
+                    a2a_compliant: Optional[bool] = None,
+                    verified: Optional[bool] = None,
+                    active: Optional[bool] = True,
+                    page_size: int = 100,
+                    match: str = 'any',
+                    q: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every matching agent, following pagination cursors
+        
+        Each page is a keyset range scan on the server, so a full crawl
+        stays linear in the number of agents.
+        
+        Args:
+            skill, protocol, a2a_compliant, verified, active, match, q: As for search()
+            page_size: Agents fetched per request (max 100)
+            
+        Yields:
+            dict: Matching agents, one at a time
+        """
+        cursor = None
+        while True:
+            agents, cursor = self._search_page(skill, protocol, a2a_compliant, verified, active,
+                                               page_size, 0, cursor, match, q)
+            yield from agents
+            if not cursor:
+                return
+    
+    def _search_page(self,
+                     skill: Union[str, List[str], None],
+                     protocol: Union[str, List[str], None],
+                     a2a_compliant: Optional[bool],
+                     verified: Optional[bool],
+                     active: Optional[bool],
+                     limit: int,
+                     offset: int,
+                     cursor: Optional[str],
+                     match: str = 'any',
+                     q: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one search page and the cursor of the next one"""
         url = f"{self.base_url}/api/v1/agents/search"
         
         params = {}
+        if q:
+            params['q'] = q
         if skill is not None:
             params['skill'] = skill
         if protocol is not None:
             params['protocol'] = protocol
+        if match != 'any':
+            params['match'] = match
         if a2a_compliant is not None:
             params['a2a_compliant'] = a2a_compliant
         if verified is not None:
@@ -77,11 +143,50 @@ class DiscoveryClient:
             params['limit'] = limit
         if offset != 0:
             params['offset'] = offset
+        if cursor:
+            params['cursor'] = cursor
         
+        return self._get_page(url, params)
+    
+    def _get_page(self, url: str, params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """GET a list endpoint and return (items, next_cursor)"""
         response = self.session.get(url, params=params)
         response.raise_for_status()
         
-        return response.json()
+        return response.json(), response.headers.get(NEXT_CURSOR_HEADER)
+    
+    def _get_conditional(self, url: str) -> Any:
+        """
+        GET a resource, revalidating a cached copy with If-None-Match
+        
+        A 304 response reuses the cached body, so unchanged profiles and
+        descriptors cost one round trip with no payload.
+        """
+        cached = self._conditional_cache.get(url)
+        headers = {'If-None-Match': cached[0]} if cached else None
+        
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            self._conditional_cache.move_to_end(url)
+            return copy.deepcopy(cached[1])
+        
+        response.raise_for_status()
+        data = response.json()
+        
+        etag = response.headers.get('ETag')
+        if etag and self.conditional_cache_size > 0:
+            self._conditional_cache[url] = (etag, data)
+            self._conditional_cache.move_to_end(url)
+            while len(self._conditional_cache) > self.conditional_cache_size:
+                self._conditional_cache.popitem(last=False)
+            return copy.deepcopy(data)
+        
+        self._conditional_cache.pop(url, None)
+        return data
+    
+    def clear_cache(self) -> None:
+        """Forget all cached profiles and descriptors"""
+        self._conditional_cache.clear()
     
     def get_profile(self, agent_name: str) -> Dict[str, Any]:
         """
@@ -100,10 +205,7 @@ class DiscoveryClient:
         encoded_name = urllib.parse.quote(agent_name, safe='')
         url = f"{self.base_url}/api/v1/agents/{encoded_name}"
         
-        response = self.session.get(url)
-        response.raise_for_status()
-        
-        return response.json()
+        return self._get_conditional(url)
     
     def get_a2a_descriptor(self, agent_name: str) -> Dict[str, Any]:
         """
@@ -122,22 +224,21 @@ class DiscoveryClient:
         encoded_name = urllib.parse.quote(agent_name, safe='')
         url = f"{self.base_url}/api/v1/agents/{encoded_name}/a2a"
         
-        response = self.session.get(url)
-        response.raise_for_status()
-        
-        return response.json()
+        return self._get_conditional(url)
     
     def list_all(self, 
                  active_only: bool = True,
                  limit: int = 50,
-                 offset: int = 0) -> List[Dict[str, Any]]:
+                 offset: int = 0,
+                 cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         List all agents (with optional filtering)
         
         Args:
             active_only: Only return active agents
             limit: Maximum number of results (default: 50)
-            offset: Offset for pagination (default: 0)
+            offset: Offset for pagination (default: 0, prefer cursor)
+            cursor: Cursor for the page to fetch (see iter_all)
             
         Returns:
             list: List of agents
@@ -145,6 +246,33 @@ class DiscoveryClient:
         Raises:
             requests.HTTPError: If listing fails
         """
+        agents, _ = self._list_page(active_only, limit, offset, cursor)
+        return agents
+    
+    def iter_all(self, active_only: bool = True, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every agent, following pagination cursors
+        
+        Args:
+            active_only: Only return active agents
+            page_size: Agents fetched per request (max 100)
+            
+        Yields:
+            dict: Agents, one at a time
+        """
+        cursor = None
+        while True:
+            agents, cursor = self._list_page(active_only, page_size, 0, cursor)
+            yield from agents
+            if not cursor:
+                return
+    
+    def _list_page(self,
+                   active_only: bool,
+                   limit: int,
+                   offset: int,
+                   cursor: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one listing page and the cursor of the next one"""
         url = f"{self.base_url}/api/v1/agents"
         
         params = {
@@ -152,33 +280,58 @@ class DiscoveryClient:
             'limit': limit,
             'offset': offset
         }
+        if cursor:
+            params['cursor'] = cursor
         
-        response = self.session.get(url, params=params)
-        response.raise_for_status()
-        
-        return response.json()
+        return self._get_page(url, params)
     
-    def find_by_skills(self, skills: List[str], **kwargs) -> List[Dict[str, Any]]:
+    def find_by_skills(self, skills: List[str], match: str = 'any', **kwargs) -> List[Dict[str, Any]]:
         """
-        Find agents that have any of the specified skills
+        Find agents that have any (or all) of the specified skills
         
         Args:
             skills: List of skills to search for
+            match: 'any' (default) or 'all' of the skills
             **kwargs: Additional search parameters
             
         Returns:
-            list: Agents matching any of the skills
+            list: Agents matching the skills
+        """
+        if not skills:
+            return []
+        
+        # One server-side query; the API de-duplicates agents
+        return self.search(skill=list(skills), match=match, **kwargs)
+    
+    def get_batch(self,
+                  agent_names: List[str],
+                  include: Tuple[str, ...] = ('profile', 'a2a')) -> Dict[str, Dict[str, Any]]:
+        """
+        Get profiles and/or A2A descriptors for many agents
+        
+        Uses POST /agents/batch, one request per BATCH_CHUNK_SIZE names.
+        
+        Args:
+            agent_names: Names of the agents
+            include: Parts to fetch, any of 'profile' and 'a2a'
+            
+        Returns:
+            dict: agent_name -> {'profile': ..., 'a2a': ...}; unknown agents are omitted
+            
+        Raises:
+            requests.HTTPError: If a batch request fails
         """
-        all_agents = []
-        for skill in skills:
-            agents = self.search(skill=skill, **kwargs)
-            # Avoid duplicates by checking agent_id
-            existing_ids = {agent['agent_id'] for agent in all_agents}
-            for agent in agents:
-                if agent['agent_id'] not in existing_ids:
-                    all_agents.append(agent)
+        names = list(dict.fromkeys(agent_names))
+        url = f"{self.base_url}/api/v1/agents/batch"
+        
+        results = {}
+        for start in range(0, len(names), BATCH_CHUNK_SIZE):
+            chunk = names[start:start + BATCH_CHUNK_SIZE]
+            response = self.session.post(url, json={'agent_names': chunk, 'include': list(include)})
+            response.raise_for_status()
+            results.update(response.json()['agents'])
         
-        return all_agents
+        return results
     
     def find_a2a_agents(self, task: str, **kwargs) -> List[Dict[str, Any]]:
         """
@@ -193,18 +346,22 @@ class DiscoveryClient:
         """
         # First find A2A compliant agents
         agents = self.search(a2a_compliant=True, **kwargs)
+        if not agents:
+            return []
+        
+        # Fetch all their descriptors in one batch instead of one request per agent
+        descriptors = self.get_batch([agent['agent_name'] for agent in agents], include=('a2a',))
         
         # Filter by those that support the specific task
         matching_agents = []
         for agent in agents:
-            try:
-                a2a_desc = self.get_a2a_descriptor(agent['agent_name'])
-                supported_tasks = a2a_desc.get('supported_tasks', [])
-                if any(task.lower() in supported_task.lower() for supported_task in supported_tasks):
-                    matching_agents.append(agent)
-            except requests.HTTPError:
+            a2a_desc = (descriptors.get(agent['agent_name']) or {}).get('a2a')
+            if not a2a_desc:
                 # Skip agents that don't have A2A descriptors
                 continue
+            supported_tasks = a2a_desc.get('supported_tasks', [])
+            if any(task.lower() in supported_task.lower() for supported_task in supported_tasks):
+                matching_agents.append(agent)
         
         return matching_agents
     
@@ -217,8 +374,16 @@ class DiscoveryClient:
             
         Returns:
             dict: Summary of agent capabilities
+            
+        Raises:
+            requests.HTTPError: If profile retrieval fails (404 if the agent does not exist)
         """
-        profile = self.get_profile(agent_name)
+        item = self.get_batch([agent_name]).get(agent_name)
+        if item is None:
+            # The single-agent endpoint raises the error, with its 404 response, that callers check
+            item = {'profile': self.get_profile(agent_name)}
+        
+        profile = item['profile']
         metadata = profile.get('metadata', {})
         
         capabilities = {
@@ -235,15 +400,15 @@ class DiscoveryClient:
         
         # Add A2A specific capabilities if available
         if capabilities['a2a_compliant']:
-            try:
-                a2a_desc = self.get_a2a_descriptor(agent_name)
+            a2a_desc = item.get('a2a')
+            if a2a_desc:
                 capabilities['a2a'] = {
                     'supported_tasks': a2a_desc.get('supported_tasks', []),
                     'negotiation': a2a_desc.get('negotiation', False),
                     'context_required': a2a_desc.get('context_required', []),
                     'token_budget': a2a_desc.get('token_budget', 0)
                 }
-            except requests.HTTPError:
+            else:
                 capabilities['a2a'] = None
         
         return capabilities
@@ -5,9 +5,12 @@ Handles agent registration, renewal, deactivation, and status checking.
 """
 
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import json
 
+# Agents sent per POST /register/bulk request (the API default limit is 500)
+BULK_CHUNK_SIZE = 500
+
 class RegistrationClient:
     """Client for ParkBench agent registration operations"""
     
@@ -62,6 +65,49 @@ class RegistrationClient:
         
         return response.json()
     
+    def register_bulk(self, agents: List[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Register many agents, one POST /register/bulk request per chunk
+        
+        Args:
+            agents: Dicts with the register() arguments: agent_name, certificate_pem, metadata
+            chunk_size: Agents per request (at most the server's limit)
+            
+        Returns:
+            dict: registered and failed counts plus one result per agent, in input
+                order, with status 'registered' or 'failed' and the errors for failures
+            
+        Raises:
+            requests.HTTPError: If a bulk request fails as a whole
+        """
+        url = f"{self.base_url}/api/v1/register/bulk"
+        
+        combined = {"registered": 0, "failed": 0, "results": []}
+        for start in range(0, len(agents), chunk_size):
+            chunk = agents[start:start + chunk_size]
+            payload = {
+                "agents": [
+                    {
+                        "agentName": agent["agent_name"],
+                        "certificatePEM": agent["certificate_pem"],
+                        "metadata": agent["metadata"]
+                    }
+                    for agent in chunk
+                ]
+            }
+            
+            response = self.session.post(url, json=payload)
+            response.raise_for_status()
+            
+            data = response.json()
+            combined["registered"] += data["registered"]
+            combined["failed"] += data["failed"]
+            for result in data["results"]:
+                result["index"] += start  # Position in `agents`, not in the chunk
+                combined["results"].append(result)
+        
+        return combined
+    
     def renew(self, agent_name: str, certificate_pem: str) -> Dict[str, Any]:
         """
         Renew an agent's registration
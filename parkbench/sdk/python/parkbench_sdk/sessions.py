@@ -5,7 +5,7 @@ Handles A2A session management including initiation, monitoring, and updates.
 """
 
 import requests
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 import time
 
 class SessionClient:
@@ -88,6 +88,28 @@ class SessionClient:
         
         return response.json()
     
+    def verify_token(self, session_token: str) -> Dict[str, Any]:
+        """
+        Validate a session token with the API (signature, expiry and revocation)
+        
+        For checks without a network round trip, use TokenVerifier.verify_session.
+        
+        Args:
+            session_token: Token returned by initiate
+            
+        Returns:
+            dict: Session ID, both agents, task and expiry
+            
+        Raises:
+            requests.HTTPError: If the token is invalid, expired or revoked (401)
+        """
+        url = f"{self.base_url}/api/v1/a2a/session/verify"
+        
+        response = self.session.post(url, json={"sessionToken": session_token})
+        response.raise_for_status()
+        
+        return response.json()
+    
     def update(self, 
                session_id: str, 
                status: str, 
@@ -97,11 +119,12 @@ class SessionClient:
         
         Args:
             session_id: ID of the session
-            status: New status (active, completed, failed)
+            status: New status (active, completed, failed); an ended session cannot go back to active (409)
             context: Updated context (optional)
             
         Returns:
-            dict: Update response
+            dict: Update response; while the session stays active, sessionToken
+                holds a renewed token to use from now on
             
         Raises:
             requests.HTTPError: If update fails
@@ -176,7 +199,9 @@ class SessionClient:
                      target_agent: Optional[str] = None,
                      status_filter: Optional[str] = None,
                      limit: int = 50,
-                     offset: int = 0) -> Dict[str, Any]:
+                     offset: int = 0,
+                     cursor: Optional[str] = None,
+                     include_total: bool = False) -> Dict[str, Any]:
         """
         List A2A sessions with optional filtering
         
@@ -185,10 +210,12 @@ class SessionClient:
             target_agent: Filter by target agent
             status_filter: Filter by status (active, completed, failed)
             limit: Maximum number of results
-            offset: Offset for pagination
+            offset: Offset for pagination (prefer cursor)
+            cursor: next_cursor from a previous page
+            include_total: Ask the server to count all matching sessions
             
         Returns:
-            dict: List of sessions with metadata
+            dict: List of sessions with metadata, including next_cursor
             
         Raises:
             requests.HTTPError: If listing fails
@@ -200,6 +227,10 @@ class SessionClient:
             "offset": offset
         }
         
+        if cursor:
+            params["cursor"] = cursor
+        if include_total:
+            params["include_total"] = include_total
         if initiating_agent:
             params["initiating_agent"] = initiating_agent
         if target_agent:
@@ -212,6 +243,37 @@ class SessionClient:
         
         return response.json()
     
+    def iter_sessions(self,
+                      initiating_agent: Optional[str] = None,
+                      target_agent: Optional[str] = None,
+                      status_filter: Optional[str] = None,
+                      page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every matching session (newest first), following cursors
+        
+        Args:
+            initiating_agent: Filter by initiating agent
+            target_agent: Filter by target agent
+            status_filter: Filter by status (active, completed, failed)
+            page_size: Sessions fetched per request (max 100)
+            
+        Yields:
+            dict: Sessions, one at a time
+        """
+        cursor = None
+        while True:
+            page = self.list_sessions(
+                initiating_agent=initiating_agent,
+                target_agent=target_agent,
+                status_filter=status_filter,
+                limit=page_size,
+                cursor=cursor
+            )
+            yield from page.get('sessions', [])
+            cursor = page.get('next_cursor')
+            if not cursor:
+                return
+    
     def wait_for_completion(self,
                            session_id: str,
                            timeout: int = 300,
@@ -0,0 +1,172 @@
+"""
+ParkBench Token Verifier
+
+Verifies ParkBench access tokens and A2A session tokens locally against the
+public keys published at /.well-known/jwks.json, so an agent receiving a
+call from another agent does not need a round trip to the API to check its
+token. Sessions ended early are checked against a cached copy of the API's
+revocation denylist.
+
+Requires PyJWT with cryptography: pip install "parkbench-sdk[crypto]"
+"""
+
+import threading
+import time
+import requests
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import jwt
+except ImportError:  # Optional dependency
+    jwt = None
+
+class TokenVerifier:
+    """Verifies ParkBench access tokens with cached public keys"""
+    
+    def __init__(self, base_url: str, jwks_ttl: float = 300, min_refresh_interval: float = 30,
+                 revoked_ttl: float = 30):
+        """
+        Initialize token verifier
+        
+        Args:
+            base_url: Base URL of the ParkBench API
+            jwks_ttl: Seconds to reuse the fetched key set before fetching it again
+            min_refresh_interval: Minimum seconds between fetches triggered by unknown key ids
+            revoked_ttl: Seconds to reuse the fetched list of revoked sessions
+        
+        Raises:
+            ImportError: If PyJWT is not installed
+        """
+        if jwt is None:
+            raise ImportError('TokenVerifier requires PyJWT: pip install "parkbench-sdk[crypto]"')
+        
+        self.base_url = base_url.rstrip('/')
+        self.jwks_ttl = jwks_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.revoked_ttl = revoked_ttl
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'ParkBench-SDK-Python/0.1.0'
+        })
+        
+        self._keys: Dict[str, Tuple[str, Any]] = {}  # (algorithm, parsed public key) by kid
+        self._fetched_at: Optional[float] = None
+        self._revoked: Dict[str, float] = {}  # Session ID -> expiry of its token (Unix time)
+        self._revoked_fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def refresh(self) -> None:
+        """
+        Fetch the published key set, keeping already parsed keys
+        
+        Raises:
+            requests.HTTPError: If the key set cannot be fetched
+        """
+        response = self.session.get(f"{self.base_url}/.well-known/jwks.json", timeout=10)
+        response.raise_for_status()
+        
+        keys = {}
+        for jwk in response.json().get("keys", []):
+            kid, algorithm = jwk.get("kid"), jwk.get("alg")
+            if kid and algorithm:
+                keys[kid] = self._keys.get(kid) or (algorithm, jwt.PyJWK(jwk, algorithm).key)
+        
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+    
+    def get_key(self, kid: str) -> Optional[Tuple[str, Any]]:
+        """
+        Get the parsed public key for a key id, fetching the key set if needed
+        
+        The key set is fetched when it is older than jwks_ttl, or when kid is
+        unknown (a newly rotated key) and min_refresh_interval has passed.
+        
+        Args:
+            kid: Key id from the token header
+        
+        Returns:
+            tuple: (algorithm, public key), or None if the key is not published
+        """
+        with self._lock:
+            age = time.monotonic() - self._fetched_at if self._fetched_at is not None else None
+            if age is None or age >= self.jwks_ttl or (kid not in self._keys and age >= self.min_refresh_interval):
+                self.refresh()
+            return self._keys.get(kid)
+    
+    def is_revoked(self, session_id: str) -> bool:
+        """
+        Check whether a session was ended before its token expired
+        
+        Args:
+            session_id: ID of the session
+            
+        Returns:
+            bool: True if the session's token has been revoked
+            
+        Raises:
+            requests.HTTPError: If the revoked list cannot be fetched
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._revoked_fetched_at is None or now - self._revoked_fetched_at >= self.revoked_ttl:
+                response = self.session.get(f"{self.base_url}/api/v1/a2a/session/revoked", timeout=10)
+                response.raise_for_status()
+                self._revoked = {entry["session_id"]: entry["expires_at"] for entry in response.json()["revoked"]}
+                self._revoked_fetched_at = now
+            return self._revoked.get(session_id, 0) >= time.time()
+    
+    def verify(self, token: str, leeway: float = 0) -> Dict[str, Any]:
+        """
+        Verify an access token's signature and expiry
+        
+        Args:
+            token: ParkBench access token
+            leeway: Seconds of clock skew to tolerate on expiry
+            
+        Returns:
+            dict: Token claims (sub is the agent name)
+            
+        Raises:
+            jwt.InvalidTokenError: If the token is invalid, expired, or signed with an unknown key
+            requests.HTTPError: If the key set cannot be fetched
+        """
+        claims = self._decode(token, leeway)
+        if claims.get("type", "access") != "access":
+            raise jwt.InvalidTokenError("Not an access token")
+        return claims
+    
+    def verify_session(self, session_token: str, check_revoked: bool = True, leeway: float = 0) -> Dict[str, Any]:
+        """
+        Verify an A2A session token's signature, expiry and (optionally) revocation
+        
+        Args:
+            session_token: Token returned when the session was initiated
+            check_revoked: Also reject sessions ended early (uses the cached revoked list)
+            leeway: Seconds of clock skew to tolerate on expiry
+            
+        Returns:
+            dict: Token claims: sid (session ID), ini and tgt (initiating and target agents), task, exp
+            
+        Raises:
+            jwt.InvalidTokenError: If the token is invalid, expired, revoked, or signed with an unknown key
+            requests.HTTPError: If the key set or revoked list cannot be fetched
+        """
+        if not session_token.startswith("pb_session_"):
+            raise jwt.InvalidTokenError("Not a ParkBench session token")
+        
+        claims = self._decode(session_token[len("pb_session_"):], leeway)
+        if claims.get("type") != "a2a_session":
+            raise jwt.InvalidTokenError("Not a ParkBench session token")
+        if check_revoked and self.is_revoked(claims["sid"]):
+            raise jwt.InvalidTokenError("Session has ended")
+        return claims
+    
+    def _decode(self, token: str, leeway: float) -> Dict[str, Any]:
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.get_key(kid) if kid else None
+        if key is None:
+            raise jwt.InvalidTokenError("Token is not signed with a published ParkBench key")
+        
+        # Only the algorithm the key was published for, never the one the token claims
+        algorithm, public_key = key
+        return jwt.decode(token, public_key, algorithms=[algorithm], leeway=leeway)
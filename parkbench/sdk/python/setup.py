@@ -47,6 +47,7 @@ setup(
         ],
         "crypto": [
             "cryptography>=3.4.8",
+            "PyJWT>=2.8.0",
         ],
     },
     keywords="ai agent platform api sdk parkbench",